@@ -1,15 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, TypeVar
 
 import jwt
-from passlib.context import CryptContext
 
 from .config import get_settings
+from .metrics import Counter, Histogram
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 BCRYPT_MAX_BYTES = 72
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 settings = get_settings()
 
+# Measured in the event loop around the pool call, so queueing for a worker is included.
+password_hash_seconds = Histogram(
+    'astro_password_hash_seconds', 'bcrypt hash and verify calls, including time waiting for a worker.',
+    ('operation',), buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+password_hash_rejected = Counter(
+    'astro_password_hash_rejected_total', 'Hashing jobs refused because the pool queue was full.'
+)
+
+
+@lru_cache(maxsize=1)
+def password_context() -> 'CryptContext':
+    # passlib is imported on first use: only auth requests and the hashing
+    # workers need it, not every process that imports the app.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=settings.bcrypt_rounds)
+
+T = TypeVar('T')
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing pool has no room for another job."""
+
+
+class PasswordHasherPool:
+    """Bounded process pool that keeps bcrypt off the event loop and the shared threadpool.
+
+    At most ``workers + queue_limit`` jobs are admitted at once; anything beyond
+    that is rejected immediately with :class:`PasswordHasherBusy` instead of
+    queueing behind a login burst. ``workers=0`` runs jobs in the calling
+    process (through the default executor), which is handy for tooling.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_pending(self) -> int:
+        return max(self.workers, 1) + self.queue_limit
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                password_hash_rejected.inc()
+                raise PasswordHasherBusy('Password hashing queue is full')
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def configure(self, workers: int, queue_limit: int) -> None:
+        self.shutdown()
+        self.workers = workers
+        self.queue_limit = queue_limit
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasherPool(settings.password_hash_workers, settings.password_hash_queue_limit)
+
 
 def _truncate_password(password: str) -> str:
     encoded = password.encode('utf-8')
@@ -20,11 +110,32 @@ def _truncate_password(password: str) -> str:
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(_truncate_password(password))
+    return password_context().hash(_truncate_password(password))
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return pwd_context.verify(_truncate_password(password), hashed)
+    return password_context().verify(_truncate_password(password), hashed)
+
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Verify ``password`` and return a replacement hash when the stored one is outdated."""
+    secret = _truncate_password(password)
+    context = password_context()
+    if not context.verify(secret, hashed):
+        return False, None
+    if context.needs_update(hashed):
+        return True, context.hash(secret)
+    return True, None
+
+
+async def hash_password_async(password: str) -> str:
+    with password_hash_seconds.time('hash'):
+        return await password_hasher.run(hash_password, password)
+
+
+async def verify_and_update_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    with password_hash_seconds.time('verify'):
+        return await password_hasher.run(verify_and_update, password, hashed)
 
 
 def create_access_token(user_id: int, email: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,4 +146,3 @@ def create_access_token(user_id: int, email: str, expires_delta: Optional[timede
 
 def decode_token(token: str):
     return jwt.decode(token, settings.secret_key, algorithms=['HS256'])
-
@@ -0,0 +1,141 @@
+"""Operational commands: ``python -m app.cli <command> --help``."""
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import date, datetime
+from typing import Optional, Sequence
+
+
+def _nightly_reports(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.batch_reports import run_nightly_reports
+
+    day = args.date or datetime.utcnow().date()
+    stats = run_nightly_reports(engine, day, chunk_size=args.chunk_size, workers=args.workers)
+    print(
+        f'{day.isoformat()}: {stats.users} users in {stats.elapsed:.1f}s '
+        f'({stats.users_per_second:.0f} users/sec), '
+        f'{stats.astrology_written} astrology + {stats.zodiac_written} zodiac reports written'
+        + (f', resumed after user {stats.resumed_after}' if stats.resumed_after else '')
+    )
+
+
+def _init_db(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.bootstrap import init_database
+
+    applied = init_database(engine, force=args.force)
+    print('schema and seed data applied' if applied else 'seed data unchanged, nothing to do')
+
+
+def _grant_admin(args: argparse.Namespace) -> None:
+    from sqlalchemy import update
+
+    from . import models
+    from .database import engine
+
+    with engine.begin() as conn:
+        updated = conn.execute(
+            update(models.User).where(models.User.email == args.email).values(is_admin=not args.revoke)
+        ).rowcount
+    if not updated:
+        raise SystemExit(f'No user with email {args.email}')
+    print(f"{args.email}: admin {'revoked' if args.revoke else 'granted'}")
+
+
+def _reindex_search(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.search import rebuild_search_index
+
+    with engine.begin() as conn:
+        total = rebuild_search_index(conn)
+    print(f'{total} articles indexed')
+
+
+def _reindex_tags(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.tags import rebuild_tag_index
+
+    with engine.begin() as conn:
+        links, tags = rebuild_tag_index(conn)
+    print(f'{links} article tags indexed, {tags} distinct published tags')
+
+
+def _reindex_related(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.related import rebuild_related_index
+
+    with engine.begin() as conn:
+        total = rebuild_related_index(conn)
+    print(f'related articles recomputed for {total} published articles')
+
+
+def _load_synthetic(args: argparse.Namespace) -> None:
+    from .database import engine
+    from .services.synthetic import SYNTHETIC_PASSWORD, load_synthetic
+
+    stats = load_synthetic(
+        engine,
+        users=args.users,
+        astrology_reports=args.astrology_reports,
+        zodiac_reports=args.zodiac_reports,
+        articles=args.articles,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    loaded = ', '.join(f'{count} {table}' for table, count in stats.rows.items() if count)
+    print(f'{loaded or "nothing"} loaded in {stats.elapsed:.1f}s ({stats.rows_per_second:.0f} rows/sec)')
+    if stats.rows['users']:
+        print(f'synthetic users log in as synthetic<id>@example.com / {SYNTHETIC_PASSWORD}')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    nightly = commands.add_parser('nightly-reports', help="generate every user's reports for a day")
+    nightly.add_argument('--date', type=date.fromisoformat, default=None, help='UTC day, defaults to today')
+    nightly.add_argument('--chunk-size', type=int, default=1000)
+    nightly.add_argument('--workers', type=int, default=None, help='worker processes, 0 renders inline')
+    nightly.set_defaults(handler=_nightly_reports)
+
+    init = commands.add_parser('init-db', help='create missing tables and seed baseline content')
+    init.add_argument('--force', action='store_true', help='reseed even if the stored digest matches')
+    init.set_defaults(handler=_init_db)
+
+    admin = commands.add_parser('grant-admin', help='allow a user to call the /api/admin endpoints')
+    admin.add_argument('email')
+    admin.add_argument('--revoke', action='store_true', help='remove admin rights instead')
+    admin.set_defaults(handler=_grant_admin)
+
+    reindex = commands.add_parser('reindex-search', help='rebuild the article full-text index from scratch')
+    reindex.set_defaults(handler=_reindex_search)
+
+    retag = commands.add_parser('reindex-tags', help='rebuild article_tags and tag_counts from articles.tags')
+    retag.set_defaults(handler=_reindex_tags)
+
+    relate = commands.add_parser('reindex-related', help='recompute every related-article list')
+    relate.set_defaults(handler=_reindex_related)
+
+    synthetic = commands.add_parser('load-synthetic', help='bulk load deterministic synthetic data for scale tests')
+    synthetic.add_argument('--users', type=int, default=0)
+    synthetic.add_argument('--astrology-reports', type=int, default=0, help='spread over the users of this run')
+    synthetic.add_argument('--zodiac-reports', type=int, default=0, help='spread over the users of this run')
+    synthetic.add_argument('--articles', type=int, default=0)
+    synthetic.add_argument('--seed', type=int, default=0)
+    synthetic.add_argument('--chunk-size', type=int, default=10000)
+    synthetic.add_argument('--workers', type=int, default=None, help='generator processes, 0 generates inline')
+    synthetic.set_defaults(handler=_load_synthetic)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Response compression: brotli or gzip, negotiated per request.
+
+Bodies under ``minimum_size`` and non-text content types are sent as is.
+Responses that carry a public ETag (the interpretation list, article detail
+and listings) only change when their content version does, so their
+compressed bytes are cached under that ETag and compressed once at the
+highest quality; everything else is compressed per request at a fast level.
+Streaming bodies (the NDJSON export) are compressed chunk by chunk.
+
+Each coding is a different representation, so the ETag gets a per-coding
+suffix (see conditional.encoded_etag); conditional requests strip it again
+before comparing.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .conditional import encoded_etag
+from .config import get_settings
+from .services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+# Compressed bodies of versioned responses, keyed by (path + query, coded ETag).
+compressed_bodies: TTLCache[bytes] = TTLCache('compressed_bodies', settings.compressed_cache_size, 24 * 60 * 60)
+
+
+def available_codings() -> Tuple[str, ...]:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The preferred coding we support from an Accept-Encoding header, or None for identity."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            weights[name.strip().lower()] = quality
+    best, best_weight = None, 0.0
+    for coding in available_codings():
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, coding: str, best: bool = False) -> bytes:
+    if coding == 'br':
+        return brotli.compress(body, quality=11 if best else 4)
+    return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk so partitions aren't held back."""
+
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == 'br':
+            self._brotli = brotli.Compressor(quality=4)
+        else:
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.coding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.coding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _is_compressible(headers: MutableHeaders) -> bool:
+    return headers.get('content-type', '').startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        responder = _Responder(
+            send,
+            coding=negotiate(request_headers.get('accept-encoding', '')),
+            if_none_match=request_headers.get('if-none-match', ''),
+            cache_key=scope['path'] + '?' + scope.get('query_string', b'').decode('latin-1'),
+            minimum_size=self.minimum_size,
+        )
+        await self.app(scope, receive, responder)
+
+
+class _Responder:
+    def __init__(self, send: Send, *, coding: Optional[str], if_none_match: str, cache_key: str, minimum_size: int):
+        self.send = send
+        self.coding = coding
+        self.if_none_match = if_none_match
+        self.cache_key = cache_key
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.stream: Optional[_StreamCompressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            self.start = message
+            return
+        if message['type'] == 'http.response.body' and self.stream is not None:
+            await self._send_stream_chunk(message)
+            return
+        if message['type'] != 'http.response.body' or self.start is None:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start['headers'])
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if start['status'] == 304:
+            self._tag_not_modified(headers)
+            await self.send(start)
+            await self.send(message)
+            return
+        compressible = _is_compressible(headers)
+        if compressible:
+            headers.add_vary_header('Accept-Encoding')
+        eligible = (
+            self.coding is not None
+            and compressible
+            and 'content-encoding' not in headers
+            and start['status'] not in (204, 206)
+            and 'no-transform' not in headers.get('cache-control', '')
+        )
+        if not eligible or (not more_body and len(body) < self.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers['Content-Encoding'] = self.coding
+        if 'etag' in headers:
+            headers['ETag'] = encoded_etag(headers['etag'], self.coding)
+        if more_body:
+            del headers['content-length']
+            self.stream = _StreamCompressor(self.coding)
+            await self.send(start)
+            await self._send_stream_chunk(message)
+            return
+
+        compressed = self._compress_whole(body, headers)
+        headers['Content-Length'] = str(len(compressed))
+        await self.send(start)
+        await self.send({'type': 'http.response.body', 'body': compressed})
+
+    def _compress_whole(self, body: bytes, headers: MutableHeaders) -> bytes:
+        etag = headers.get('etag')
+        if etag is None or 'private' in headers.get('cache-control', ''):
+            return compress(body, self.coding)
+        key = (self.cache_key, etag)
+        compressed = compressed_bodies.get(key)
+        if compressed is None:
+            compressed = compress(body, self.coding, best=True)
+            compressed_bodies.set(key, compressed)
+        return compressed
+
+    async def _send_stream_chunk(self, message: Message) -> None:
+        more_body = message.get('more_body', False)
+        data = self.stream.chunk(message.get('body', b''))
+        if not more_body:
+            data += self.stream.finish()
+        await self.send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    def _tag_not_modified(self, headers: MutableHeaders) -> None:
+        # Echo the representation the client validated: if it sent this
+        # coding's suffixed tag, answer with the suffixed tag.
+        etag = headers.get('etag')
+        if etag and self.coding and encoded_etag(etag, self.coding) in self.if_none_match:
+            headers['ETag'] = encoded_etag(etag, self.coding)
@@ -0,0 +1,97 @@
+"""Conditional GET support: strong ETags, Last-Modified and 304 responses.
+
+Validators are derived from cheap version data (a version counter, a max
+timestamp, a row id) rather than from the rendered body, so a 304 costs one
+small query and no serialization.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+@dataclass(frozen=True)
+class Validator:
+    etag: str
+    last_modified: Optional[datetime] = None
+    cache_control: str = 'no-cache'
+
+    def headers(self) -> Dict[str, str]:
+        headers = {'ETag': self.etag, 'Cache-Control': self.cache_control}
+        if self.last_modified is not None:
+            headers['Last-Modified'] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _validator(etag: str, last_modified: Optional[datetime], private: bool) -> Validator:
+    return Validator(
+        etag=etag,
+        last_modified=_as_utc(last_modified) if last_modified else None,
+        cache_control='private, no-cache' if private else 'no-cache',
+    )
+
+
+def make_validator(*parts: object, last_modified: Optional[datetime] = None, private: bool = False) -> Validator:
+    digest = hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return _validator(f'"{digest}"', last_modified, private)
+
+
+def validator_for_body(body: bytes, *, last_modified: Optional[datetime] = None, private: bool = False) -> Validator:
+    """For bodies that are rendered once and reused, hashing the bytes is the cheapest version."""
+    return _validator(f'"{hashlib.sha1(body).hexdigest()}"', last_modified, private)
+
+
+# Content codings the compression middleware may apply; each gets its own
+# entity tag by suffixing the identity one ("abc" -> "abc-gzip").
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    prefix = 'W/' if etag.startswith('W/') else ''
+    return f'{prefix}{etag[len(prefix):-1]}-{coding}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    tag = tag[2:] if tag.startswith('W/') else tag
+    for coding in CONTENT_CODINGS:
+        suffix = f'-{coding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison (RFC 9110 13.1.2).
+        if if_none_match.strip() == '*':
+            return True
+        return any(_opaque_tag(tag) == validator.etag for tag in if_none_match.split(','))
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and validator.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return validator.last_modified <= _as_utc(since)
+    return False
+
+
+def not_modified(validator: Validator) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator.headers())
+
+
+def apply_validator(response: Response, validator: Validator) -> None:
+    response.headers.update(validator.headers())
@@ -1,5 +1,19 @@
 from functools import lru_cache
+from typing import Optional
+
 from pydantic_settings import BaseSettings
+from sqlalchemy.engine import make_url
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly.
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+# And back: sync drivers for background work on a database an async engine points at.
+SYNC_DRIVERS = {
+    'sqlite': 'sqlite+pysqlite',
+    'postgresql': 'postgresql+psycopg2',
+}
 
 
 class Settings(BaseSettings):
@@ -7,10 +21,43 @@ class Settings(BaseSettings):
     secret_key: str = "super-secret-key"
     access_token_expire_minutes: int = 60 * 24
     database_url: str = "sqlite+pysqlite:///./astro.db"
+    async_database_url: Optional[str] = None
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 64
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 60
+    article_total_cache_ttl_seconds: int = 30
+    interpretation_refresh_seconds: int = 300
+    daily_report_cache_size: int = 10000
+    # Used for natal charts when a birth place cannot be resolved to coordinates.
+    default_latitude: float = 39.9042
+    default_longitude: float = 116.4074
+    default_utc_offset_hours: float = 8.0
+    gazetteer_path: Optional[str] = None
+    gazetteer_cache_dir: Optional[str] = None
+    # Responses smaller than this are sent uncompressed.
+    compression_min_bytes: int = 1024
+    compressed_cache_size: int = 512
+    # Create tables and seed baseline content from the lifespan hook (skipped when unchanged).
+    bootstrap_on_startup: bool = True
+    # Per-request SQL accounting: X-DB-Queries/X-DB-Time headers are for debugging only.
+    sql_debug_headers: bool = False
+    slow_query_ms: float = 200.0
+    n_plus_one_threshold: int = 10
 
     class Config:
         env_file = '.env'
 
+    def get_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        url = make_url(self.database_url)
+        driver = ASYNC_DRIVERS.get(url.get_backend_name())
+        if driver is None:
+            raise ValueError(f'No async driver known for {url.drivername}; set ASYNC_DATABASE_URL')
+        return url.set(drivername=driver).render_as_string(hide_password=False)
+
 
 @lru_cache()
 def get_settings() -> Settings:
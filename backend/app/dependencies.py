@@ -1,25 +1,38 @@
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db
+from .database import get_async_db
 from .auth import decode_token
 from . import models
+from .services.principals import Principal, cache_token_payload, cached_token_payload, principal_cache
 
 
-def get_current_user(authorization: Optional[str] = Header(default=None), db: Session = Depends(get_db)) -> models.User:
+async def get_current_user(authorization: Optional[str] = Header(default=None), db: AsyncSession = Depends(get_async_db)) -> Principal:
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Authorization header missing')
     if not authorization.startswith('Bearer '):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid token header')
     token = authorization.split(' ', 1)[1]
-    try:
-        payload = decode_token(token)
-    except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token expired or invalid') from exc
-    user = db.get(models.User, payload['uid'])
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User not found')
-    return user
+    payload = cached_token_payload(token)
+    if payload is None:
+        try:
+            payload = decode_token(token)
+        except Exception as exc:  # noqa: BLE001
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token expired or invalid') from exc
+        cache_token_payload(token, payload)
+    principal = principal_cache.get(payload['uid'])
+    if principal is None:
+        user = await db.get(models.User, payload['uid'])
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User not found')
+        principal = Principal.from_user(user)
+        principal_cache.set(user.id, principal)
+    return principal
 
+
+async def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
+    return current_user
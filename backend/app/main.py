@@ -1,19 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .auth import password_hasher
+from .compression import CompressionMiddleware
 from .config import get_settings
-from .database import Base, engine, SessionLocal
-from .routers import auth, users, reports, articles, zodiac_interpretations
-from .services.bootstrap import bootstrap_data
+from .database import AsyncSessionLocal, engine
+from .metrics import MetricsMiddleware
+from .query_tracking import QueryTrackingMiddleware
+from .routers import admin, auth, users, reports, articles, places, monitoring, zodiac_interpretations
+from .services.bootstrap import init_database
+from .services.interpretations import interpretation_registry
+from .services.related import wait_for_related_updates
 
 settings = get_settings()
 
-Base.metadata.create_all(bind=engine)
 
-with SessionLocal() as session:
-    bootstrap_data(session)
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Schema setup and seeding are skipped when the stored seed digest matches;
+    # deployments can turn this off and run ``python -m app.cli init-db`` once.
+    if settings.bootstrap_on_startup:
+        await asyncio.to_thread(init_database, engine)
+    async with AsyncSessionLocal() as db:
+        await interpretation_registry.load(db)
+    yield
+    await asyncio.to_thread(wait_for_related_updates)
+    password_hasher.shutdown()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,12 +40,19 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*']
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes)
+app.add_middleware(QueryTrackingMiddleware)
+# Outermost, so latency includes compression and CORS handling.
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(reports.router)
 app.include_router(articles.router)
 app.include_router(zodiac_interpretations.router)
+app.include_router(places.router)
+app.include_router(admin.router)
+app.include_router(monitoring.router)
 
 
 @app.get('/api/health')
@@ -0,0 +1,213 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+A deliberately small registry: counters and histograms that code updates as
+it runs, plus collectors that read gauges (pool sizes, cache stats) at
+scrape time. Everything lives in this process; with several workers each
+one reports its own numbers, which Prometheus aggregates by instance.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+@dataclass
+class Family:
+    """One metric as collected at scrape time: ``samples`` are (suffix, label names, label values, value)."""
+
+    name: str
+    kind: str
+    documentation: str
+    samples: List[Tuple[str, Sequence[str], Sequence[str], float]] = field(default_factory=list)
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for suffix, names, values, value in self.samples:
+            lines.append(f'{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+def gauge_family(name: str, documentation: str, values: Iterable[Tuple[Dict[str, str], float]], kind: str = 'gauge') -> Family:
+    family = Family(name, kind, documentation)
+    for labels, value in values:
+        family.samples.append(('', tuple(labels), tuple(labels.values()), value))
+    return family
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List['_Metric'] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: '_Metric') -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Family]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        return '\n'.join(family.render() for family in self.collect()) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labelvalues: Sequence[str]) -> Labels:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+        return tuple(str(value) for value in labelvalues)
+
+    def collect(self) -> Family:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(self._key(labelvalues), 0.0)
+
+    def collect(self) -> Family:
+        with self._lock:
+            items = sorted(self._values.items())
+        family = Family(self.name, self.kind, self.documentation)
+        family.samples.extend(('', self.labelnames, key, value) for key, value in items)
+        return family
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count in each bucket (non-cumulative) + overflow, sum].
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = self._key(labelvalues)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        entry = self._values.get(self._key(labelvalues))
+        return sum(entry[0]) if entry else 0
+
+    def collect(self) -> Family:
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        family = Family(self.name, self.kind, self.documentation)
+        names = self.labelnames + ('le',)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                family.samples.append(('_bucket', names, key + (_format_value(bound),), cumulative))
+            family.samples.append(('_sum', self.labelnames, key, total))
+            family.samples.append(('_count', self.labelnames, key, cumulative))
+        return family
+
+
+http_requests = Counter(
+    'http_requests_total', 'HTTP requests by route template, method and status.', ('method', 'route', 'status')
+)
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'Time from request start to the last body byte, by route template.',
+    ('method', 'route'),
+)
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request under its route template (``/api/articles/{slug}``)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            # Unmatched paths share one label so scanners can't blow up cardinality.
+            template = getattr(route, 'path', None) or 'unmatched'
+            http_requests.inc(scope['method'], template, str(status))
+            http_request_duration.observe(time.perf_counter() - started, scope['method'], template)
@@ -1,7 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Boolean, Column, Float, Integer, LargeBinary, SmallInteger, String, Date, Time, DateTime, ForeignKey, Text, Index, false
 from sqlalchemy.types import JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from .database import Base
 
 
@@ -16,6 +16,7 @@ class User(Base):
     birth_time = Column(Time, nullable=True)
     birth_place = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
 
     astrology_reports = relationship('AstrologyReport', back_populates='user')
     zodiac_reports = relationship('ZodiacReport', back_populates='user')
@@ -28,10 +29,22 @@ class AstrologyReport(Base):
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     report_type = Column(String(32), nullable=False)
     generated_at = Column(DateTime, default=datetime.utcnow)
-    payload = Column(JSON, nullable=False)
+    # The payload is rebuilt from the template version and packed variant
+    # indices; ``payload`` is only kept for rows no template can express.
+    template_version = Column(SmallInteger, nullable=True)
+    variants = Column(Integer, nullable=True)
+    sign = Column(String(16), nullable=True)
+    sun = Column(String(16), nullable=True)
+    moon = Column(String(16), nullable=True)
+    rising = Column(String(16), nullable=True)
+    payload = Column(JSON, nullable=True)
 
     user = relationship('User', back_populates='astrology_reports')
 
+    __table_args__ = (
+        Index('ix_astrology_reports_user_generated', user_id, generated_at.desc()),
+    )
+
 
 class ZodiacReport(Base):
     __tablename__ = 'zodiac_reports'
@@ -40,10 +53,18 @@ class ZodiacReport(Base):
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     year = Column(Integer, nullable=False)
     generated_at = Column(DateTime, default=datetime.utcnow)
-    payload = Column(JSON, nullable=False)
+    template_version = Column(SmallInteger, nullable=True)
+    variants = Column(Integer, nullable=True)
+    zodiac = Column(String(8), nullable=True)
+    element = Column(String(8), nullable=True)
+    payload = Column(JSON, nullable=True)
 
     user = relationship('User', back_populates='zodiac_reports')
 
+    __table_args__ = (
+        Index('ix_zodiac_reports_user_generated', user_id, generated_at.desc()),
+    )
+
 
 class Article(Base):
     __tablename__ = 'articles'
@@ -58,6 +79,74 @@ class Article(Base):
     author_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
     published_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(32), default='draft')
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_articles_status_published', status, published_at.desc(), id.desc()),
+    )
+
+
+class ArticleTag(Base):
+    """One row per (article, tag); kept in step with ``Article.tags`` by services.tags."""
+
+    __tablename__ = 'article_tags'
+
+    article_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+    tag = Column(String(64), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_article_tags_tag_article', tag, article_id),
+    )
+
+
+class TagCount(Base):
+    """Published articles per tag, adjusted on every article write."""
+
+    __tablename__ = 'tag_counts'
+
+    tag = Column(String(64), primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+
+
+class ArticleSignature(Base):
+    """MinHash signature of a published article, maintained by services.related."""
+
+    __tablename__ = 'article_signatures'
+
+    article_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+    # Score of the article's last related entry when its list is full, else 0:
+    # a new article only changes this list if it scores above the floor.
+    floor_score = Column(Float, nullable=False, default=0.0, server_default='0')
+
+
+class ArticleBand(Base):
+    """LSH band buckets of a signature; articles sharing a bucket are related-article candidates."""
+
+    __tablename__ = 'article_bands'
+
+    article_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index('ix_article_bands_band_bucket', band, bucket, article_id),
+    )
+
+
+class ArticleRelation(Base):
+    """Precomputed top-k related articles, read by the detail endpoint."""
+
+    __tablename__ = 'article_relations'
+
+    article_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    related_id = Column(Integer, ForeignKey('articles.id', ondelete='CASCADE'), nullable=False)
+    score = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index('ix_article_relations_related', related_id),
+    )
 
 
 class ZodiacInterpretation(Base):
@@ -79,3 +168,37 @@ class ZodiacInterpretation(Base):
     lucky_color = Column(String(64), nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @validates('sign')
+    def _normalize_sign(self, _key, value: str) -> str:
+        # Stored lowercase so lookups can compare against the plain index.
+        return value.strip().lower()
+
+
+
+class ContentVersion(Base):
+    __tablename__ = 'content_versions'
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SeedState(Base):
+    """Digest of the seed data last applied by services.bootstrap.init_database."""
+
+    __tablename__ = 'seed_state'
+
+    name = Column(String(64), primary_key=True)
+    digest = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ReportJobCheckpoint(Base):
+    __tablename__ = 'report_job_checkpoints'
+
+    job_key = Column(String(64), primary_key=True)
+    last_user_id = Column(Integer, nullable=False, default=0)
+    users_processed = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,159 @@
+"""Per-request SQL accounting.
+
+Cursor events on every Engine (sync engines and the sync side of async ones)
+count and time each statement against the request being served, which the
+middleware tracks in a context variable. Statements slower than
+``slow_query_ms`` are logged with their EXPLAIN plan, and a statement text
+repeated ``n_plus_one_threshold`` times within one request is logged once as
+a likely N+1. With ``sql_debug_headers`` on, responses carry ``X-DB-Queries``
+and ``X-DB-Time`` (milliseconds, up to the moment headers are sent).
+
+``capture_queries`` records statements outside of requests, for tests and
+tooling that want to bound how many queries some code runs.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .metrics import Counter
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+EXPLAIN_PREFIX = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+
+slow_queries = Counter('astro_db_slow_queries_total', 'Statements slower than the slow-query threshold.')
+repeated_queries = Counter('astro_db_repeated_queries_total', 'Requests flagged for a likely N+1 statement.')
+
+
+@dataclass
+class QueryLog:
+    """Statements seen in one request (or one ``capture_queries`` block)."""
+
+    label: str = ''
+    count: int = 0
+    seconds: float = 0.0
+    statements: List[str] = field(default_factory=list)
+    repeats: Tally = field(default_factory=Tally)
+    flagged: Set[str] = field(default_factory=set)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.statements.append(statement)
+        self.repeats[statement] += 1
+        if self.repeats[statement] == settings.n_plus_one_threshold and statement not in self.flagged:
+            self.flagged.add(statement)
+            repeated_queries.inc()
+            logger.warning(
+                'Likely N+1 in %s: statement ran %d times: %s',
+                self.label or 'request', self.repeats[statement], _shorten(statement),
+            )
+
+
+current_queries: ContextVar[Optional[QueryLog]] = ContextVar('current_queries', default=None)
+
+_captures: List[QueryLog] = []
+_captures_lock = threading.Lock()
+
+
+def _shorten(statement: str, limit: int = 500) -> str:
+    flat = ' '.join(statement.split())
+    return flat if len(flat) <= limit else flat[:limit] + '...'
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """Record every statement any engine runs, on any thread, until the block exits."""
+    log = QueryLog(label='capture')
+    with _captures_lock:
+        _captures.append(log)
+    try:
+        yield log
+    finally:
+        with _captures_lock:
+            _captures.remove(log)
+
+
+def _explain(conn: Connection, statement: str, parameters, executemany: bool) -> Optional[str]:
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or executemany or not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+    # On the raw DBAPI cursor so the EXPLAIN is not itself counted or timed.
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return '\n'.join(' | '.join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as exc:  # the plan is diagnostic only; never fail the query over it
+        return f'<EXPLAIN failed: {exc}>'
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, _cursor, statement, parameters, _context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    request = current_queries.get()
+    if request is not None:
+        request.record(statement, elapsed)
+    if _captures:
+        with _captures_lock:
+            for log in _captures:
+                log.record(statement, elapsed)
+    if elapsed * 1000 >= settings.slow_query_ms:
+        slow_queries.inc()
+        logger.warning(
+            'Slow query (%.1f ms) in %s: %s\nplan:\n%s',
+            elapsed * 1000, request.label if request else 'background', _shorten(statement),
+            _explain(conn, statement, parameters, executemany),
+        )
+
+
+@event.listens_for(Engine, 'handle_error')
+def _drop_timer(context) -> None:
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+class QueryTrackingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        log = QueryLog(label=f"{scope['method']} {scope['path']}")
+        token = current_queries.set(log)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start' and settings.sql_debug_headers:
+                headers = MutableHeaders(scope=message)
+                headers['X-DB-Queries'] = str(log.count)
+                headers['X-DB-Time'] = f'{log.seconds * 1000:.1f}'
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
@@ -0,0 +1,30 @@
+"""JSON responses that skip ``response_model`` validation on hot read paths.
+
+Returning one of these from a route bypasses FastAPI's validate-then-encode
+step, so handlers must only put data in here that already has the declared
+schema: values read straight from typed columns, or bodies assembled from
+trusted pre-serialized fragments (see services.reports). The route keeps its
+``response_model`` for the OpenAPI document.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` encoded with orjson (native datetime support, no ASCII escaping)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_array(items: Iterable[bytes]) -> bytes:
+    return b'[' + b','.join(items) + b']'
+
+
+def raw_json_response(body: bytes, status_code: int = 200) -> Response:
+    """A response whose body is already-serialized JSON."""
+    return Response(content=body, status_code=status_code, media_type='application/json')
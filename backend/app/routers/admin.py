@@ -0,0 +1,26 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..dependencies import get_current_admin
+from ..services.exports import NDJSON, ReportKind, export_filename, stream_reports
+
+router = APIRouter(prefix='/api/admin', tags=['admin'])
+
+
+@router.get('/reports/{kind}/export', response_class=StreamingResponse)
+async def export_all_reports(
+    kind: ReportKind,
+    user_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    _admin=Depends(get_current_admin),
+):
+    """Every user's reports as NDJSON in id order, each line carrying ``user_id``."""
+    return StreamingResponse(
+        stream_reports(db.bind, kind, user_id=user_id, with_user_id=True),
+        media_type=NDJSON,
+        headers={'Content-Disposition': f'attachment; filename="all-{export_filename(kind)}"'},
+    )
@@ -1,18 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from slugify import slugify
 
 from .. import models, schemas
-from ..database import get_db
+from ..conditional import apply_validator, is_not_modified, make_validator, not_modified
+from ..database import get_async_db
 from ..dependencies import get_current_user
+from ..responses import FastJSONResponse
+from ..services.articles import (
+    ARTICLE_LIST_COLUMNS,
+    ARTICLE_PAGE_MAX,
+    InvalidCursor,
+    article_list_item,
+    decode_cursor,
+    encode_cursor,
+    invalidate_article_totals,
+    published_article_total,
+    published_page_query,
+)
+from ..services.related import related_articles
+from ..services.search import SEARCH_OFFSET_MAX, SEARCH_PAGE_MAX, hits_from_rows, plan_search
+from ..services.tags import TAG_FACET_MAX, TAG_MAX_LENGTH, normalize_tags, tag_facets, tagged_article_total
+from ..services.versions import ARTICLES, bump_version, current_version
 
 router = APIRouter(prefix='/api/articles', tags=['articles'])
 
 
 @router.post('/', response_model=schemas.ArticleResponse)
-def create_article(article_in: schemas.ArticleCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def create_article(article_in: schemas.ArticleCreate, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
     slug = slugify(article_in.title)
-    if db.query(models.Article).filter(models.Article.slug == slug).first():
+    existing = await db.execute(select(models.Article.id).where(models.Article.slug == slug))
+    if existing.first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Article slug already exists')
     article = models.Article(
         title=article_in.title,
@@ -25,35 +46,115 @@ def create_article(article_in: schemas.ArticleCreate, db: Session = Depends(get_
         author_id=current_user.id
     )
     db.add(article)
-    db.commit()
-    db.refresh(article)
+    await bump_version(db, ARTICLES)
+    await db.commit()
+    invalidate_article_totals()
+    await db.refresh(article)
     return article
 
 
-@router.get('/', response_model=list[schemas.ArticleResponse])
-def list_articles(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    articles = (
-        db.query(models.Article)
-        .filter(models.Article.status == 'published')
-        .order_by(models.Article.published_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+@router.get('/', response_model=schemas.ArticlePage)
+async def list_articles(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=ARTICLE_PAGE_MAX),
+    include_total: bool = False,
+    tag: Optional[str] = Query(None, min_length=1, max_length=TAG_MAX_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if tag is not None:
+        tag = next(iter(normalize_tags([tag])), None)
+        if tag is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid tag')
+    version, changed_at = await current_version(db, ARTICLES)
+    validator = make_validator(ARTICLES, version, cursor, limit, include_total, tag, last_modified=changed_at)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor') from exc
+    # One extra row tells us whether another page exists.
+    result = await db.execute(published_page_query(limit + 1, after, tag, columns=ARTICLE_LIST_COLUMNS))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.published_at, last.id)
+    total = None
+    if include_total:
+        total = await tagged_article_total(db, tag) if tag is not None else await published_article_total(db)
+    # Plain columns straight into orjson: the rows already have ArticlePage's shape.
+    body = FastJSONResponse(
+        {'items': [article_list_item(row) for row in rows], 'next_cursor': next_cursor, 'total': total}
     )
-    return articles
+    apply_validator(body, validator)
+    return body
 
 
-@router.get('/{slug}', response_model=schemas.ArticleResponse)
-def get_article(slug: str, db: Session = Depends(get_db)):
-    article = db.query(models.Article).filter(models.Article.slug == slug).first()
-    if not article:
+@router.get('/tags', response_model=List[schemas.TagFacet])
+async def list_tags(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=TAG_FACET_MAX),
+    db: AsyncSession = Depends(get_async_db),
+):
+    version, changed_at = await current_version(db, ARTICLES)
+    validator = make_validator(ARTICLES, version, 'tags', limit, last_modified=changed_at)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    facets = await tag_facets(db, limit)
+    apply_validator(response, validator)
+    return [schemas.TagFacet(tag=tag, count=count) for tag, count in facets]
+
+
+@router.get('/search', response_model=schemas.ArticleSearchPage)
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=SEARCH_PAGE_MAX),
+    offset: int = Query(0, ge=0, le=SEARCH_OFFSET_MAX),
+    db: AsyncSession = Depends(get_async_db),
+):
+    plan = plan_search(db.get_bind().dialect.name, q, limit + 1, offset)
+    if plan is None:
+        return schemas.ArticleSearchPage(query=q, items=[])
+    rows = (await db.execute(text(plan.sql), plan.params)).all()
+    next_offset = offset + limit if len(rows) > limit else None
+    return schemas.ArticleSearchPage(query=q, items=hits_from_rows(rows[:limit], plan.runs), next_offset=next_offset)
+
+
+@router.get('/{slug}', response_model=schemas.ArticleDetail)
+async def get_article(slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    stamp = await db.execute(
+        select(models.Article.id, models.Article.updated_at).where(models.Article.slug == slug)
+    )
+    row = stamp.first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Article not found')
-    return article
+    # Related lists change whenever any article is written, so the collection
+    # version is part of the validator as well as this row's timestamp.
+    version, changed_at = await current_version(db, ARTICLES)
+    last_modified = max(filter(None, (row.updated_at, changed_at)), default=None)
+    validator = make_validator('article', row.id, row.updated_at, version, last_modified=last_modified)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+
+    article = await db.get(models.Article, row.id)
+    related = await related_articles(db, row.id)
+    apply_validator(response, validator)
+    detail = schemas.ArticleDetail.model_validate(article)
+    detail.related = [schemas.RelatedArticle.model_validate(item) for item in related]
+    return detail
 
 
 @router.put('/{article_id}', response_model=schemas.ArticleResponse)
-def update_article(article_id: int, article_in: schemas.ArticleCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    article = db.get(models.Article, article_id)
+async def update_article(article_id: int, article_in: schemas.ArticleCreate, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    article = await db.get(models.Article, article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Article not found')
     article.title = article_in.title
@@ -62,17 +163,20 @@ def update_article(article_id: int, article_in: schemas.ArticleCreate, db: Sessi
     article.tags = article_in.tags
     article.content = article_in.content
     article.status = article_in.status
-    db.commit()
-    db.refresh(article)
+    await bump_version(db, ARTICLES)
+    await db.commit()
+    invalidate_article_totals()
+    await db.refresh(article)
     return article
 
 
 @router.delete('/{article_id}')
-def delete_article(article_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    article = db.get(models.Article, article_id)
+async def delete_article(article_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    article = await db.get(models.Article, article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Article not found')
-    db.delete(article)
-    db.commit()
+    await db.delete(article)
+    await bump_version(db, ARTICLES)
+    await db.commit()
+    invalidate_article_totals()
     return {'status': 'deleted'}
-
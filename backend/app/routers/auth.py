@@ -1,37 +1,58 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas
-from ..auth import hash_password, verify_password, create_access_token
-from ..database import get_db
+from ..auth import PasswordHasherBusy, hash_password_async, verify_and_update_async, create_access_token
+from ..database import get_async_db
 
 router = APIRouter(prefix='/api/auth', tags=['auth'])
 
+HASHER_BUSY = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail='Authentication service is busy, please retry',
+    headers={'Retry-After': '1'},
+)
+
 
 @router.post('/register', response_model=schemas.UserResponse)
-def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    if db.query(models.User).filter(models.User.email == user_in.email).first():
+async def register(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.execute(select(models.User.id).where(models.User.email == user_in.email))
+    if existing.first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Email already registered')
+    try:
+        password_hash = await hash_password_async(user_in.password)
+    except PasswordHasherBusy as exc:
+        raise HASHER_BUSY from exc
     user = models.User(
         email=user_in.email,
-        password_hash=hash_password(user_in.password),
+        password_hash=password_hash,
         name=user_in.name,
         birth_date=user_in.birth_date,
         birth_time=user_in.birth_time,
         birth_place=user_in.birth_place
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post('/login', response_model=schemas.Token)
-def login(login_req: schemas.LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == login_req.email).first()
-    if not user or not verify_password(login_req.password, user.password_hash):
+async def login(login_req: schemas.LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(models.User).where(models.User.email == login_req.email))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Incorrect email or password')
+    try:
+        verified, new_hash = await verify_and_update_async(login_req.password, user.password_hash)
+    except PasswordHasherBusy as exc:
+        raise HASHER_BUSY from exc
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Incorrect email or password')
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
     token = create_access_token(user_id=user.id, email=user.email, expires_delta=timedelta(minutes=60))
     return schemas.Token(access_token=token)
-
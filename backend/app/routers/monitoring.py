@@ -0,0 +1,91 @@
+import logging
+from typing import Iterable, List
+
+import anyio.to_thread
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import password_hasher
+from ..database import async_engine, engine, get_async_db
+from ..metrics import CONTENT_TYPE, REGISTRY, Family, gauge_family
+from ..services.cache import all_caches
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=['monitoring'])
+
+
+def _threadpool_families() -> List[Family]:
+    # The limiter is per event loop, so this must run on the loop serving the scrape.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return [
+        gauge_family('astro_threadpool_busy', 'Worker threads running sync endpoints or to_thread calls.',
+                     [({}, limiter.borrowed_tokens)]),
+        gauge_family('astro_threadpool_size', 'Worker thread limit.', [({}, limiter.total_tokens)]),
+        gauge_family('astro_threadpool_queued', 'Calls waiting for a free worker thread.',
+                     [({}, limiter.statistics().tasks_waiting)]),
+    ]
+
+
+def _pool_families() -> List[Family]:
+    pools = {'sync': engine.pool, 'async': async_engine.sync_engine.pool}
+    checked_out, overflow, size = [], [], []
+    for name, pool in pools.items():
+        # NullPool and StaticPool (SQLite defaults in some setups) expose no counters.
+        if hasattr(pool, 'checkedout'):
+            checked_out.append(({'engine': name}, pool.checkedout()))
+            overflow.append(({'engine': name}, pool.overflow()))
+            size.append(({'engine': name}, pool.size()))
+    return [
+        gauge_family('astro_db_pool_checked_out', 'Connections currently checked out of the pool.', checked_out),
+        gauge_family('astro_db_pool_overflow', 'Connections open beyond the pool size (negative: unused slots).',
+                     overflow),
+        gauge_family('astro_db_pool_size', 'Configured pool size.', size),
+    ]
+
+
+def _cache_families() -> List[Family]:
+    stats = [cache.stats() for cache in all_caches()]
+
+    def values(key: str) -> Iterable:
+        return [({'cache': entry['name']}, entry[key]) for entry in stats]
+
+    return [
+        gauge_family('astro_cache_entries', 'Entries held by each in-process cache.', values('size')),
+        gauge_family('astro_cache_max_entries', 'Capacity of each in-process cache.', values('maxsize')),
+        gauge_family('astro_cache_hits_total', 'Cache lookups that found a live entry.', values('hits'), 'counter'),
+        gauge_family('astro_cache_misses_total', 'Cache lookups that found nothing or an expired entry.',
+                     values('misses'), 'counter'),
+        gauge_family('astro_cache_evictions_total', 'Entries dropped to stay within capacity.',
+                     values('evictions'), 'counter'),
+    ]
+
+
+def _password_hasher_families() -> List[Family]:
+    return [
+        gauge_family('astro_password_hash_pending', 'Hashing jobs running or queued in the process pool.',
+                     [({}, password_hasher.pending)]),
+        gauge_family('astro_password_hash_max_pending', 'Admission limit of the hashing pool.',
+                     [({}, password_hasher.max_pending)]),
+    ]
+
+
+for _collector in (_threadpool_families, _pool_families, _cache_families, _password_hasher_families):
+    REGISTRY.register_collector(_collector)
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics():
+    # Async on purpose: rendering is cheap and must not wait behind a busy threadpool.
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@router.get('/api/health/ready')
+async def readiness(db: AsyncSession = Depends(get_async_db)):
+    try:
+        await db.execute(text('SELECT 1'))
+    except (SQLAlchemyError, OSError) as exc:
+        logger.warning('Readiness check failed: %s', exc)
+        raise HTTPException(status_code=503, detail='Database unavailable') from exc
+    return {'status': 'ready'}
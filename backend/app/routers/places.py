@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Query, Response
+
+from .. import schemas
+from ..services.gazetteer import get_gazetteer
+
+router = APIRouter(prefix='/api/places', tags=['places'])
+
+# The gazetteer only changes on deploy, so browsers may keep suggestions for a day.
+PLACES_CACHE_CONTROL = 'public, max-age=86400'
+
+
+@router.get('', response_model=list[schemas.PlaceResponse])
+def autocomplete_places(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=20),
+):
+    response.headers['Cache-Control'] = PLACES_CACHE_CONTROL
+    return get_gazetteer().complete(q, limit)
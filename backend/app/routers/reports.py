@@ -1,77 +1,152 @@
+import random
 from datetime import datetime
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas
-from ..database import get_db
+from ..conditional import Validator, apply_validator, is_not_modified, make_validator, not_modified
+from ..database import get_async_db
 from ..dependencies import get_current_user
-from ..services.reports import generate_astrology_report, generate_zodiac_report
-from ..services.astro_utils import western_zodiac, chinese_zodiac, five_element_by_year
+from ..responses import json_array, raw_json_response
+from ..services.exports import NDJSON, ReportKind, export_filename, stream_reports
+from ..services.reports import (
+    DAILY,
+    REPORT_HISTORY_MAX,
+    astrology_record,
+    astrology_report_for,
+    astrology_response,
+    daily_report_cache,
+    find_daily_report,
+    astrology_report_json,
+    latest_report_rows_query,
+    seconds_until_day_ends,
+    zodiac_record,
+    zodiac_report_for,
+    zodiac_report_json,
+    zodiac_response,
+)
 
 router = APIRouter(prefix='/api/reports', tags=['reports'])
 
 
+async def _history_validator(db: AsyncSession, model, user_id: int, limit: int) -> Validator:
+    # Reports are append-only, so the newest timestamp plus the row count
+    # identifies a user's history; both come straight from the
+    # (user_id, generated_at) index.
+    result = await db.execute(
+        select(func.max(model.generated_at), func.count(model.id)).where(model.user_id == user_id)
+    )
+    latest, count = result.one()
+    return make_validator(model.__tablename__, user_id, limit, latest, count, last_modified=latest, private=True)
+
+
 @router.post('/astrology', response_model=schemas.AstrologyReportResponse)
-def create_astrology_report(report_type: str = 'daily', db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    sign = western_zodiac(current_user.birth_date)
-    payload = generate_astrology_report(
-        sign=sign,
-        sun=f'{sign} {datetime.utcnow().day}°',
-        moon='双鱼座 02°',
-        rising='双子座 11°'
+async def create_astrology_report(
+    report_type: str = DAILY,
+    regenerate: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    now = datetime.utcnow()
+    today = now.date()
+    # Daily reports are idempotent: the first request of the day generates a
+    # deterministic report, later ones return it. regenerate=true always writes
+    # a fresh, randomly drawn report.
+    reuse_daily = report_type == DAILY and not regenerate
+    cache_key = (current_user.id, today)
+    if reuse_daily:
+        cached = daily_report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        existing = await find_daily_report(db, current_user.id, today)
+        if existing:
+            response = astrology_response(existing)
+            daily_report_cache.set(cache_key, response, ttl=seconds_until_day_ends(today))
+            return response
+
+    rendered = astrology_report_for(
+        current_user.id,
+        current_user.birth_date,
+        current_user.birth_time,
+        current_user.birth_place,
+        today,
+        rng=None if reuse_daily else random.Random(),
     )
 
-    report_payload = payload.model_dump(mode='json')
     report = models.AstrologyReport(
         user_id=current_user.id,
         report_type=report_type,
-        payload=report_payload,
+        generated_at=now,
+        **astrology_record(rendered),
     )
     db.add(report)
-    db.commit()
-    db.refresh(report)
-    return report
+    await db.commit()
+    response = astrology_response(report)
+    if report_type == DAILY:
+        daily_report_cache.set(cache_key, response, ttl=seconds_until_day_ends(today))
+    return response
 
 
 @router.post('/zodiac', response_model=schemas.ZodiacReportResponse)
-def create_zodiac_report(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    year = datetime.utcnow().year
-    zodiac = chinese_zodiac(current_user.birth_date.year)
-    element = five_element_by_year(current_user.birth_date.year)
-    payload = generate_zodiac_report(zodiac=zodiac, element=element, year=year)
+async def create_zodiac_report(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    now = datetime.utcnow()
+    year = now.year
+    rendered = zodiac_report_for(current_user.birth_date, year)
 
-    report_payload = payload.model_dump(mode='json')
     report = models.ZodiacReport(
         user_id=current_user.id,
         year=year,
-        payload=report_payload,
+        generated_at=now,
+        **zodiac_record(rendered),
     )
     db.add(report)
-    db.commit()
-    db.refresh(report)
-    return report
+    await db.commit()
+    return zodiac_response(report)
 
 
 @router.get('/astrology/latest', response_model=list[schemas.AstrologyReportResponse])
-def list_astrology_reports(limit: int = 5, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    records = (
-        db.query(models.AstrologyReport)
-        .filter(models.AstrologyReport.user_id == current_user.id)
-        .order_by(models.AstrologyReport.generated_at.desc())
-        .limit(limit)
-        .all()
-    )
-    return records
+async def list_astrology_reports(
+    request: Request,
+    limit: int = Query(5, ge=1, le=REPORT_HISTORY_MAX),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    validator = await _history_validator(db, models.AstrologyReport, current_user.id, limit)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    result = await db.execute(latest_report_rows_query(models.AstrologyReport, current_user.id, limit))
+    body = raw_json_response(json_array(astrology_report_json(row) for row in result))
+    apply_validator(body, validator)
+    return body
 
 
 @router.get('/zodiac/latest', response_model=list[schemas.ZodiacReportResponse])
-def list_zodiac_reports(limit: int = 5, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    records = (
-        db.query(models.ZodiacReport)
-        .filter(models.ZodiacReport.user_id == current_user.id)
-        .order_by(models.ZodiacReport.generated_at.desc())
-        .limit(limit)
-        .all()
-    )
-    return records
+async def list_zodiac_reports(
+    request: Request,
+    limit: int = Query(5, ge=1, le=REPORT_HISTORY_MAX),
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    validator = await _history_validator(db, models.ZodiacReport, current_user.id, limit)
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    result = await db.execute(latest_report_rows_query(models.ZodiacReport, current_user.id, limit))
+    body = raw_json_response(json_array(zodiac_report_json(row) for row in result))
+    apply_validator(body, validator)
+    return body
 
+
+@router.get('/{kind}/export', response_class=StreamingResponse)
+async def export_reports(
+    kind: ReportKind,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Full report history as NDJSON, newest first; use this instead of large ``latest`` limits."""
+    return StreamingResponse(
+        stream_reports(db.bind, kind, user_id=current_user.id),
+        media_type=NDJSON,
+        headers={'Content-Disposition': f'attachment; filename="{export_filename(kind)}"'},
+    )
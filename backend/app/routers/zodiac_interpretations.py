@@ -1,47 +1,52 @@
-from sqlalchemy import func
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import models, schemas
-from ..database import get_db
+from ..conditional import is_not_modified, not_modified
+from ..database import get_async_db
 from ..dependencies import get_current_user
+from ..services.interpretations import interpretation_registry
 
 router = APIRouter(prefix='/api/zodiac-interpretations', tags=['zodiac'])
 
 
-@router.get('', response_model=list[schemas.ZodiacInterpretationResponse])
-def list_interpretations(db: Session = Depends(get_db)):
-    records = (
-        db.query(models.ZodiacInterpretation)
-        .order_by(models.ZodiacInterpretation.id)
-        .all()
+async def _get_by_sign(db: AsyncSession, sign: str):
+    result = await db.execute(
+        select(models.ZodiacInterpretation)
+        .where(models.ZodiacInterpretation.sign == sign.strip().lower())
     )
-    return records
+    return result.scalars().first()
+
+
+@router.get('', response_model=list[schemas.ZodiacInterpretationResponse])
+async def list_interpretations(request: Request, db: AsyncSession = Depends(get_async_db)):
+    await interpretation_registry.ensure_loaded(db)
+    body, validator = interpretation_registry.list_body()
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    return Response(content=body, media_type='application/json', headers=validator.headers())
 
 
 @router.get('/{sign}', response_model=schemas.ZodiacInterpretationResponse)
-def get_interpretation(sign: str, db: Session = Depends(get_db)):
-    record = (
-        db.query(models.ZodiacInterpretation)
-        .filter(func.lower(models.ZodiacInterpretation.sign) == sign.lower())
-        .first()
-    )
-    if not record:
+async def get_interpretation(sign: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    await interpretation_registry.ensure_loaded(db)
+    entry = interpretation_registry.get_body(sign)
+    if entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Interpretation not found')
-    return record
+    body, validator = entry
+    if is_not_modified(request, validator):
+        return not_modified(validator)
+    return Response(content=body, media_type='application/json', headers=validator.headers())
 
 
 @router.post('', response_model=schemas.ZodiacInterpretationResponse, status_code=status.HTTP_201_CREATED)
-def create_interpretation(
+async def create_interpretation(
     payload: schemas.ZodiacInterpretationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    existing = (
-        db.query(models.ZodiacInterpretation)
-        .filter(func.lower(models.ZodiacInterpretation.sign) == payload.sign.lower())
-        .first()
-    )
+    existing = await _get_by_sign(db, payload.sign)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Interpretation already exists')
     record = models.ZodiacInterpretation(
@@ -60,23 +65,20 @@ def create_interpretation(
         lucky_color=payload.lucky_color,
     )
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
+    interpretation_registry.upsert(record)
     return record
 
 
 @router.put('/{sign}', response_model=schemas.ZodiacInterpretationResponse)
-def update_interpretation(
+async def update_interpretation(
     sign: str,
     payload: schemas.ZodiacInterpretationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    record = (
-        db.query(models.ZodiacInterpretation)
-        .filter(func.lower(models.ZodiacInterpretation.sign) == sign.lower())
-        .first()
-    )
+    record = await _get_by_sign(db, sign)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Interpretation not found')
 
@@ -93,6 +95,7 @@ def update_interpretation(
     record.mantra = payload.mantra
     record.lucky_color = payload.lucky_color
 
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
+    interpretation_registry.upsert(record)
     return record
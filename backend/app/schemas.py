@@ -105,6 +105,53 @@ class ArticleResponse(ArticleBase):
         from_attributes = True
 
 
+class RelatedArticle(BaseModel):
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str]
+    cover_url: Optional[str]
+    published_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ArticleDetail(ArticleResponse):
+    related: List[RelatedArticle] = []
+
+
+class ArticlePage(BaseModel):
+    items: List[ArticleResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+
+class ArticleSearchHit(BaseModel):
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str]
+    published_at: Optional[datetime]
+    score: float
+    title_highlight: str
+    snippet: str
+
+    class Config:
+        from_attributes = True
+
+
+class ArticleSearchPage(BaseModel):
+    query: str
+    items: List[ArticleSearchHit]
+    next_offset: Optional[int] = None
+
+
 class ZodiacInterpretationBase(BaseModel):
     title: str
     date_range: str
@@ -136,3 +183,15 @@ class ZodiacInterpretationResponse(ZodiacInterpretationBase):
     class Config:
         from_attributes = True
 
+
+
+class PlaceResponse(BaseModel):
+    name: str
+    name_en: str
+    country: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+    class Config:
+        from_attributes = True
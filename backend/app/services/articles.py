@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import get_settings
+from .cache import TTLCache
+
+settings = get_settings()
+
+ARTICLE_PAGE_MAX = 50
+
+# ArticleResponse's fields, selected as plain columns by the list endpoint.
+ARTICLE_LIST_COLUMNS = (
+    models.Article.id,
+    models.Article.title,
+    models.Article.slug,
+    models.Article.summary,
+    models.Article.cover_url,
+    models.Article.tags,
+    models.Article.content,
+    models.Article.status,
+    models.Article.published_at,
+)
+
+# COUNT(*) over published articles, shared by every list request until a write
+# through this process invalidates it or the TTL bounds staleness from others.
+article_totals: TTLCache[int] = TTLCache('article_totals', 8, settings.article_total_cache_ttl_seconds)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(published_at: datetime, article_id: int) -> str:
+    raw = json.dumps([published_at.isoformat(), article_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        published_at, article_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(published_at), int(article_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def published_page_query(
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    tag: Optional[str] = None,
+    columns: Sequence[Any] = (models.Article,),
+) -> Select:
+    """Keyset page of published articles; matches ix_articles_status_published.
+
+    With ``tag``, articles are restricted through ``article_tags`` (via
+    ix_article_tags_tag_article) rather than by decoding the JSON column.
+    """
+    query = (
+        select(*columns)
+        .select_from(models.Article)
+        .where(models.Article.status == 'published')
+        .order_by(models.Article.published_at.desc(), models.Article.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(models.Article.published_at, models.Article.id) < tuple_(*after))
+    if tag is not None:
+        query = query.join(models.ArticleTag, models.ArticleTag.article_id == models.Article.id).where(
+            models.ArticleTag.tag == tag
+        )
+    return query
+
+
+async def published_article_total(db: AsyncSession) -> int:
+    total: Optional[int] = article_totals.get('published')
+    if total is None:
+        result = await db.execute(
+            select(func.count()).select_from(models.Article).where(models.Article.status == 'published')
+        )
+        total = int(result.scalar_one())
+        article_totals.set('published', total)
+    return total
+
+
+def article_list_item(row: Any) -> Dict[str, Any]:
+    """An ``ARTICLE_LIST_COLUMNS`` row as the ArticleResponse dict, ready for the JSON encoder."""
+    item = dict(row._mapping)
+    item['tags'] = item['tags'] or []
+    return item
+
+
+def invalidate_article_totals() -> None:
+    article_totals.pop('published')
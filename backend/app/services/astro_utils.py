@@ -1,35 +1,145 @@
+"""Sun sign and Chinese zodiac classification from precomputed per-year tables.
+
+Tables cover 1900–2100 and are derived from the Sun's actual ingress times
+(every 15° of ecliptic longitude, i.e. the 24 solar terms) rather than fixed
+month/day boundaries, which drift by a day across years:
+
+* ``sun_signs[year, day_of_year]`` is the sign the Sun occupies at local noon;
+* ``lichun[year]`` is the day of year of 立春 (315°), where the Chinese
+  zodiac year begins.
+
+Both are in China Standard Time. Scalar helpers are O(1) table reads and
+:func:`classify_birth_dates` does the same for whole ``datetime64`` arrays.
+Dates outside the tables fall back to the ephemeris (sun sign) or 4 February
+(立春).
+"""
+from dataclasses import dataclass
 from datetime import date
+from functools import lru_cache
 
+import numpy as np
 
-WESTERN_SIGNS = [
-    ((1, 20), '摩羯座'),
-    ((2, 19), '水瓶座'),
-    ((3, 21), '双鱼座'),
-    ((4, 20), '白羊座'),
-    ((5, 21), '金牛座'),
-    ((6, 22), '双子座'),
-    ((7, 23), '巨蟹座'),
-    ((8, 23), '狮子座'),
-    ((9, 24), '处女座'),
-    ((10, 24), '天秤座'),
-    ((11, 23), '天蝎座'),
-    ((12, 22), '射手座'),
-    ((12, 32), '摩羯座')
-]
+from .ephemeris import ECLIPTIC_SIGNS, julian_day, sun_longitude
 
 CHINESE_ZODIAC = ['猴', '鸡', '狗', '猪', '鼠', '牛', '虎', '兔', '龙', '蛇', '马', '羊']
 FIVE_ELEMENTS = ['木', '火', '土', '金', '水']
 
+TABLE_FIRST_YEAR = 1900
+TABLE_LAST_YEAR = 2100
+REFERENCE_UTC_OFFSET_HOURS = 8
+LICHUN_TERM = 21  # 315° / 15°
+_FALLBACK_LICHUN_DAY = 34  # 4 February
+_TROPICAL_YEAR = 365.242189
+_MARCH_EQUINOX_2000 = 2451623.816
+_SUN_DEGREES_PER_DAY = 0.98565
+
+_SIGN_NAMES = np.array(ECLIPTIC_SIGNS)
+_ZODIAC_NAMES = np.array(CHINESE_ZODIAC)
+_ELEMENT_NAMES = np.array(FIVE_ELEMENTS)
+
+
+@dataclass(frozen=True)
+class SignTables:
+    sun_signs: np.ndarray  # (years, 366) uint8 index into ECLIPTIC_SIGNS
+    lichun: np.ndarray  # (years,) int16 day of year, 0-based
+
+
+def solar_terms(first_year: int, last_year: int) -> tuple[np.ndarray, np.ndarray]:
+    """Julian Days of every 15° solar longitude crossing, in order, and the term index (0 = 0° Aries)."""
+    years = np.repeat(np.arange(first_year, last_year + 1), 24)
+    targets = np.tile(np.arange(24) * 15.0, last_year - first_year + 1)
+    jd = _MARCH_EQUINOX_2000 + _TROPICAL_YEAR * (years - 2000 + targets / 360.0)
+    for _ in range(6):
+        error = np.mod(sun_longitude(jd) - targets + 180.0, 360.0) - 180.0
+        jd = jd - error / _SUN_DEGREES_PER_DAY
+    return jd, (np.arange(len(jd)) % 24).astype(np.uint8)
+
+
+def _local_days(jd: np.ndarray) -> np.ndarray:
+    seconds = np.round((jd - julian_day(np.datetime64('1970-01-01T00:00:00'))) * 86400).astype(np.int64)
+    local = seconds.astype('datetime64[s]') + np.timedelta64(REFERENCE_UTC_OFFSET_HOURS, 'h')
+    return local.astype('datetime64[D]')
+
+
+def _split_dates(days: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    year_start = days.astype('datetime64[Y]')
+    years = year_start.astype(np.int64) + 1970
+    return years, (days - year_start.astype('datetime64[D]')).astype(np.int64)
+
+
+def _noon_julian_days(days: np.ndarray) -> np.ndarray:
+    return julian_day(days.astype('datetime64[s]') + np.timedelta64(12 - REFERENCE_UTC_OFFSET_HOURS, 'h'))
+
+
+@lru_cache()
+def sign_tables() -> SignTables:
+    # Solar terms from the year before, so early January falls after a known ingress.
+    term_jd, term_index = solar_terms(TABLE_FIRST_YEAR - 1, TABLE_LAST_YEAR)
+
+    days = np.arange(np.datetime64(f'{TABLE_FIRST_YEAR}-01-01'), np.datetime64(f'{TABLE_LAST_YEAR + 1}-01-01'))
+    years, day_of_year = _split_dates(days)
+    current_term = term_index[np.searchsorted(term_jd, _noon_julian_days(days), side='right') - 1]
+    sun_signs = np.full((TABLE_LAST_YEAR - TABLE_FIRST_YEAR + 1, 366), 255, dtype=np.uint8)
+    sun_signs[years - TABLE_FIRST_YEAR, day_of_year] = current_term // 2
+
+    lichun_years, lichun_days = _split_dates(_local_days(term_jd[term_index == LICHUN_TERM]))
+    in_range = (lichun_years >= TABLE_FIRST_YEAR) & (lichun_years <= TABLE_LAST_YEAR)
+    lichun = np.empty(TABLE_LAST_YEAR - TABLE_FIRST_YEAR + 1, dtype=np.int16)
+    lichun[lichun_years[in_range] - TABLE_FIRST_YEAR] = lichun_days[in_range]
+
+    sun_signs.setflags(write=False)
+    lichun.setflags(write=False)
+    return SignTables(sun_signs=sun_signs, lichun=lichun)
+
+
+def sun_sign_indices(days) -> np.ndarray:
+    """Index into ``ECLIPTIC_SIGNS`` for each ``datetime64`` birth date."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    years, day_of_year = _split_dates(days)
+    in_table = (years >= TABLE_FIRST_YEAR) & (years <= TABLE_LAST_YEAR)
+    rows = np.clip(years - TABLE_FIRST_YEAR, 0, TABLE_LAST_YEAR - TABLE_FIRST_YEAR)
+    indices = sign_tables().sun_signs[rows, day_of_year]
+    if not in_table.all():
+        outside = ~in_table
+        indices = indices.copy()
+        indices[outside] = (sun_longitude(_noon_julian_days(days[outside])) // 30).astype(np.uint8)
+    return indices
+
+
+def lunar_years(days) -> np.ndarray:
+    """Chinese zodiac year (starting at 立春) for each ``datetime64`` birth date."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    years, day_of_year = _split_dates(days)
+    in_table = (years >= TABLE_FIRST_YEAR) & (years <= TABLE_LAST_YEAR)
+    rows = np.clip(years - TABLE_FIRST_YEAR, 0, TABLE_LAST_YEAR - TABLE_FIRST_YEAR)
+    lichun = np.where(in_table, sign_tables().lichun[rows], _FALLBACK_LICHUN_DAY)
+    return years - (day_of_year < lichun)
+
+
+def classify_birth_dates(days) -> dict[str, np.ndarray]:
+    """Sun sign, Chinese zodiac and element names for an array of birth dates."""
+    years = lunar_years(days)
+    return {
+        'sign': _SIGN_NAMES[sun_sign_indices(days)],
+        'zodiac': _ZODIAC_NAMES[years % 12],
+        'element': _ELEMENT_NAMES[((years - 4) % 10) // 2],
+    }
+
 
 def western_zodiac(birth_date: date) -> str:
-    month = birth_date.month
-    day = birth_date.day
-    prev = '摩羯座'
-    for boundary, sign in WESTERN_SIGNS:
-        if (month, day) < boundary:
-            return prev
-        prev = sign
-    return '摩羯座'
+    year = birth_date.year
+    if TABLE_FIRST_YEAR <= year <= TABLE_LAST_YEAR:
+        return ECLIPTIC_SIGNS[sign_tables().sun_signs[year - TABLE_FIRST_YEAR, birth_date.timetuple().tm_yday - 1]]
+    return ECLIPTIC_SIGNS[int(sun_sign_indices(np.array([birth_date], dtype='datetime64[D]'))[0])]
+
+
+def lunar_year(birth_date: date) -> int:
+    year = birth_date.year
+    if TABLE_FIRST_YEAR <= year <= TABLE_LAST_YEAR:
+        lichun = sign_tables().lichun[year - TABLE_FIRST_YEAR]
+    else:
+        lichun = _FALLBACK_LICHUN_DAY
+    return year - (birth_date.timetuple().tm_yday - 1 < lichun)
 
 
 def chinese_zodiac(year: int) -> str:
@@ -38,13 +148,4 @@ def chinese_zodiac(year: int) -> str:
 
 def five_element_by_year(year: int) -> str:
     # 定义纳音五行（简化版：根据 Heavenly Stem 取元素）
-    stem = (year - 4) % 10
-    mapping = {
-        0: '木', 1: '木',
-        2: '火', 3: '火',
-        4: '土', 5: '土',
-        6: '金', 7: '金',
-        8: '水', 9: '水'
-    }
-    return mapping[stem]
-
+    return FIVE_ELEMENTS[((year - 4) % 10) // 2]
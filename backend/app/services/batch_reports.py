@@ -0,0 +1,205 @@
+"""Nightly bulk generation of daily astrology and yearly zodiac reports.
+
+Users are streamed in id order with ``yield_per`` so memory stays flat no
+matter how many there are. Each chunk is rendered in a worker process and
+written back with two bulk INSERTs plus a checkpoint update in one
+transaction, so a crashed run resumes after the last committed user id.
+Daily reports use the same seeded draw as the API, which makes batch rows
+indistinguishable from ones a user would have generated themselves.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
+
+from .. import models
+from .executors import InlineExecutor
+from .reports import (
+    DAILY,
+    astrology_record,
+    astrology_report_for,
+    charts_for,
+    day_bounds,
+    zodiac_record,
+    zodiac_report_for,
+)
+
+logger = logging.getLogger(__name__)
+
+UserRow = Tuple[int, date, Optional[dt_time], Optional[str]]
+Rows = List[Dict[str, Any]]
+
+
+@dataclass
+class JobStats:
+    users: int = 0
+    astrology_written: int = 0
+    zodiac_written: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    resumed_after: int = 0
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.elapsed if self.elapsed else 0.0
+
+
+def job_key(day: date) -> str:
+    return f'nightly-reports:{day.isoformat()}'
+
+
+def report_timestamp(day: date) -> datetime:
+    """Now if it falls on ``day``; otherwise the start of ``day`` (pre-generation or backfill)."""
+    start, end = day_bounds(day)
+    now = datetime.utcnow()
+    return now if start <= now < end else start
+
+
+def render_chunk(
+    users: Sequence[UserRow], day: date, skip_astrology: Set[int], skip_zodiac: Set[int]
+) -> Tuple[int, int, Rows, Rows]:
+    """Worker entry point: render one chunk into insert-ready rows."""
+    generated_at = report_timestamp(day)
+    astrology_rows: Rows = []
+    zodiac_rows: Rows = []
+    # Charts for the whole chunk come out of one vectorized ephemeris pass.
+    charts = charts_for([birth for _, *birth in users])
+    for (user_id, birth_date, birth_time, birth_place), chart in zip(users, charts):
+        if user_id not in skip_astrology:
+            rendered = astrology_report_for(user_id, birth_date, birth_time, birth_place, day, chart=chart)
+            astrology_rows.append({
+                'user_id': user_id,
+                'report_type': DAILY,
+                'generated_at': generated_at,
+                **astrology_record(rendered),
+            })
+        if user_id not in skip_zodiac:
+            rendered = zodiac_report_for(birth_date, day.year)
+            zodiac_rows.append({
+                'user_id': user_id,
+                'year': day.year,
+                'generated_at': generated_at,
+                **zodiac_record(rendered),
+            })
+    return users[-1][0], len(users), astrology_rows, zodiac_rows
+
+
+def _existing_reports(engine: Engine, first_id: int, last_id: int, day: date) -> Tuple[Set[int], Set[int]]:
+    start, end = day_bounds(day)
+    in_chunk = lambda model: model.user_id.between(first_id, last_id)  # noqa: E731
+    with engine.connect() as conn:
+        astrology = conn.execute(
+            select(models.AstrologyReport.user_id).where(
+                in_chunk(models.AstrologyReport),
+                models.AstrologyReport.generated_at >= start,
+                models.AstrologyReport.generated_at < end,
+                models.AstrologyReport.report_type == DAILY,
+            )
+        ).scalars()
+        zodiac = conn.execute(
+            select(models.ZodiacReport.user_id).where(
+                in_chunk(models.ZodiacReport), models.ZodiacReport.year == day.year
+            )
+        ).scalars()
+        return set(astrology), set(zodiac)
+
+
+def _load_checkpoint(engine: Engine, key: str) -> int:
+    with engine.begin() as conn:
+        last_user_id = conn.execute(
+            select(models.ReportJobCheckpoint.last_user_id).where(models.ReportJobCheckpoint.job_key == key)
+        ).scalar()
+        if last_user_id is None:
+            conn.execute(insert(models.ReportJobCheckpoint).values(job_key=key, last_user_id=0, users_processed=0))
+            return 0
+        return last_user_id
+
+
+def _write_chunk(engine: Engine, key: str, result: Tuple[int, int, Rows, Rows], stats: JobStats) -> None:
+    last_user_id, user_count, astrology_rows, zodiac_rows = result
+    checkpoint = models.ReportJobCheckpoint
+    with engine.begin() as conn:
+        if astrology_rows:
+            conn.execute(insert(models.AstrologyReport), astrology_rows)
+        if zodiac_rows:
+            conn.execute(insert(models.ZodiacReport), zodiac_rows)
+        conn.execute(
+            update(checkpoint)
+            .where(checkpoint.job_key == key)
+            .values(
+                last_user_id=last_user_id,
+                users_processed=checkpoint.users_processed + user_count,
+                updated_at=datetime.utcnow(),
+            )
+        )
+    stats.users += user_count
+    stats.astrology_written += len(astrology_rows)
+    stats.zodiac_written += len(zodiac_rows)
+    stats.chunks += 1
+
+
+def run_nightly_reports(
+    engine: Engine,
+    day: date,
+    *,
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+    progress_every: int = 50,
+) -> JobStats:
+    """Ensure every user has ``day``'s daily astrology report and a zodiac report for its year."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if engine.dialect.name == 'sqlite':
+        # WAL lets the streaming reader stay open while chunks are committed.
+        with engine.connect() as conn:
+            conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+
+    key = job_key(day)
+    stats = JobStats(resumed_after=_load_checkpoint(engine, key))
+    executor: Executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else InlineExecutor()
+    max_in_flight = max(workers, 1) * 2
+    in_flight: deque[Future] = deque()
+    started = time.perf_counter()
+
+    def drain(limit: int) -> None:
+        # Results are written strictly in submission order so the checkpoint
+        # never runs ahead of an uncommitted chunk.
+        while len(in_flight) > limit:
+            _write_chunk(engine, key, in_flight.popleft().result(), stats)
+            if stats.chunks % progress_every == 0:
+                stats.elapsed = time.perf_counter() - started
+                logger.info('%s: %d users, %.0f users/sec', key, stats.users, stats.users_per_second)
+
+    try:
+        with engine.connect() as reader:
+            result = reader.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                select(models.User.id, models.User.birth_date, models.User.birth_time, models.User.birth_place)
+                .where(models.User.id > stats.resumed_after)
+                .order_by(models.User.id)
+            )
+            for partition in result.partitions():
+                users = [tuple(row) for row in partition]
+                skip_astrology, skip_zodiac = _existing_reports(engine, users[0][0], users[-1][0], day)
+                in_flight.append(executor.submit(render_chunk, users, day, skip_astrology, skip_zodiac))
+                drain(max_in_flight)
+        drain(0)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    with engine.begin() as conn:
+        conn.execute(
+            update(models.ReportJobCheckpoint)
+            .where(models.ReportJobCheckpoint.job_key == key)
+            .values(completed_at=datetime.utcnow())
+        )
+    stats.elapsed = time.perf_counter() - started
+    return stats
@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 from typing import Iterable
 
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from slugify import slugify
+from sqlalchemy import Engine, insert, inspect, select, update
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from .. import models
+from ..database import Base
+# Imported for their side effects: the FTS DDL listener and the Article mapper
+# events that index seeded articles. The CLI reaches init_database without
+# importing app.main, so nothing else would register them on that path.
+from . import related, search, tags  # noqa: F401
+from .versions import ARTICLES, bump_version_sync
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+MIGRATIONS = BACKEND_ROOT / 'migrations'
 
 
 ZODIAC_INTERPRETATIONS: list[dict[str, object]] = [
@@ -257,49 +276,58 @@ MYSTIC_ARTICLES: list[dict[str, object]] = [
 ]
 
 
+INTERPRETATION_FIELDS = (
+    'title', 'date_range', 'element', 'modality', 'keywords', 'summary',
+    'love', 'career', 'wellbeing', 'ritual', 'mantra', 'lucky_color',
+)
+SEED_NAME = 'bootstrap'
+
+
 def _upsert_interpretations(db: Session, entries: Iterable[dict[str, object]]) -> None:
-    for entry in entries:
-        record = (
-            db.query(models.ZodiacInterpretation)
-            .filter(models.ZodiacInterpretation.sign == entry['sign'])
-            .first()
+    entries = list(entries)
+    existing = {
+        row.sign: row
+        for row in db.execute(
+            select(models.ZodiacInterpretation.id, models.ZodiacInterpretation.sign, *(
+                getattr(models.ZodiacInterpretation, field) for field in INTERPRETATION_FIELDS
+            )).where(models.ZodiacInterpretation.sign.in_([entry['sign'] for entry in entries]))
         )
-        if record:
-            record.title = entry['title']  # type: ignore[assignment]
-            record.date_range = entry['date_range']  # type: ignore[assignment]
-            record.element = entry['element']  # type: ignore[assignment]
-            record.modality = entry['modality']  # type: ignore[assignment]
-            record.keywords = entry['keywords']  # type: ignore[assignment]
-            record.summary = entry['summary']  # type: ignore[assignment]
-            record.love = entry['love']  # type: ignore[assignment]
-            record.career = entry['career']  # type: ignore[assignment]
-            record.wellbeing = entry['wellbeing']  # type: ignore[assignment]
-            record.ritual = entry['ritual']  # type: ignore[assignment]
-            record.mantra = entry['mantra']  # type: ignore[assignment]
-            record.lucky_color = entry['lucky_color']  # type: ignore[assignment]
-        else:
-            db.add(models.ZodiacInterpretation(**entry))
+    }
+    inserts, updates = [], []
+    for entry in entries:
+        row = existing.get(entry['sign'])
+        if row is None:
+            inserts.append(entry)
+        elif any(getattr(row, field) != entry[field] for field in INTERPRETATION_FIELDS):
+            updates.append({'id': row.id, **{field: entry[field] for field in INTERPRETATION_FIELDS}})
+    if inserts:
+        db.execute(insert(models.ZodiacInterpretation), inserts)
+    if updates:
+        db.execute(update(models.ZodiacInterpretation), updates)
 
 
 def _ensure_articles(db: Session, entries: Iterable[dict[str, object]]) -> None:
-    for entry in entries:
-        slug = slugify(entry['title'])
-        article = db.query(models.Article).filter(models.Article.slug == slug).first()
-        if article:
-            continue
-        published_at = datetime.utcnow() - timedelta(days=int(entry.get('days_ago', 0)))
-        db.add(
-            models.Article(
-                title=entry['title'],
-                slug=slug,
-                summary=entry.get('summary'),
-                cover_url=entry.get('cover_url'),
-                tags=entry.get('tags', []),
-                content=entry.get('content', ''),
-                status='published',
-                published_at=published_at,
-            )
+    by_slug = {slugify(entry['title']): entry for entry in entries}
+    existing = set(db.execute(select(models.Article.slug).where(models.Article.slug.in_(list(by_slug)))).scalars())
+    now = datetime.utcnow()
+    # Added through the session (not a Core insert) so the search, tag and
+    # related-article mapper events index them.
+    db.add_all(
+        models.Article(
+            title=entry['title'],
+            slug=slug,
+            summary=entry.get('summary'),
+            cover_url=entry.get('cover_url'),
+            tags=entry.get('tags', []),
+            content=entry.get('content', ''),
+            status='published',
+            published_at=now - timedelta(days=int(entry.get('days_ago', 0))),
         )
+        for slug, entry in by_slug.items()
+        if slug not in existing
+    )
+    if len(existing) < len(by_slug):
+        bump_version_sync(db, ARTICLES)
 
 
 def bootstrap_data(db: Session) -> None:
@@ -308,3 +336,73 @@ def bootstrap_data(db: Session) -> None:
     _upsert_interpretations(db, ZODIAC_INTERPRETATIONS)
     _ensure_articles(db, MYSTIC_ARTICLES)
     db.commit()
+    # Related lists of new articles are filled in after the commit, off this thread.
+    related.wait_for_related_updates()
+
+
+def seed_digest() -> str:
+    """Fingerprint of the seed data and the table set; a change means init_database must run again."""
+    payload = {
+        'interpretations': ZODIAC_INTERPRETATIONS,
+        'articles': MYSTIC_ARTICLES,
+        'tables': sorted(Base.metadata.tables),
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def head_revision() -> str:
+    return ScriptDirectory(str(MIGRATIONS)).get_current_head()
+
+
+def _alembic_config(conn: Connection) -> Config:
+    config = Config(str(BACKEND_ROOT / 'alembic.ini'))
+    config.set_main_option('script_location', str(MIGRATIONS))
+    config.attributes['connection'] = conn
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def migrate_schema(engine: Engine) -> None:
+    """Bring the schema to the Alembic head.
+
+    A database Alembic has seen is upgraded. Anything else is taken to be
+    fresh (or built by ``create_all`` at this same head): missing tables are
+    created and the result is stamped, so later ``alembic upgrade head`` runs
+    only the revisions added after it.
+    """
+    with engine.begin() as conn:
+        config = _alembic_config(conn)
+        if inspect(conn).has_table('alembic_version'):
+            command.upgrade(config, 'head')
+        else:
+            Base.metadata.create_all(bind=conn)
+            command.stamp(config, 'head')
+
+
+def init_database(engine: Engine, force: bool = False) -> bool:
+    """Migrate the schema and seed baseline data unless both are already current.
+
+    Returns whether any work was done. An up-to-date database costs two table
+    checks and two primary-key lookups.
+    """
+    digest = seed_digest()
+    if not force:
+        with engine.connect() as conn:
+            if inspect(conn).has_table(models.SeedState.__tablename__):
+                stored = conn.execute(
+                    select(models.SeedState.digest).where(models.SeedState.name == SEED_NAME)
+                ).scalar_one_or_none()
+                current = MigrationContext.configure(conn).get_current_revision()
+                if stored == digest and current == head_revision():
+                    return False
+    migrate_schema(engine)
+    with Session(bind=engine) as db:
+        bootstrap_data(db)
+        state = db.get(models.SeedState, SEED_NAME) or models.SeedState(name=SEED_NAME)
+        state.digest = digest
+        state.applied_at = datetime.utcnow()
+        db.add(state)
+        db.commit()
+    return True
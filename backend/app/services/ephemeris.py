@@ -0,0 +1,198 @@
+"""Low-precision, NumPy-vectorized ephemeris for natal chart positions.
+
+Sun and Moon follow Meeus, *Astronomical Algorithms* (ch. 25 and a truncated
+ch. 47 series); the Ascendant comes from mean sidereal time and the mean
+obliquity. Accuracy is about 0.01° for the Sun and 0.1° for the Moon, which is
+plenty for sign-and-degree output. Times are treated as UT; ignoring ΔT moves
+the Moon by well under 0.05° for modern birth dates.
+
+Every function takes and returns arrays so a whole chunk of users is computed
+in one pass; scalar inputs work too and come back as 0-d arrays.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Optional, Sequence
+
+import numpy as np
+
+J2000 = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+
+ECLIPTIC_SIGNS = (
+    '白羊座', '金牛座', '双子座', '巨蟹座', '狮子座', '处女座',
+    '天秤座', '天蝎座', '射手座', '摩羯座', '水瓶座', '双鱼座',
+)
+UNKNOWN_POSITION = '未知'
+
+# Meeus table 47.A, longitude terms: multiples of D, M, M', F and the
+# coefficient in 1e-6 degrees. Terms below 2000e-6° are dropped.
+_MOON_TERMS = np.array([
+    (0, 0, 1, 0, 6288774), (2, 0, -1, 0, 1274027), (2, 0, 0, 0, 658314),
+    (0, 0, 2, 0, 213618), (0, 1, 0, 0, -185116), (0, 0, 0, 2, -114332),
+    (2, 0, -2, 0, 58793), (2, -1, -1, 0, 57066), (2, 0, 1, 0, 53322),
+    (2, -1, 0, 0, 45758), (0, 1, -1, 0, -40923), (1, 0, 0, 0, -34720),
+    (0, 1, 1, 0, -30383), (2, 0, 0, -2, 15327), (0, 0, 1, 2, -12528),
+    (0, 0, 1, -2, 10980), (4, 0, -1, 0, 10675), (0, 0, 3, 0, 10034),
+    (4, 0, -2, 0, 8548), (2, 1, -1, 0, -7888), (2, 1, 0, 0, -6766),
+    (1, 0, -1, 0, -5163), (1, 1, 0, 0, 4987), (2, -1, 1, 0, 4036),
+    (2, 0, 2, 0, 3994), (4, 0, 0, 0, 3861), (2, 0, -3, 0, 3665),
+    (0, 1, -2, 0, -2689), (2, 0, -1, 2, -2602), (2, -1, -2, 0, 2390),
+    (1, 0, 1, 0, -2348), (2, -2, 0, 0, 2236), (0, 1, 2, 0, -2120),
+    (0, 2, 0, 0, -2069),
+], dtype=np.float64)
+
+
+def julian_day(moments_utc) -> np.ndarray:
+    """Julian Day for ``datetime64`` UTC instants."""
+    seconds = np.asarray(moments_utc, dtype='datetime64[s]').astype(np.int64)
+    return seconds / 86400.0 + UNIX_EPOCH_JD
+
+
+def _centuries(jd) -> np.ndarray:
+    return (np.asarray(jd, dtype=np.float64) - J2000) / 36525.0
+
+
+def _nutation_in_longitude(t: np.ndarray) -> np.ndarray:
+    omega = np.radians(125.04452 - 1934.136261 * t)
+    sun_mean = np.radians(280.4665 + 36000.7698 * t)
+    moon_mean = np.radians(218.3165 + 481267.8813 * t)
+    arcsec = -17.20 * np.sin(omega) - 1.32 * np.sin(2 * sun_mean) - 0.23 * np.sin(2 * moon_mean) + 0.21 * np.sin(2 * omega)
+    return arcsec / 3600.0
+
+
+def sun_longitude(jd) -> np.ndarray:
+    """Apparent geocentric ecliptic longitude of the Sun, degrees in [0, 360)."""
+    t = _centuries(jd)
+    mean_longitude = 280.46646 + 36000.76983 * t + 0.0003032 * t ** 2
+    anomaly = np.radians(357.52911 + 35999.05029 * t - 0.0001537 * t ** 2)
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t ** 2) * np.sin(anomaly)
+        + (0.019993 - 0.000101 * t) * np.sin(2 * anomaly)
+        + 0.000289 * np.sin(3 * anomaly)
+    )
+    omega = np.radians(125.04 - 1934.136 * t)
+    return np.mod(mean_longitude + center - 0.00569 - 0.00478 * np.sin(omega), 360.0)
+
+
+def moon_longitude(jd) -> np.ndarray:
+    """Apparent geocentric ecliptic longitude of the Moon, degrees in [0, 360)."""
+    t = _centuries(jd)
+    mean_longitude = 218.3164477 + 481267.88123421 * t - 0.0015786 * t ** 2 + t ** 3 / 538841 - t ** 4 / 65194000
+    elongation = 297.8501921 + 445267.1114034 * t - 0.0018819 * t ** 2 + t ** 3 / 545868 - t ** 4 / 113065000
+    sun_anomaly = 357.5291092 + 35999.0502909 * t - 0.0001536 * t ** 2 + t ** 3 / 24490000
+    moon_anomaly = 134.9633964 + 477198.8675055 * t + 0.0087414 * t ** 2 + t ** 3 / 69699 - t ** 4 / 14712000
+    latitude_arg = 93.2720950 + 483202.0175233 * t - 0.0036539 * t ** 2 - t ** 3 / 3526000 + t ** 4 / 863310000
+    eccentricity = 1 - 0.002516 * t - 0.0000074 * t ** 2
+
+    # (n, 4) arguments against (terms, 4) multipliers -> (n, terms) angles.
+    fundamentals = np.radians(np.stack([elongation, sun_anomaly, moon_anomaly, latitude_arg], axis=-1))
+    angles = fundamentals[..., None, :] @ _MOON_TERMS[:, :4].T
+    angles = angles[..., 0, :]
+    e_power = np.abs(_MOON_TERMS[:, 1])
+    weights = _MOON_TERMS[:, 4] * eccentricity[..., None] ** e_power
+    sigma = np.sum(weights * np.sin(angles), axis=-1)
+
+    a1 = np.radians(119.75 + 131.849 * t)
+    a2 = np.radians(53.09 + 479264.290 * t)
+    sigma = (
+        sigma
+        + 3958 * np.sin(a1)
+        + 1962 * np.sin(np.radians(mean_longitude - latitude_arg))
+        + 318 * np.sin(a2)
+    )
+    return np.mod(mean_longitude + sigma / 1e6 + _nutation_in_longitude(t), 360.0)
+
+
+def mean_obliquity(jd) -> np.ndarray:
+    t = _centuries(jd)
+    return 23.4392911 - 0.0130042 * t - 1.64e-7 * t ** 2 + 5.04e-7 * t ** 3
+
+
+def greenwich_sidereal_time(jd) -> np.ndarray:
+    """Greenwich mean sidereal time in degrees (Meeus 12.4)."""
+    jd = np.asarray(jd, dtype=np.float64)
+    t = _centuries(jd)
+    theta = 280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * t ** 2 - t ** 3 / 38710000
+    return np.mod(theta, 360.0)
+
+
+def ascendant(jd, latitude, longitude) -> np.ndarray:
+    """Ecliptic longitude rising on the eastern horizon; latitude/longitude in degrees (east positive)."""
+    ramc = np.radians(np.mod(greenwich_sidereal_time(jd) + np.asarray(longitude, dtype=np.float64), 360.0))
+    obliquity = np.radians(mean_obliquity(jd))
+    phi = np.radians(np.asarray(latitude, dtype=np.float64))
+    asc = np.arctan2(np.cos(ramc), -(np.sin(ramc) * np.cos(obliquity) + np.tan(phi) * np.sin(obliquity)))
+    return np.mod(np.degrees(asc), 360.0)
+
+
+@dataclass(frozen=True)
+class ChartPositions:
+    sun: str
+    moon: str
+    rising: str
+
+
+def format_position(longitude: float) -> str:
+    if not np.isfinite(longitude):
+        return UNKNOWN_POSITION
+    sign = int(longitude // 30) % 12
+    return f'{ECLIPTIC_SIGNS[sign]} {int(longitude % 30):02d}°'
+
+
+def birth_moments(
+    birth_dates: Sequence[date],
+    birth_times: Sequence[Optional[time]],
+    utc_offsets_hours: Sequence[float],
+) -> tuple[np.ndarray, np.ndarray]:
+    """UTC instants for local birth data; missing times fall back to local noon.
+
+    Returns the instants and a mask of which entries had a real birth time.
+    """
+    known = np.array([value is not None for value in birth_times], dtype=bool)
+    local = np.array(
+        [datetime.combine(day, value or time(12)) for day, value in zip(birth_dates, birth_times)],
+        dtype='datetime64[s]',
+    )
+    offsets = np.round(np.asarray(utc_offsets_hours, dtype=np.float64) * 3600).astype('timedelta64[s]')
+    return local - offsets, known
+
+
+def compute_chart_longitudes(moments_utc, latitudes, longitudes, has_time=None) -> dict[str, np.ndarray]:
+    """Sun, Moon and Ascendant longitudes for arrays of UTC instants and places.
+
+    Where ``has_time`` is False the Ascendant is NaN: it moves a whole sign
+    every two hours, so a guessed birth time would be meaningless.
+    """
+    jd = julian_day(moments_utc)
+    rising = ascendant(jd, latitudes, longitudes)
+    if has_time is not None:
+        rising = np.where(np.asarray(has_time, dtype=bool), rising, np.nan)
+    return {'sun': sun_longitude(jd), 'moon': moon_longitude(jd), 'rising': rising}
+
+
+def compute_charts(
+    birth_dates: Sequence[date],
+    birth_times: Sequence[Optional[time]],
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    utc_offsets_hours: Sequence[float],
+) -> list[ChartPositions]:
+    moments, known = birth_moments(birth_dates, birth_times, utc_offsets_hours)
+    result = compute_chart_longitudes(moments, latitudes, longitudes, known)
+    return [
+        ChartPositions(format_position(sun), format_position(moon), format_position(rising))
+        for sun, moon, rising in zip(result['sun'].tolist(), result['moon'].tolist(), result['rising'].tolist())
+    ]
+
+
+def compute_chart(
+    birth_date: date,
+    birth_time: Optional[time],
+    latitude: float,
+    longitude: float,
+    utc_offset_hours: float,
+) -> ChartPositions:
+    return compute_charts([birth_date], [birth_time], [latitude], [longitude], [utc_offset_hours])[0]
+
@@ -0,0 +1,13 @@
+"""Executors shared by the bulk jobs."""
+from __future__ import annotations
+
+from concurrent.futures import Executor, Future
+
+
+class InlineExecutor(Executor):
+    """Runs each submitted call immediately in the caller; stands in for a process pool when ``workers=0``."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
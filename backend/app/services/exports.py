@@ -0,0 +1,79 @@
+"""Streaming NDJSON export of report history.
+
+Rows are read through ``AsyncConnection.stream`` with ``yield_per``, which
+uses a server-side cursor on Postgres, and each partition is serialized and
+handed to the response before the next one is fetched. Memory therefore
+stays at one partition no matter how long the history is.
+
+FastAPI closes yield-dependency sessions before a ``StreamingResponse`` body
+is sent, so the stream opens its own connection on the request session's
+engine instead of reusing the session.
+"""
+from __future__ import annotations
+
+import enum
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional, Tuple, Type, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .. import models
+from .report_templates import dump_json
+from .reports import astrology_payload_json, zodiac_payload_json
+
+NDJSON = 'application/x-ndjson'
+EXPORT_CHUNK_SIZE = 1000
+
+
+class ReportKind(str, enum.Enum):
+    astrology = 'astrology'
+    zodiac = 'zodiac'
+
+
+@dataclass(frozen=True)
+class _ExportSpec:
+    model: Type[Union[models.AstrologyReport, models.ZodiacReport]]
+    fields: Tuple[str, ...]
+    payload_json: Callable[[Any], bytes]
+
+
+_SPECS = {
+    ReportKind.astrology: _ExportSpec(models.AstrologyReport, ('id', 'report_type', 'generated_at'), astrology_payload_json),
+    ReportKind.zodiac: _ExportSpec(models.ZodiacReport, ('id', 'year', 'generated_at'), zodiac_payload_json),
+}
+
+
+def export_filename(kind: ReportKind) -> str:
+    return f'{kind.value}-reports.ndjson'
+
+
+def _line(row: Any, fields: Tuple[str, ...], spec: _ExportSpec) -> bytes:
+    head = {name: getattr(row, name) for name in fields}
+    head['generated_at'] = row.generated_at.isoformat() if row.generated_at else None
+    return dump_json(head)[:-1] + b',"payload":' + spec.payload_json(row) + b'}\n'
+
+
+async def stream_reports(
+    engine: AsyncEngine,
+    kind: ReportKind,
+    *,
+    user_id: Optional[int] = None,
+    with_user_id: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Yield NDJSON chunks of one user's reports (newest first) or, without ``user_id``, everyone's by id."""
+    spec = _SPECS[kind]
+    model = spec.model
+    query = select(*model.__table__.c)
+    if user_id is not None:
+        # Same order as the (user_id, generated_at DESC) index, so no sort step.
+        query = query.where(model.user_id == user_id).order_by(model.generated_at.desc())
+    else:
+        query = query.order_by(model.id)
+    fields = ('user_id', *spec.fields) if with_user_id else spec.fields
+
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield b''.join(_line(row, fields, spec) for row in partition)
@@ -0,0 +1,249 @@
+"""Offline birth-place gazetteer backed by memory-mapped NumPy arrays.
+
+The bundled ``app/data/places.tsv`` (or ``GAZETTEER_PATH``) is compiled once
+into a directory of ``.npy`` files: one sorted array of normalized name keys
+(Chinese, pinyin/English and aliases) pointing into per-place column arrays.
+Every process maps the same files read-only, so uvicorn/batch workers share a
+single copy through the page cache. Exact lookups and prefix ranges are two
+``searchsorted`` calls over the key array.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from ..config import get_settings
+
+BUNDLED_PLACES = Path(__file__).resolve().parent.parent / 'data' / 'places.tsv'
+
+_COLUMNS = ('name', 'name_en', 'country', 'timezone', 'latitude', 'longitude', 'population')
+_PLACE_SUFFIXES = ('特别行政区', '自治区', '市', '县', '区', '省', 'city')
+_COUNTRY_PREFIXES = ('中华人民共和国', '中国')
+_COORDINATES = re.compile(r'^\s*(-?\d{1,2}(?:\.\d+)?)\s*[,，\s]\s*(-?\d{1,3}(?:\.\d+)?)\s*$')
+_SEPARATORS = re.compile(r'[,，/、]')
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    name_en: str
+    country: str
+    latitude: float
+    longitude: float
+    timezone: str
+
+
+def normalize_key(text: str) -> str:
+    """Case-, width- and punctuation-insensitive form used for index keys."""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def _query_keys(text: str) -> List[str]:
+    """Keys to try for free text such as ``'北京市'`` or ``'Beijing, China'``."""
+    keys = []
+    for candidate in (text, _SEPARATORS.split(text, 1)[0]):
+        key = normalize_key(candidate)
+        for prefix in _COUNTRY_PREFIXES:
+            if key.startswith(prefix) and len(key) > len(prefix):
+                key = key[len(prefix):]
+        keys.append(key)
+        for suffix in _PLACE_SUFFIXES:
+            if key.endswith(suffix) and len(key) > len(suffix):
+                keys.append(key[: -len(suffix)])
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+def _read_places(source: Path) -> List[dict]:
+    places = []
+    with source.open(encoding='utf-8') as handle:
+        for line in handle:
+            if not line.strip() or line.startswith('#'):
+                continue
+            name, name_en, aliases, country, latitude, longitude, timezone, population = line.rstrip('\n').split('\t')
+            places.append({
+                'name': name,
+                'name_en': name_en,
+                'aliases': [alias for alias in aliases.split(',') if alias],
+                'country': country,
+                'latitude': float(latitude),
+                'longitude': float(longitude),
+                'timezone': timezone,
+                'population': int(population),
+            })
+    return places
+
+
+def _fixed_bytes(values: Iterable[str]) -> np.ndarray:
+    encoded = [value.encode('utf-8') for value in values]
+    return np.array(encoded, dtype=f'S{max(1, max(map(len, encoded), default=1))}')
+
+
+def build_index(source: Path, target: Path) -> None:
+    """Compile a places TSV into the array files :class:`Gazetteer` maps."""
+    places = _read_places(source)
+    population = np.array([place['population'] for place in places], dtype=np.int64)
+    entries = set()
+    for place_id, place in enumerate(places):
+        for name in (place['name'], place['name_en'], *place['aliases']):
+            key = normalize_key(name)
+            if key:
+                entries.add((key.encode('utf-8'), place_id))
+    # Sorted by key, then most populous first, so an exact match takes the
+    # best-known place of that name.
+    ordered = sorted(entries, key=lambda entry: (entry[0], -population[entry[1]]))
+
+    target.mkdir(parents=True)
+    columns = {
+        'keys': _fixed_bytes(key.decode('utf-8') for key, _ in ordered),
+        'key_places': np.array([place_id for _, place_id in ordered], dtype=np.int32),
+        'name': _fixed_bytes(place['name'] for place in places),
+        'name_en': _fixed_bytes(place['name_en'] for place in places),
+        'country': _fixed_bytes(place['country'] for place in places),
+        'timezone': _fixed_bytes(place['timezone'] for place in places),
+        'latitude': np.array([place['latitude'] for place in places], dtype=np.float64),
+        'longitude': np.array([place['longitude'] for place in places], dtype=np.float64),
+        'population': population,
+    }
+    for name, values in columns.items():
+        np.save(target / f'{name}.npy', values, allow_pickle=False)
+
+
+def ensure_index(source: Path, cache_dir: Path) -> Path:
+    """Return the compiled index for ``source``, building it if needed.
+
+    The directory name carries the source digest, so editing the data file
+    produces a fresh index; the build is renamed into place atomically.
+    """
+    digest = hashlib.sha1(source.read_bytes()).hexdigest()[:16]
+    target = cache_dir / f'gazetteer-{digest}'
+    if target.is_dir():
+        return target
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix='.gazetteer-', dir=cache_dir))
+    try:
+        build_index(source, staging / 'index')
+        try:
+            os.rename(staging / 'index', target)
+        except OSError:
+            if not target.is_dir():  # Lost a race to another worker otherwise.
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
+
+
+class Gazetteer:
+    def __init__(self, index_dir: Path):
+        arrays = {name: np.load(index_dir / f'{name}.npy', mmap_mode='r') for name in ('keys', 'key_places', *_COLUMNS)}
+        self._keys = arrays['keys']
+        self._key_places = arrays['key_places']
+        self._columns = {name: arrays[name] for name in _COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._columns['name'])
+
+    def place(self, place_id: int) -> Place:
+        columns = self._columns
+        return Place(
+            name=columns['name'][place_id].decode('utf-8'),
+            name_en=columns['name_en'][place_id].decode('utf-8'),
+            country=columns['country'][place_id].decode('utf-8'),
+            latitude=float(columns['latitude'][place_id]),
+            longitude=float(columns['longitude'][place_id]),
+            timezone=columns['timezone'][place_id].decode('utf-8'),
+        )
+
+    def _range(self, key: bytes, prefix: bool) -> tuple[int, int]:
+        low = int(np.searchsorted(self._keys, key, side='left'))
+        high = int(np.searchsorted(self._keys, key + b'\xff' if prefix else key, side='right'))
+        return low, high
+
+    def lookup(self, name: str) -> Optional[Place]:
+        """Exact (normalized) name match."""
+        key = normalize_key(name).encode('utf-8')
+        low, high = self._range(key, prefix=False)
+        return self.place(int(self._key_places[low])) if key and low < high else None
+
+    def resolve(self, text: str) -> Optional[Place]:
+        """Best-effort match for a free-text ``birth_place``.
+
+        Accepts place names with common suffixes/country prefixes, or a
+        ``"lat, lon"`` pair, which takes the timezone of the nearest place.
+        """
+        match = _COORDINATES.match(text)
+        if match:
+            latitude, longitude = float(match.group(1)), float(match.group(2))
+            if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+                nearest = self.place(self.nearest(latitude, longitude))
+                return Place(text.strip(), text.strip(), nearest.country, latitude, longitude, nearest.timezone)
+            return None
+        for key in _query_keys(text):
+            place = self.lookup(key)
+            if place is not None:
+                return place
+        return None
+
+    def nearest(self, latitude: float, longitude: float) -> int:
+        lat = np.radians(self._columns['latitude'])
+        lon = np.radians(self._columns['longitude'])
+        phi, lam = np.radians(latitude), np.radians(longitude)
+        # Haversine without the arcsin: monotonic in distance, enough for argmin.
+        h = np.sin((lat - phi) / 2) ** 2 + np.cos(phi) * np.cos(lat) * np.sin((lon - lam) / 2) ** 2
+        return int(np.argmin(h))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Place]:
+        """Places with any name starting with ``prefix``, most populous first."""
+        key = normalize_key(prefix).encode('utf-8')
+        if not key:
+            return []
+        low, high = self._range(key, prefix=True)
+        if low == high:
+            return []
+        place_ids = self._key_places[low:high]
+        population = -self._columns['population'][place_ids]
+        # A place has a handful of keys at most, so the top few entries per
+        # requested result are enough to fill ``limit`` distinct places.
+        candidates = limit * 4
+        if len(place_ids) > candidates:
+            top = np.argpartition(population, candidates)[:candidates]
+            place_ids, population = place_ids[top], population[top]
+        ranked = dict.fromkeys(place_ids[np.argsort(population, kind='stable')].tolist())
+        return [self.place(place_id) for place_id in list(ranked)[:limit]]
+
+
+@lru_cache()
+def _zone(name: str) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def utc_offset_hours(timezone: str, local: datetime, default: float) -> float:
+    """UTC offset in force at a local wall-clock time, including historical DST."""
+    zone = _zone(timezone)
+    if zone is None:
+        return default
+    offset = local.replace(tzinfo=zone).utcoffset()
+    return offset.total_seconds() / 3600 if offset is not None else default
+
+
+@lru_cache()
+def get_gazetteer() -> Gazetteer:
+    settings = get_settings()
+    source = Path(settings.gazetteer_path) if settings.gazetteer_path else BUNDLED_PLACES
+    cache_dir = Path(settings.gazetteer_cache_dir or Path(tempfile.gettempdir()) / 'astro-whispers')
+    return Gazetteer(ensure_index(source, cache_dir))
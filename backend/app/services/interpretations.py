@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..conditional import Validator, validator_for_body
+from ..config import get_settings
+from ..schemas import ZodiacInterpretationResponse
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class _Entry:
+    id: int
+    body: bytes
+    validator: Validator
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    entries: Dict[str, _Entry]
+    list_entry: _Entry
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def _make_entry(record: models.ZodiacInterpretation) -> _Entry:
+    body = ZodiacInterpretationResponse.model_validate(record).model_dump_json().encode('utf-8')
+    return _Entry(id=record.id, body=body, validator=validator_for_body(body, last_modified=record.updated_at))
+
+
+def _build_snapshot(entries: Dict[str, _Entry]) -> _Snapshot:
+    ordered = sorted(entries.values(), key=lambda entry: entry.id)
+    list_body = b'[' + b','.join(entry.body for entry in ordered) + b']'
+    stamps = [entry.validator.last_modified for entry in ordered if entry.validator.last_modified]
+    list_entry = _Entry(
+        id=0,
+        body=list_body,
+        validator=validator_for_body(list_body, last_modified=max(stamps) if stamps else None),
+    )
+    return _Snapshot(entries=entries, list_entry=list_entry)
+
+
+class InterpretationRegistry:
+    """In-memory copy of the zodiac interpretation table, held as ready-to-send JSON.
+
+    The whole dataset is a dozen rows, so readers get pre-serialized bytes (and
+    their ETags) without touching the database. Writers replace the snapshot as
+    a whole, which keeps every read consistent without locking. Entries written
+    by other workers become visible once the snapshot is older than the refresh
+    interval.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[_Snapshot] = None
+
+    def clear(self) -> None:
+        self._snapshot = None
+
+    def _is_fresh(self) -> bool:
+        snapshot = self._snapshot
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.refresh_interval
+
+    async def load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(models.ZodiacInterpretation).order_by(models.ZodiacInterpretation.id))
+        self.replace_all(result.scalars().all())
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if not self._is_fresh():
+            await self.load(db)
+
+    def replace_all(self, records: Iterable[models.ZodiacInterpretation]) -> None:
+        self._snapshot = _build_snapshot({record.sign: _make_entry(record) for record in records})
+
+    def upsert(self, record: models.ZodiacInterpretation) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return  # the next reader loads the full table anyway
+        self._snapshot = _build_snapshot({**snapshot.entries, record.sign: _make_entry(record)})
+
+    def list_body(self) -> Tuple[bytes, Validator]:
+        assert self._snapshot is not None, 'registry not loaded'
+        entry = self._snapshot.list_entry
+        return entry.body, entry.validator
+
+    def get_body(self, sign: str) -> Optional[Tuple[bytes, Validator]]:
+        assert self._snapshot is not None, 'registry not loaded'
+        entry = self._snapshot.entries.get(sign.strip().lower())
+        return (entry.body, entry.validator) if entry else None
+
+
+interpretation_registry = InterpretationRegistry(settings.interpretation_refresh_seconds)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .. import models
+from ..config import get_settings
+from .cache import TTLCache
+
+settings = get_settings()
+
+# Decoded JWT payloads keyed by a digest of the raw token, so the secret-bearing
+# token itself never sits in memory longer than the request.
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    'auth_tokens', settings.principal_cache_size, settings.principal_cache_ttl_seconds
+)
+# Immutable snapshots of user rows keyed by user id.
+principal_cache: TTLCache['Principal'] = TTLCache(
+    'auth_principals', settings.principal_cache_size, settings.principal_cache_ttl_seconds
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached, read-only view of the authenticated user."""
+
+    id: int
+    email: str
+    name: str
+    birth_date: date
+    birth_time: Optional[dt_time]
+    birth_place: Optional[str]
+    created_at: datetime
+    is_admin: bool = False
+
+    @classmethod
+    def from_user(cls, user: models.User) -> 'Principal':
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            birth_date=user.birth_date,
+            birth_time=user.birth_time,
+            birth_place=user.birth_place,
+            created_at=user.created_at,
+            is_admin=bool(user.is_admin),
+        )
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def cache_token_payload(token: str, payload: Dict[str, Any]) -> None:
+    remaining = float(payload.get('exp', 0)) - time.time()
+    token_cache.set(token_digest(token), payload, ttl=remaining)
+
+
+def cached_token_payload(token: str) -> Optional[Dict[str, Any]]:
+    return token_cache.get(token_digest(token))
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
+
+
+_CHANGED_USERS = 'changed_principals'
+
+
+@event.listens_for(models.User, 'after_update')
+@event.listens_for(models.User, 'after_delete')
+def _remember_change(_mapper, _connection, target: models.User) -> None:
+    # ORM flushes only; bulk UPDATE statements fall back to the cache TTL.
+    # Evicting here would be too early: until the commit a concurrent request
+    # still reads the old row and could cache it again for a whole TTL.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,467 @@
+"""Related-article recommendations from MinHash signatures.
+
+Each published article is reduced to a set of features (the CJK bigrams and
+words produced by services.search for its summary and content, its title
+tokens, and its tags, which are repeated so a shared tag outweighs a shared
+phrase) and summarised as a MinHash signature: for ``SIGNATURE_SIZE`` hash
+functions, the minimum hash over the feature set. The fraction of equal
+positions between two signatures estimates the Jaccard similarity of their
+feature sets.
+
+Signatures live in ``article_signatures`` and every article's top
+``RELATED_TOP_K`` neighbours in ``article_relations``, so the detail endpoint
+reads related items with one indexed lookup. Candidates come from LSH: each
+signature is cut into ``BANDS`` bands of ``BAND_ROWS`` positions, kept as
+buckets in ``article_bands``, and only articles sharing a bucket are scored.
+Pairs above about 0.3 similarity almost always share one; much weaker pairs
+often don't, so lists are approximate near ``RELATED_MIN_SCORE``. A write reads
+at most ``BUCKET_SAMPLE`` of the newest members of each bucket, so buckets made
+by very common features don't turn a lookup into a scan.
+
+Article writes don't touch these tables during the flush. The mapper events
+note which articles changed, and after the commit one background thread
+refreshes them: the article's own list, the lists that included it, and the
+candidate lists whose floor (the ``floor_score`` kept per signature) it now
+beats. ``wait_for_related_updates`` blocks until queued refreshes are done.
+
+``rebuild_related_index`` recomputes everything. Per band it scores each
+article against the next ``NEIGHBOURHOOD`` members of its bucket, ordered by
+the following band, so the work stays bounded however large buckets get.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, create_engine, delete, event, func, insert, inspect, select, union_all, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from .. import models
+from ..config import SYNC_DRIVERS
+from .search import tokenize
+from .tags import normalize_tags
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_SIZE = 128
+BAND_ROWS = 2  # band_buckets packs two uint32 positions per bucket
+BANDS = SIGNATURE_SIZE // BAND_ROWS
+RELATED_TOP_K = 5
+RELATED_MIN_SCORE = 0.05
+TAG_WEIGHT = 8
+# Newest members read from each bucket, and most candidates (by shared buckets)
+# scored, for one article on write.
+BUCKET_SAMPLE = 64
+MAX_CANDIDATES = 256
+# Bucket members after each article, per band, that a rebuild scores it against.
+NEIGHBOURHOOD = 8
+PAIR_BLOCK = 1 << 16
+WRITE_BATCH = 5000
+
+_INDEXED_FIELDS = ('title', 'summary', 'content', 'tags', 'status')
+_CHANGED = 'related_changed'
+_OWNERS = 'related_owners'
+
+# Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32, with odd ``a``.
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+Neighbours = List[Tuple[int, float]]
+
+
+def article_features(
+    title: str, summary: Optional[str], content: Optional[str], tags: Optional[Iterable[object]]
+) -> Set[str]:
+    features = set(tokenize(summary, content).split())
+    features.update(f't:{token}' for token in tokenize(title).split())
+    features.update(f'#{tag}:{copy}' for tag in normalize_tags(tags) for copy in range(TAG_WEIGHT))
+    return features
+
+
+def minhash(features: Iterable[str]) -> Optional[np.ndarray]:
+    """``SIGNATURE_SIZE`` uint32 minimums, or None for an empty feature set."""
+    hashes = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features), dtype=np.uint64)
+    if not hashes.size:
+        return None
+    mixed = (hashes[:, None] * _A + _B) >> _SHIFT
+    return mixed.min(axis=0).astype('<u4')
+
+
+def article_signature(article) -> Optional[np.ndarray]:
+    """Signature of an Article (or a row with the same columns); None unless published."""
+    if article.status != 'published':
+        return None
+    return minhash(article_features(article.title, article.summary, article.content, article.tags))
+
+
+def band_buckets(signatures: np.ndarray) -> np.ndarray:
+    """(n, BANDS) int64 buckets, each band's pair of uint32 positions packed into one value."""
+    pairs = signatures.reshape(len(signatures), BANDS, BAND_ROWS).astype(np.uint64)
+    return ((pairs[:, :, 0] << np.uint64(32)) | pairs[:, :, 1]).view(np.int64)
+
+
+def similarity_block(matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of each signature in ``rows`` against every row of ``matrix``."""
+    equal = np.zeros((len(rows), len(matrix)), dtype=np.uint16)
+    for position in range(SIGNATURE_SIZE):
+        equal += rows[:, position, None] == matrix[None, :, position]
+    return equal / np.float32(SIGNATURE_SIZE)
+
+
+def pair_similarity(matrix: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of rows ``left[i]`` and ``right[i]`` of ``matrix``."""
+    scores = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), PAIR_BLOCK):
+        stop = start + PAIR_BLOCK
+        equal = np.count_nonzero(matrix[left[start:stop]] == matrix[right[start:stop]], axis=1)
+        scores[start:stop] = equal / np.float32(SIGNATURE_SIZE)
+    return scores
+
+
+def top_neighbours(ids: np.ndarray, scores: np.ndarray) -> Neighbours:
+    """Best ``RELATED_TOP_K`` (id, score) pairs above the floor, newest id first on ties."""
+    eligible = np.flatnonzero(scores >= RELATED_MIN_SCORE)
+    if len(eligible) > RELATED_TOP_K:
+        eligible = eligible[np.argpartition(-scores[eligible], RELATED_TOP_K - 1)[:RELATED_TOP_K]]
+    order = sorted(eligible, key=lambda i: (-scores[i], -ids[i]))
+    return [(int(ids[i]), round(float(scores[i]), 4)) for i in order]
+
+
+def _floor(neighbours: Neighbours) -> float:
+    return neighbours[-1][1] if len(neighbours) >= RELATED_TOP_K else 0.0
+
+
+def _write_relations(conn: Connection, lists: Dict[int, Neighbours]) -> None:
+    if not lists:
+        return
+    conn.execute(delete(models.ArticleRelation).where(models.ArticleRelation.article_id.in_(list(lists))))
+    rows = [
+        {'article_id': article_id, 'rank': rank, 'related_id': related_id, 'score': score}
+        for article_id, neighbours in lists.items()
+        for rank, (related_id, score) in enumerate(neighbours)
+    ]
+    if rows:
+        conn.execute(insert(models.ArticleRelation), rows)
+    _write_floors(conn, {article_id: _floor(neighbours) for article_id, neighbours in lists.items()})
+
+
+def _write_floors(conn: Connection, floors: Dict[int, float]) -> None:
+    if not floors:
+        return
+    signatures = models.ArticleSignature.__table__
+    conn.execute(
+        update(signatures).where(signatures.c.article_id == bindparam('row_id')).values(floor_score=bindparam('floor')),
+        [{'row_id': article_id, 'floor': floor} for article_id, floor in floors.items()],
+    )
+
+
+def _store_signatures(conn: Connection, ids: Sequence[int], signatures: np.ndarray) -> None:
+    conn.execute(insert(models.ArticleSignature), [
+        {'article_id': article_id, 'signature': signature.tobytes()} for article_id, signature in zip(ids, signatures)
+    ])
+    conn.execute(insert(models.ArticleBand), [
+        {'article_id': article_id, 'band': band, 'bucket': bucket}
+        for article_id, buckets in zip(ids, band_buckets(signatures).tolist())
+        for band, bucket in enumerate(buckets)
+    ])
+
+
+@lru_cache(maxsize=None)
+def _candidate_query():
+    """The bucket lookup for one signature, built once: 64 sampled subqueries are
+    far slower to construct and compile per call than to run."""
+    members = [
+        select(models.ArticleBand.article_id)
+        .where(models.ArticleBand.band == band, models.ArticleBand.bucket == bindparam(f'bucket_{band}'),
+               models.ArticleBand.article_id != bindparam('article_id'))
+        .order_by(models.ArticleBand.article_id.desc())
+        .limit(BUCKET_SAMPLE)
+        .subquery()
+        for band in range(BANDS)
+    ]
+    sampled = union_all(*(select(member.c.article_id) for member in members)).subquery()
+    shared = func.count().label('shared')
+    return (
+        select(sampled.c.article_id, shared)
+        .group_by(sampled.c.article_id)
+        .order_by(shared.desc(), sampled.c.article_id.desc())
+        .limit(MAX_CANDIDATES)
+    )
+
+
+def _candidates(conn: Connection, article_id: int, signature: np.ndarray) -> List[int]:
+    """Articles sharing a bucket with ``signature``, most shared buckets first."""
+    params = {f'bucket_{band}': bucket for band, bucket in enumerate(band_buckets(signature[None, :])[0].tolist())}
+    rows = conn.execute(_candidate_query(), {'article_id': article_id, **params})
+    return [row.article_id for row in rows]
+
+
+def _load_signatures(conn: Connection, article_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, Dict[int, float]]:
+    """(ids, signature matrix, floors) for those of ``article_ids`` that have a signature."""
+    if not article_ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, SIGNATURE_SIZE), dtype='<u4'), {}
+    rows = conn.execute(
+        select(
+            models.ArticleSignature.article_id, models.ArticleSignature.signature, models.ArticleSignature.floor_score
+        ).where(models.ArticleSignature.article_id.in_(list(article_ids)))
+    ).all()
+    ids = np.fromiter((row.article_id for row in rows), dtype=np.int64, count=len(rows))
+    raw = b''.join(bytes(row.signature) for row in rows)
+    matrix = np.frombuffer(raw, dtype='<u4').reshape(len(rows), SIGNATURE_SIZE)
+    return ids, matrix, {row.article_id: row.floor_score for row in rows}
+
+
+def _scored_candidates(conn: Connection, article_id: int, signature: np.ndarray):
+    ids, matrix, floors = _load_signatures(conn, _candidates(conn, article_id, signature))
+    scores = similarity_block(matrix, signature[None, :])[0] if len(ids) else np.empty(0, dtype=np.float32)
+    return ids, scores, floors
+
+
+def refresh_related(conn: Connection, article_ids: Iterable[int], owners: Iterable[int] = ()) -> None:
+    """Re-sign ``article_ids`` from their current rows and repair every list they touch.
+
+    ``owners`` are articles whose lists pointed at one of them before the
+    write (known before a delete cascades them away); lists found pointing at
+    them now are added.
+    """
+    changed = sorted(set(article_ids))
+    owners = set(owners)
+    owners.update(conn.execute(
+        select(models.ArticleRelation.article_id).where(models.ArticleRelation.related_id.in_(changed))
+    ).scalars())
+    for table in (models.ArticleRelation, models.ArticleBand, models.ArticleSignature):
+        conn.execute(delete(table).where(table.article_id.in_(changed)))
+
+    rows = conn.execute(
+        select(
+            models.Article.id, models.Article.title, models.Article.summary, models.Article.content,
+            models.Article.tags, models.Article.status,
+        ).where(models.Article.id.in_(changed))
+    ).all()
+    signed = {row.id: signature for row in rows if (signature := article_signature(row)) is not None}
+    if signed:
+        _store_signatures(conn, list(signed), np.vstack(list(signed.values())))
+
+    lists: Dict[int, Neighbours] = {}
+    beaten: Dict[int, Neighbours] = {}
+    for article_id, signature in signed.items():
+        ids, scores, floors = _scored_candidates(conn, article_id, signature)
+        lists[article_id] = top_neighbours(ids, scores)
+        for other, score in zip(ids.tolist(), scores.tolist()):
+            if other not in signed and score >= RELATED_MIN_SCORE and score > floors[other]:
+                beaten.setdefault(other, []).append((article_id, round(score, 4)))
+    _write_relations(conn, lists)
+
+    # Lists that held a changed article lose or re-score an entry: recompute them.
+    owners.difference_update(changed)
+    owner_ids, owner_matrix, _ = _load_signatures(conn, sorted(owners))
+    recomputed = {}
+    for owner, signature in zip(owner_ids.tolist(), owner_matrix):
+        ids, scores, _ = _scored_candidates(conn, owner, signature)
+        recomputed[owner] = top_neighbours(ids, scores)
+    _write_relations(conn, recomputed)
+
+    # Lists a changed article now beats the floor of only gain it: merge it in.
+    merge = {article_id: entries for article_id, entries in beaten.items() if article_id not in owners}
+    if merge:
+        current = conn.execute(
+            select(models.ArticleRelation.article_id, models.ArticleRelation.related_id, models.ArticleRelation.score)
+            .where(models.ArticleRelation.article_id.in_(list(merge)))
+        ).all()
+        for row in current:
+            merge[row.article_id].append((row.related_id, row.score))
+        _write_relations(conn, {
+            article_id: sorted(entries, key=lambda entry: (-entry[1], -entry[0]))[:RELATED_TOP_K]
+            for article_id, entries in merge.items()
+        })
+
+
+def _distinct(keys: np.ndarray) -> np.ndarray:
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+
+
+def _bucket_pairs(buckets: np.ndarray) -> np.ndarray:
+    """Candidate pairs as ``low * n + high`` keys: for every band, each article and the
+    next ``NEIGHBOURHOOD`` members of its bucket, ordered by the following band."""
+    count = len(buckets)
+    found = []
+    for band in range(BANDS):
+        order = np.lexsort((buckets[:, (band + 1) % BANDS], buckets[:, band]))
+        key = buckets[order, band]
+        for step in range(1, NEIGHBOURHOOD + 1):
+            same = np.flatnonzero(key[step:] == key[:-step])
+            low = np.minimum(order[same], order[same + step])
+            high = np.maximum(order[same], order[same + step])
+            found.append(low * count + high)
+    return _distinct(np.concatenate(found))
+
+
+def _rebuild_lists(ids: np.ndarray, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(article_id, rank, related_id, score) columns of every article's top list."""
+    pairs = _bucket_pairs(band_buckets(matrix))
+    left, right = np.divmod(pairs, len(ids))
+    scores = pair_similarity(matrix, left, right)
+    keep = scores >= RELATED_MIN_SCORE
+    left, right, scores = left[keep], right[keep], scores[keep]
+    source = np.concatenate([left, right])
+    target = np.concatenate([right, left])
+    scores = np.concatenate([scores, scores])
+    # Group by source; within a group best score first, newest id first on ties.
+    order = np.lexsort((-ids[target], -scores, source))
+    source, target, scores = source[order], target[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, source[1:] != source[:-1]])
+    rank = np.arange(len(source)) - np.repeat(starts, np.diff(np.r_[starts, len(source)]))
+    top = rank < RELATED_TOP_K
+    return ids[source[top]], rank[top], ids[target[top]], np.round(scores[top].astype(np.float64), 4)
+
+
+def rebuild_related_index(conn: Connection, batch_size: int = 1000) -> int:
+    """Recompute every signature, bucket and neighbour list; returns the number of published articles."""
+    for table in (models.ArticleRelation, models.ArticleBand, models.ArticleSignature):
+        conn.execute(delete(table))
+    id_batches, signature_batches = [], []
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(
+                models.Article.id, models.Article.title, models.Article.summary,
+                models.Article.content, models.Article.tags, models.Article.status,
+            )
+            .where(models.Article.id > last_id, models.Article.status == 'published')
+            .order_by(models.Article.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        signed = [(row.id, signature) for row in rows if (signature := article_signature(row)) is not None]
+        if signed:
+            ids, signatures = [article_id for article_id, _ in signed], np.vstack([s for _, s in signed])
+            _store_signatures(conn, ids, signatures)
+            id_batches.append(ids)
+            signature_batches.append(signatures)
+        last_id = rows[-1].id
+    if not id_batches:
+        return 0
+    ids = np.array([article_id for batch in id_batches for article_id in batch], dtype=np.int64)
+    sources, ranks, targets, scores = _rebuild_lists(ids, np.vstack(signature_batches))
+    columns = (sources.tolist(), ranks.tolist(), targets.tolist(), scores.tolist())
+    rows = [
+        {'article_id': article_id, 'rank': rank, 'related_id': related_id, 'score': score}
+        for article_id, rank, related_id, score in zip(*columns)
+    ]
+    for start in range(0, len(rows), WRITE_BATCH):
+        conn.execute(insert(models.ArticleRelation), rows[start:start + WRITE_BATCH])
+    full = ranks == RELATED_TOP_K - 1
+    _write_floors(conn, dict(zip(sources[full].tolist(), scores[full].tolist())))
+    return len(ids)
+
+
+async def related_articles(db: AsyncSession, article_id: int) -> List[models.Article]:
+    result = await db.execute(
+        select(models.Article)
+        .join(models.ArticleRelation, models.ArticleRelation.related_id == models.Article.id)
+        .where(models.ArticleRelation.article_id == article_id)
+        .order_by(models.ArticleRelation.rank)
+    )
+    return list(result.scalars())
+
+
+@lru_cache(maxsize=4)
+def _sync_engine(url: str) -> Engine:
+    return create_engine(url)
+
+
+def _refresh_engine(bind: Engine) -> Engine:
+    """A sync engine on ``bind``'s database; the worker thread can't drive an async driver."""
+    if not bind.dialect.is_async:
+        return bind
+    url = bind.url.set(drivername=SYNC_DRIVERS[bind.url.get_backend_name()])
+    return _sync_engine(url.render_as_string(hide_password=False))
+
+
+class RelatedUpdates:
+    """Runs refreshes one at a time on a background thread, in commit order."""
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related-articles')
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, engine: Engine, changed: Set[int], owners: Set[int]) -> None:
+        future = self._executor.submit(self._run, engine, changed, owners)
+        with self._lock:
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+
+    def wait(self) -> None:
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+
+    @staticmethod
+    def _run(engine: Engine, changed: Set[int], owners: Set[int]) -> None:
+        try:
+            with engine.begin() as conn:
+                refresh_related(conn, changed, owners)
+        except Exception:  # noqa: BLE001 - keep the worker alive; reindex-related repairs any list left stale
+            logger.exception('Related-article refresh failed for articles %s', sorted(changed))
+
+
+related_updates = RelatedUpdates()
+
+
+def wait_for_related_updates() -> None:
+    """Block until every refresh queued by a committed article write has run."""
+    related_updates.wait()
+
+
+def _note(target: models.Article, key: str, article_ids: Iterable[int]) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(key, set()).update(article_ids)
+
+
+@event.listens_for(models.Article, 'after_insert')
+def _note_inserted_article(_mapper, _connection, target: models.Article) -> None:
+    _note(target, _CHANGED, [target.id])
+
+
+@event.listens_for(models.Article, 'after_update')
+def _note_updated_article(_mapper, _connection, target: models.Article) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _INDEXED_FIELDS):
+        _note(target, _CHANGED, [target.id])
+
+
+@event.listens_for(models.Article, 'before_delete')
+def _note_deleted_article(_mapper, connection: Connection, target: models.Article) -> None:
+    # Read before the DELETE, which may cascade these rows away.
+    owners = connection.execute(
+        select(models.ArticleRelation.article_id).where(models.ArticleRelation.related_id == target.id)
+    ).scalars()
+    _note(target, _OWNERS, owners)
+    _note(target, _CHANGED, [target.id])
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_refresh(session: Session) -> None:
+    changed = session.info.pop(_CHANGED, None)
+    owners = session.info.pop(_OWNERS, set())
+    if changed:
+        related_updates.submit(_refresh_engine(session.get_bind()), changed, owners)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+    session.info.pop(_OWNERS, None)
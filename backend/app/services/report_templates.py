@@ -0,0 +1,194 @@
+"""Report templates compiled once at import into ready-to-join JSON fragments.
+
+A report is fully described by which summary variant each section uses, so
+rendering is just picking indices and concatenating bytes; no pydantic model
+is built per request. The payload dicts handed out share their section dicts
+with the template and must be treated as read-only.
+
+Stored reports keep only the template version and their packed variant
+indices, so every published version stays registered in a
+:class:`TemplateRegistry` for as long as rows may reference it.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+
+def dump_json(value: Any) -> bytes:
+    """Compact UTF-8 JSON, the same shape as ``json.dumps(..., ensure_ascii=False, separators=(',', ':'))``."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+@dataclass(frozen=True)
+class CompiledSection:
+    key: str
+    variants: Tuple[Dict[str, Any], ...]
+    fragments: Tuple[bytes, ...]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    sections: Tuple[CompiledSection, ...]
+    variant_counts: Tuple[int, ...]
+
+    def pick(self, rng: Optional[random.Random] = None) -> Tuple[int, ...]:
+        draw = (rng or random).random
+        return tuple(int(draw() * count) for count in self.variant_counts)
+
+    def section_dicts(self, variants: Sequence[int]) -> List[Dict[str, Any]]:
+        return [section.variants[index] for section, index in zip(self.sections, variants)]
+
+    def section_bytes(self, variants: Sequence[int]) -> bytes:
+        return b'[' + b','.join(section.fragments[index] for section, index in zip(self.sections, variants)) + b']'
+
+
+def compile_sections(config: Dict[str, Dict[str, list]]) -> CompiledTemplate:
+    sections = []
+    for key, value in config.items():
+        variants = tuple(
+            {
+                'id': value.get('tag', key),
+                'title': value['title'],
+                'summary': summary,
+                'details': list(value['details']),
+            }
+            for summary in value['summaries']
+        )
+        sections.append(CompiledSection(key=key, variants=variants, fragments=tuple(dump_json(v) for v in variants)))
+    return CompiledTemplate(
+        sections=tuple(sections),
+        variant_counts=tuple(len(section.variants) for section in sections),
+    )
+
+
+@dataclass(frozen=True)
+class RenderedReport:
+    """A generated report as both a JSON-ready dict and its serialized bytes."""
+
+    variants: Tuple[int, ...]
+    payload: Dict[str, Any]
+    json: bytes
+    version: Optional[int] = None
+
+
+def render(
+    header: Dict[str, Any],
+    template: CompiledTemplate,
+    variants: Sequence[int],
+    section_offset: int = 0,
+) -> RenderedReport:
+    """Assemble ``header`` fields followed by the template's sections.
+
+    ``variants`` may carry leading indices used for header fields (such as the
+    zodiac summary); ``section_offset`` says where the section indices start.
+    """
+    section_variants = variants[section_offset:]
+    payload = {**header, 'sections': template.section_dicts(section_variants)}
+    body = dump_json(header)[:-1] + b',"sections":' + template.section_bytes(section_variants) + b'}'
+    return RenderedReport(variants=tuple(variants), payload=payload, json=body)
+
+
+HeaderChoices = Tuple[Tuple[str, Tuple[Any, ...]], ...]
+
+
+@dataclass(frozen=True)
+class VersionedTemplate:
+    """One published revision of a report kind.
+
+    ``header_choices`` are header fields drawn from a list (the zodiac
+    summary); their indices come before the section indices, and all of them
+    pack into a single mixed-radix integer for storage.
+    """
+
+    version: int
+    template: CompiledTemplate
+    header_choices: HeaderChoices = ()
+
+    @property
+    def radices(self) -> Tuple[int, ...]:
+        return tuple(len(choices) for _, choices in self.header_choices) + self.template.variant_counts
+
+    def pick(self, rng: Optional[random.Random] = None) -> Tuple[int, ...]:
+        draw = (rng or random).random
+        header = tuple(int(draw() * len(choices)) for _, choices in self.header_choices)
+        return header + self.template.pick(rng)
+
+    def encode(self, variants: Sequence[int]) -> int:
+        if len(variants) != len(self.radices):
+            raise ValueError(f'Expected {len(self.radices)} variant indices, got {len(variants)}')
+        code = 0
+        for index, radix in zip(variants, self.radices):
+            if not 0 <= index < radix:
+                raise ValueError(f'Variant index {index} out of range for {radix} choices')
+            code = code * radix + index
+        return code
+
+    def decode(self, code: int) -> Tuple[int, ...]:
+        variants = []
+        for radix in reversed(self.radices):
+            code, index = divmod(code, radix)
+            variants.append(index)
+        if code:
+            raise ValueError('Variant code out of range for this template version')
+        return tuple(reversed(variants))
+
+    def _header(self, header: Dict[str, Any], variants: Sequence[int]) -> Dict[str, Any]:
+        chosen = {name: choices[index] for (name, choices), index in zip(self.header_choices, variants)}
+        return {**header, **chosen}
+
+    def render(self, header: Dict[str, Any], variants: Sequence[int]) -> RenderedReport:
+        rendered = render(
+            self._header(header, variants), self.template, variants, section_offset=len(self.header_choices)
+        )
+        return replace(rendered, version=self.version)
+
+    def payload(self, header: Dict[str, Any], variants: Sequence[int]) -> Dict[str, Any]:
+        """Like :meth:`render` without serializing, for rebuilding stored reports."""
+        section_variants = variants[len(self.header_choices):]
+        return {**self._header(header, variants), 'sections': self.template.section_dicts(section_variants)}
+
+    def match(self, payload: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+        """Variant indices that reproduce ``payload``'s chosen text, or None if this version can't."""
+        try:
+            header = tuple(choices.index(payload[name]) for name, choices in self.header_choices)
+            sections = payload['sections']
+            if len(sections) != len(self.template.sections):
+                return None
+            return header + tuple(
+                section.variants.index(value) for section, value in zip(self.template.sections, sections)
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+class TemplateRegistry:
+    """Every published version of one report kind, keyed by version number."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._versions: Dict[int, VersionedTemplate] = {}
+
+    def register(
+        self, version: int, sections: Dict[str, Dict[str, list]], header_choices: HeaderChoices = ()
+    ) -> VersionedTemplate:
+        if version in self._versions:
+            raise ValueError(f'{self.kind} template version {version} is already registered')
+        template = VersionedTemplate(version, compile_sections(sections), tuple(
+            (name, tuple(choices)) for name, choices in header_choices
+        ))
+        self._versions[version] = template
+        return template
+
+    @property
+    def current(self) -> VersionedTemplate:
+        return self._versions[max(self._versions)]
+
+    def get(self, version: int) -> VersionedTemplate:
+        try:
+            return self._versions[version]
+        except KeyError:
+            raise LookupError(f'No {self.kind} template version {version}') from None
@@ -1,10 +1,38 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+import hashlib
 import random
-from typing import Dict
+from typing import Any, Dict, Optional, Sequence, Type, Union
 
-from ..schemas import AstrologyReportPayload, ZodiacReportPayload, ReportSection
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import get_settings
+from ..metrics import Histogram
+from ..schemas import AstrologyReportPayload, AstrologyReportResponse, ZodiacReportPayload, ZodiacReportResponse
+from .astro_utils import chinese_zodiac, five_element_by_year, lunar_year, western_zodiac
+from .cache import TTLCache
+from .ephemeris import ChartPositions, compute_chart, compute_charts
+from .gazetteer import get_gazetteer, utc_offset_hours
+from .report_templates import RenderedReport, TemplateRegistry, dump_json
+
+settings = get_settings()
+
+DAILY = 'daily'
+REPORT_HISTORY_MAX = 50
+
+# Today's daily report per (user_id, day), so dashboard refreshes cost no query.
+daily_report_cache: TTLCache[AstrologyReportResponse] = TTLCache(
+    'daily_reports', settings.daily_report_cache_size, 24 * 60 * 60
+)
+
+# Chart computation plus template rendering, per report kind (nightly batches included).
+report_generation_seconds = Histogram(
+    'astro_report_generation_seconds', 'Time to compute and render one report.', ('kind',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0),
+)
 
 
 ASTRO_SECTIONS = {
@@ -142,46 +170,264 @@ ZODIAC_SECTIONS = {
 }
 
 
-def pick_random(values):
-    return random.choice(values)
+ZODIAC_SUMMARIES = [
+    '今年的节奏强调内在力量的稳固，你的行动与信念正逐步对齐。',
+    '这是调频的一年，懂得在前进与休息之间找到富有诗性的平衡。',
+    '宇宙提示你以根基为先，在稳定中孕育新的突破与惊喜。',
+    '贵人与灵感会在旅途中出现，请以开放的心拥抱每一段际遇。'
+]
 
+# Stored reports reference a template version, so published versions are only
+# ever added, never edited: change the text by registering the next version.
+ASTROLOGY_TEMPLATES = TemplateRegistry('astrology')
+ASTROLOGY_TEMPLATES.register(1, ASTRO_SECTIONS)
+ZODIAC_TEMPLATES = TemplateRegistry('zodiac')
+ZODIAC_TEMPLATES.register(1, ZODIAC_SECTIONS, header_choices=(('summary', ZODIAC_SUMMARIES),))
 
-def build_sections(config: Dict[str, Dict[str, list]]) -> list[ReportSection]:
-    sections: list[ReportSection] = []
-    for key, value in config.items():
-        section = ReportSection(
-            id=value.get('tag', key),
-            title=value['title'],
-            summary=pick_random(value['summaries']),
-            details=value['details']
-        )
-        sections.append(section)
-    return sections
-
-
-def generate_astrology_report(sign: str, sun: str, moon: str, rising: str) -> AstrologyReportPayload:
-    return AstrologyReportPayload(
-        generated_at=datetime.utcnow(),
-        sign=sign,
-        sun=sun,
-        moon=moon,
-        rising=rising,
-        sections=build_sections(ASTRO_SECTIONS)
+
+def generate_astrology_report(
+    sign: str, sun: str, moon: str, rising: str, rng: Optional[random.Random] = None
+) -> RenderedReport:
+    template = ASTROLOGY_TEMPLATES.current
+    header = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'sign': sign,
+        'sun': sun,
+        'moon': moon,
+        'rising': rising,
+    }
+    return template.render(header, template.pick(rng))
+
+
+def generate_zodiac_report(zodiac: str, element: str, year: int, rng: Optional[random.Random] = None) -> RenderedReport:
+    template = ZODIAC_TEMPLATES.current
+    header = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'zodiac': zodiac,
+        'element': element,
+        'year': year,
+    }
+    return template.render(header, template.pick(rng))
+
+
+def astrology_record(rendered: RenderedReport) -> Dict[str, Any]:
+    """Columns stored for a rendered astrology report: template version, packed variants and scalars."""
+    payload = rendered.payload
+    return {
+        'template_version': rendered.version,
+        'variants': ASTROLOGY_TEMPLATES.get(rendered.version).encode(rendered.variants),
+        'sign': payload['sign'],
+        'sun': payload['sun'],
+        'moon': payload['moon'],
+        'rising': payload['rising'],
+    }
+
+
+def zodiac_record(rendered: RenderedReport) -> Dict[str, Any]:
+    payload = rendered.payload
+    return {
+        'template_version': rendered.version,
+        'variants': ZODIAC_TEMPLATES.get(rendered.version).encode(rendered.variants),
+        'zodiac': payload['zodiac'],
+        'element': payload['element'],
+    }
+
+
+def _astrology_header(report: models.AstrologyReport) -> Dict[str, Any]:
+    return {
+        'generated_at': report.generated_at.isoformat(),
+        'sign': report.sign,
+        'sun': report.sun,
+        'moon': report.moon,
+        'rising': report.rising,
+    }
+
+
+def _zodiac_header(report: models.ZodiacReport) -> Dict[str, Any]:
+    return {
+        'generated_at': report.generated_at.isoformat(),
+        'zodiac': report.zodiac,
+        'element': report.element,
+        'year': report.year,
+    }
+
+
+def astrology_payload(report: models.AstrologyReport) -> Dict[str, Any]:
+    """Rebuild a stored report's payload; rows the templates can't express keep their full payload.
+
+    ``report`` may be an ORM object or a Core row with the same columns.
+    """
+    if report.template_version is None:
+        return report.payload
+    template = ASTROLOGY_TEMPLATES.get(report.template_version)
+    return template.payload(_astrology_header(report), template.decode(report.variants))
+
+
+def zodiac_payload(report: models.ZodiacReport) -> Dict[str, Any]:
+    if report.template_version is None:
+        return report.payload
+    template = ZODIAC_TEMPLATES.get(report.template_version)
+    return template.payload(_zodiac_header(report), template.decode(report.variants))
+
+
+def astrology_payload_json(report: models.AstrologyReport) -> bytes:
+    """Serialized :func:`astrology_payload`, joined from the template's precompiled fragments.
+
+    Rows with a registered template version are trusted: their payload is
+    assembled from fragments that were built from the template itself, so it
+    needs no validation. Legacy rows still carrying a stored payload go
+    through the response schema, as ``response_model`` would.
+    """
+    if report.template_version is None:
+        return AstrologyReportPayload.model_validate(report.payload).model_dump_json().encode('utf-8')
+    template = ASTROLOGY_TEMPLATES.get(report.template_version)
+    return template.render(_astrology_header(report), template.decode(report.variants)).json
+
+
+def zodiac_payload_json(report: models.ZodiacReport) -> bytes:
+    if report.template_version is None:
+        return ZodiacReportPayload.model_validate(report.payload).model_dump_json().encode('utf-8')
+    template = ZODIAC_TEMPLATES.get(report.template_version)
+    return template.render(_zodiac_header(report), template.decode(report.variants)).json
+
+
+def _report_json(head: Dict[str, Any], payload_json: bytes) -> bytes:
+    head['generated_at'] = head['generated_at'].isoformat() if head['generated_at'] else None
+    return dump_json(head)[:-1] + b',"payload":' + payload_json + b'}'
+
+
+def astrology_report_json(report: models.AstrologyReport) -> bytes:
+    """:class:`AstrologyReportResponse` bytes for an ORM object or Core row, without building the model."""
+    head = {'id': report.id, 'report_type': report.report_type, 'generated_at': report.generated_at}
+    return _report_json(head, astrology_payload_json(report))
+
+
+def zodiac_report_json(report: models.ZodiacReport) -> bytes:
+    head = {'id': report.id, 'year': report.year, 'generated_at': report.generated_at}
+    return _report_json(head, zodiac_payload_json(report))
+
+
+def astrology_response(report: models.AstrologyReport) -> AstrologyReportResponse:
+    return AstrologyReportResponse(
+        id=report.id,
+        report_type=report.report_type,
+        generated_at=report.generated_at,
+        payload=astrology_payload(report),
+    )
+
+
+def zodiac_response(report: models.ZodiacReport) -> ZodiacReportResponse:
+    return ZodiacReportResponse(
+        id=report.id, year=report.year, generated_at=report.generated_at, payload=zodiac_payload(report)
     )
 
 
-def generate_zodiac_report(zodiac: str, element: str, year: int) -> ZodiacReportPayload:
-    return ZodiacReportPayload(
-        generated_at=datetime.utcnow(),
-        zodiac=zodiac,
-        element=element,
-        summary=pick_random([
-            '今年的节奏强调内在力量的稳固，你的行动与信念正逐步对齐。',
-            '这是调频的一年，懂得在前进与休息之间找到富有诗性的平衡。',
-            '宇宙提示你以根基为先，在稳定中孕育新的突破与惊喜。',
-            '贵人与灵感会在旅途中出现，请以开放的心拥抱每一段际遇。'
-        ]),
-        year=year,
-        sections=build_sections(ZODIAC_SECTIONS)
+def birth_location(birth_date: date, birth_time: Optional[time], birth_place: Optional[str]) -> tuple[float, float, float]:
+    """(latitude, longitude, UTC offset hours) for a birth, falling back to the configured default place."""
+    place = get_gazetteer().resolve(birth_place) if birth_place else None
+    if place is None:
+        return settings.default_latitude, settings.default_longitude, settings.default_utc_offset_hours
+    local = datetime.combine(birth_date, birth_time or time(12))
+    return place.latitude, place.longitude, utc_offset_hours(place.timezone, local, settings.default_utc_offset_hours)
+
+
+def chart_for(birth_date: date, birth_time: Optional[time], birth_place: Optional[str] = None) -> ChartPositions:
+    return compute_chart(birth_date, birth_time, *birth_location(birth_date, birth_time, birth_place))
+
+
+def charts_for(births: Sequence[tuple[date, Optional[time], Optional[str]]]) -> list[ChartPositions]:
+    """Vectorized :func:`chart_for` for a batch of (birth_date, birth_time, birth_place) triples."""
+    latitudes, longitudes, offsets = zip(*(birth_location(*birth) for birth in births)) if births else ((), (), ())
+    return compute_charts(
+        [birth_date for birth_date, _, _ in births],
+        [birth_time for _, birth_time, _ in births],
+        latitudes,
+        longitudes,
+        offsets,
+    )
+
+
+def astrology_report_for(
+    user_id: int,
+    birth_date: date,
+    birth_time: Optional[time],
+    birth_place: Optional[str],
+    day: date,
+    rng: Optional[random.Random] = None,
+    chart: Optional[ChartPositions] = None,
+) -> RenderedReport:
+    """Generate a user's astrology report for ``day``; ``rng=None`` means the seeded daily draw.
+
+    Pass ``chart`` when it was already computed for a whole batch of users.
+    """
+    with report_generation_seconds.time('astrology'):
+        sign = western_zodiac(birth_date)
+        chart = chart or chart_for(birth_date, birth_time, birth_place)
+        return generate_astrology_report(
+            sign=sign,
+            sun=chart.sun,
+            moon=chart.moon,
+            rising=chart.rising,
+            rng=rng or daily_rng(user_id, sign, day),
+        )
+
+
+def zodiac_report_for(birth_date: date, year: int, rng: Optional[random.Random] = None) -> RenderedReport:
+    with report_generation_seconds.time('zodiac'):
+        birth_year = lunar_year(birth_date)
+        return generate_zodiac_report(
+            zodiac=chinese_zodiac(birth_year),
+            element=five_element_by_year(birth_year),
+            year=year,
+            rng=rng,
+        )
+
+
+def latest_reports_query(
+    model: Type[Union[models.AstrologyReport, models.ZodiacReport]], user_id: int, limit: int
+) -> Select:
+    """A user's newest reports first; matches the (user_id, generated_at DESC) indexes."""
+    return (
+        select(model)
+        .where(model.user_id == user_id)
+        .order_by(model.generated_at.desc())
+        .limit(limit)
     )
 
+
+def latest_report_rows_query(
+    model: Type[Union[models.AstrologyReport, models.ZodiacReport]], user_id: int, limit: int
+) -> Select:
+    """:func:`latest_reports_query` as plain column tuples, skipping ORM identity-map overhead."""
+    return latest_reports_query(model, user_id, limit).with_only_columns(*model.__table__.c)
+
+
+def daily_rng(user_id: int, sign: str, day: date) -> random.Random:
+    """Seed the variant picks so a user's daily report is the same all day."""
+    digest = hashlib.sha256(f'{user_id}:{sign}:{day.isoformat()}'.encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def seconds_until_day_ends(day: date) -> float:
+    return max((day_bounds(day)[1] - datetime.utcnow()).total_seconds(), 0.0)
+
+
+async def find_daily_report(db: AsyncSession, user_id: int, day: date) -> Optional[models.AstrologyReport]:
+    start, end = day_bounds(day)
+    result = await db.execute(
+        select(models.AstrologyReport)
+        .where(
+            models.AstrologyReport.user_id == user_id,
+            models.AstrologyReport.generated_at >= start,
+            models.AstrologyReport.generated_at < end,
+            models.AstrologyReport.report_type == DAILY,
+        )
+        .order_by(models.AstrologyReport.generated_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
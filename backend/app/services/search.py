@@ -0,0 +1,307 @@
+"""Full-text article search with CJK-aware tokenization.
+
+Chinese has no spaces, so text is tokenized here rather than by the
+database: runs of CJK characters become overlapping bigrams (星座运势 →
+星座 座运 运势) and Latin/digit runs become lowercase words. The resulting
+token string is indexed by
+
+* SQLite: an FTS5 table ``articles_fts`` (unicode61 tokenizer splits on the
+  spaces we insert), ranked with ``bm25``;
+* Postgres: ``article_search.document``, a ``tsvector`` built with the
+  ``simple`` configuration under a GIN index, ranked with ``ts_rank_cd``;
+* anything else: no index, and ``plan_search`` falls back to a ``LIKE`` scan.
+
+A query run matches as a phrase of its bigrams, so word order inside a
+Chinese term is respected. Snippets are cut from the original text in
+Python, since the indexed text is the bigram form.
+
+Importing this module installs the DDL hook (``create_all`` builds the index
+table) and the Article mapper events that keep the index in sync with every
+ORM insert, update and delete.
+"""
+from __future__ import annotations
+
+import html
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.engine import Connection
+
+from .. import models
+from ..database import Base
+
+SEARCH_PAGE_MAX = 20
+SEARCH_OFFSET_MAX = 200
+TITLE_WEIGHT = 5.0
+SNIPPET_CHARS = 80
+
+# Tables that live outside the ORM metadata; autogenerate must ignore them.
+SEARCH_INDEX_TABLES = ('articles_fts', 'article_search')
+
+_CJK = '㐀-䶿一-鿿豈-﫿'
+_RUNS = re.compile(rf'[{_CJK}]+|[0-9a-z]+')
+_IS_CJK = re.compile(rf'[{_CJK}]')
+
+_SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+_POSTGRES_DDL = (
+    'CREATE TABLE IF NOT EXISTS article_search ('
+    'article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE, '
+    'document TSVECTOR NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_article_search_document ON article_search USING GIN (document)',
+)
+
+
+def include_name(name: Optional[str], type_: str, parent_names: Dict[str, Any]) -> bool:
+    """Alembic ``include_name`` hook hiding the search tables (and FTS5 shadow tables)."""
+    if type_ == 'table' and name:
+        return not name.startswith(SEARCH_INDEX_TABLES)
+    return True
+
+
+def _normalize(value: str) -> str:
+    return unicodedata.normalize('NFKC', value).casefold()
+
+
+def query_runs(value: str) -> List[str]:
+    """Unique CJK/word runs of ``value``, in order; each run is searched as one phrase."""
+    return list(dict.fromkeys(_RUNS.findall(_normalize(value))))
+
+
+def run_tokens(run: str) -> List[str]:
+    if _IS_CJK.match(run) and len(run) > 1:
+        return [run[i:i + 2] for i in range(len(run) - 1)]
+    return [run]
+
+
+def tokenize(*values: Optional[str]) -> str:
+    return ' '.join(token for value in values if value for run in _RUNS.findall(_normalize(value)) for token in run_tokens(run))
+
+
+def _is_prefix_run(run: str) -> bool:
+    # A lone CJK character is matched as the first half of any bigram.
+    return len(run) == 1 and bool(_IS_CJK.match(run))
+
+
+def create_search_index(conn: Connection) -> None:
+    if conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql(_SQLITE_DDL)
+    elif conn.dialect.name == 'postgresql':
+        for statement in _POSTGRES_DDL:
+            conn.exec_driver_sql(statement)
+
+
+def drop_search_index(conn: Connection) -> None:
+    if conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql('DROP TABLE IF EXISTS articles_fts')
+    elif conn.dialect.name == 'postgresql':
+        conn.exec_driver_sql('DROP TABLE IF EXISTS article_search')
+
+
+def index_articles(conn: Connection, articles: Iterable[Tuple[int, str, Optional[str], str]]) -> None:
+    """(Re)index ``(id, title, summary, content)`` rows."""
+    rows = [
+        {'id': article_id, 'title': tokenize(title), 'body': tokenize(summary, content)}
+        for article_id, title, summary, content in articles
+    ]
+    if not rows:
+        return
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text('DELETE FROM articles_fts WHERE rowid = :id'), rows)
+        conn.execute(text('INSERT INTO articles_fts (rowid, title, body) VALUES (:id, :title, :body)'), rows)
+    elif conn.dialect.name == 'postgresql':
+        conn.execute(
+            text(
+                'INSERT INTO article_search (article_id, document) VALUES (:id, '
+                "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B')) "
+                'ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document'
+            ),
+            rows,
+        )
+
+
+def remove_articles(conn: Connection, article_ids: Sequence[int]) -> None:
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text('DELETE FROM articles_fts WHERE rowid = :id'), [{'id': i} for i in article_ids])
+    elif conn.dialect.name == 'postgresql':
+        conn.execute(text('DELETE FROM article_search WHERE article_id = :id'), [{'id': i} for i in article_ids])
+
+
+def rebuild_search_index(conn: Connection, batch_size: int = 1000) -> int:
+    """Reindex every article from scratch; returns the number indexed."""
+    drop_search_index(conn)
+    create_search_index(conn)
+    last_id, total = 0, 0
+    while True:
+        rows = conn.execute(
+            text(
+                'SELECT id, title, summary, content FROM articles WHERE id > :last ORDER BY id LIMIT :limit'
+            ),
+            {'last': last_id, 'limit': batch_size},
+        ).all()
+        if not rows:
+            return total
+        index_articles(conn, rows)
+        last_id = rows[-1].id
+        total += len(rows)
+
+
+@dataclass(frozen=True)
+class SearchPlan:
+    """A parsed query: the SQL to run plus the runs used for highlighting."""
+
+    runs: Tuple[str, ...]
+    sql: str
+    params: Dict[str, Any]
+
+
+def _fts5_match(runs: Sequence[str]) -> str:
+    # Tokens are [0-9a-z] words or CJK bigrams, so double quotes are safe.
+    terms = [f'"{run}"*' if _is_prefix_run(run) else '"' + ' '.join(run_tokens(run)) + '"' for run in runs]
+    return ' AND '.join(terms)
+
+
+def plan_search(dialect: str, query: str, limit: int, offset: int) -> Optional[SearchPlan]:
+    runs = tuple(query_runs(query))
+    if not runs:
+        return None
+    columns = 'a.id, a.title, a.slug, a.summary, a.content, a.published_at'
+    params: Dict[str, Any] = {'limit': limit, 'offset': offset}
+    if dialect == 'sqlite':
+        params['match'] = _fts5_match(runs)
+        # bm25() is lower-is-better; negate it so both dialects report higher-is-better.
+        sql = (
+            f'SELECT {columns}, -bm25(articles_fts, {TITLE_WEIGHT}, 1.0) AS score '
+            'FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid '
+            "WHERE articles_fts MATCH :match AND a.status = 'published' "
+            'ORDER BY score DESC, a.id DESC LIMIT :limit OFFSET :offset'
+        )
+    elif dialect == 'postgresql':
+        parts = []
+        for i, run in enumerate(runs):
+            if _is_prefix_run(run):
+                params[f't{i}'] = f'{run}:*'
+                parts.append(f"to_tsquery('simple', :t{i})")
+            else:
+                params[f't{i}'] = ' '.join(run_tokens(run))
+                parts.append(f"phraseto_tsquery('simple', :t{i})")
+        tsquery = ' && '.join(parts)
+        sql = (
+            f'SELECT {columns}, ts_rank_cd(s.document, q.query) AS score '
+            f'FROM article_search s JOIN articles a ON a.id = s.article_id, (SELECT {tsquery} AS query) q '
+            "WHERE s.document @@ q.query AND a.status = 'published' "
+            'ORDER BY score DESC, a.id DESC LIMIT :limit OFFSET :offset'
+        )
+    else:
+        # No index on this dialect: scan with LIKE (runs hold no LIKE wildcards),
+        # scoring title matches above body matches.
+        matched, scores = [], []
+        for i, run in enumerate(runs):
+            params[f't{i}'] = f'%{run}%'
+            matched.append(f'(lower(a.title) LIKE :t{i} OR lower(a.summary) LIKE :t{i} OR lower(a.content) LIKE :t{i})')
+            scores.append(f'CASE WHEN lower(a.title) LIKE :t{i} THEN {TITLE_WEIGHT} ELSE 1.0 END')
+        score = ' + '.join(scores)
+        sql = (
+            f'SELECT {columns}, {score} AS score FROM articles a '
+            f"WHERE {' AND '.join(matched)} AND a.status = 'published' "
+            'ORDER BY score DESC, a.id DESC LIMIT :limit OFFSET :offset'
+        )
+    return SearchPlan(runs=runs, sql=sql, params=params)
+
+
+def _folded_spans(value: str, runs: Sequence[str]) -> List[Tuple[int, int]]:
+    """Spans of ``value`` whose normalized form matches a run, in order.
+
+    Matching runs on the normalized text, whose length can differ from the
+    original (ß → ss, ﬁ → fi, ㎏ → kg), so each normalized character keeps the
+    index of the original character it came from and matches map back through it.
+    """
+    folded, origins = [], []
+    for index, char in enumerate(value):
+        piece = _normalize(char)
+        folded.append(piece)
+        origins.extend([index] * len(piece))
+    pattern = re.compile('|'.join(re.escape(run) for run in sorted(runs, key=len, reverse=True)))
+    spans: List[Tuple[int, int]] = []
+    for match in pattern.finditer(''.join(folded)):
+        start, end = origins[match.start()], origins[match.end() - 1] + 1
+        if spans and start < spans[-1][1]:  # both ends inside one expanded character
+            continue
+        spans.append((start, end))
+    return spans
+
+
+def highlight(value: Optional[str], runs: Sequence[str], width: Optional[int] = None) -> Optional[str]:
+    """HTML-escape ``value`` and wrap matches in ``<mark>``; with ``width``, cut a window around the first match."""
+    if value is None:
+        return None
+    spans = _folded_spans(value, runs)
+    start, end = 0, len(value)
+    if width is not None:
+        centre = spans[0][0] if spans else 0
+        start = max(0, centre - width // 3)
+        end = min(len(value), start + width)
+    pieces, cursor = [], start
+    for match_start, match_end in spans:
+        if match_start < start or match_end > end:
+            continue
+        pieces.append(html.escape(value[cursor:match_start]))
+        pieces.append(f'<mark>{html.escape(value[match_start:match_end])}</mark>')
+        cursor = match_end
+    pieces.append(html.escape(value[cursor:end]))
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(value) else ''
+    return prefix + ''.join(pieces) + suffix
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str]
+    published_at: Optional[datetime]
+    score: float
+    title_highlight: str
+    snippet: str
+
+
+def hits_from_rows(rows: Iterable[Any], runs: Sequence[str]) -> List[SearchHit]:
+    return [
+        SearchHit(
+            id=row.id,
+            title=row.title,
+            slug=row.slug,
+            summary=row.summary,
+            published_at=row.published_at,
+            score=float(row.score),
+            title_highlight=highlight(row.title, runs),
+            snippet=highlight(row.content, runs, width=SNIPPET_CHARS),
+        )
+        for row in rows
+    ]
+
+
+event.listen(Base.metadata, 'after_create', DDL(_SQLITE_DDL).execute_if(dialect='sqlite'))
+for _statement in _POSTGRES_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+event.listen(
+    Base.metadata, 'before_drop', DDL('DROP TABLE IF EXISTS article_search').execute_if(dialect='postgresql')
+)
+
+
+@event.listens_for(models.Article, 'after_insert')
+@event.listens_for(models.Article, 'after_update')
+def _index_article(_mapper, connection: Connection, target: models.Article) -> None:
+    index_articles(connection, [(target.id, target.title, target.summary, target.content)])
+
+
+@event.listens_for(models.Article, 'after_delete')
+def _unindex_article(_mapper, connection: Connection, target: models.Article) -> None:
+    remove_articles(connection, [target.id])
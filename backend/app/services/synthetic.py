@@ -0,0 +1,421 @@
+"""Deterministic synthetic users, reports and articles for scale testing.
+
+Work is split into chunks of at most ``chunk_size`` rows. Every chunk draws
+from its own numpy stream seeded by ``(seed, table, chunk)``, so a given seed
+and starting id produce the same rows whatever the worker count. Worker
+processes generate chunks as tuples of database-ready values. The parent
+writes them in submission order, using ``executemany`` on SQLite and
+``COPY ... FROM STDIN`` on PostgreSQL. Users are therefore committed before
+the reports that reference them.
+
+Values are realistic where the app looks at them:
+- Report signs, zodiacs and elements follow each user's birth date, and the
+  sun, moon and rising positions are that user's chart.
+- Variant codes are valid for the current templates.
+- Birth places come from the gazetteer.
+- Article text and tags reuse the bootstrap content, and tag popularity is
+  skewed like real facets.
+
+Rows go in with explicit ids after the current maximum, through Core rather
+than the ORM. ``load_synthetic`` therefore rebuilds the tag and search
+indexes itself. Related articles are left to ``reindex-related``, which
+re-signs every article and takes minutes at a few hundred thousand.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import time as time_of_day
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .. import models
+from .astro_utils import CHINESE_ZODIAC, FIVE_ELEMENTS, classify_birth_dates
+from .bootstrap import MYSTIC_ARTICLES
+from .ephemeris import ECLIPTIC_SIGNS
+from .executors import InlineExecutor
+from .gazetteer import get_gazetteer
+from .reports import ASTROLOGY_TEMPLATES, DAILY, ZODIAC_TEMPLATES, charts_for
+from .search import rebuild_search_index
+from .tags import rebuild_tag_index
+from .versions import ARTICLES, bump_version_sync
+
+logger = logging.getLogger(__name__)
+
+# Every synthetic user can log in with this password (bcrypt, 12 rounds).
+SYNTHETIC_PASSWORD = 'password123'
+SYNTHETIC_PASSWORD_HASH = '$2b$12$HRv1PwnQbeub75BiqzCI1uz2JbcdkkR.ZAFzwp7joUpjiiBLAMArW'
+# Timestamps count back from a fixed instant so output doesn't depend on when it runs.
+EPOCH = np.datetime64('2026-01-01T00:00:00', 'us')
+
+USERS = 'users'
+ASTROLOGY = 'astrology_reports'
+ZODIAC = 'zodiac_reports'
+ARTICLE_ROWS = 'articles'
+_STREAMS = {USERS: 1, ASTROLOGY: 2, ZODIAC: 3, ARTICLE_ROWS: 4}
+COLUMNS = {
+    USERS: ('id', 'email', 'password_hash', 'name', 'birth_date', 'birth_time', 'birth_place', 'created_at'),
+    ASTROLOGY: (
+        'id', 'user_id', 'report_type', 'generated_at', 'template_version', 'variants', 'sign', 'sun', 'moon',
+        'rising',
+    ),
+    ZODIAC: ('id', 'user_id', 'year', 'generated_at', 'template_version', 'variants', 'zodiac', 'element'),
+    ARTICLE_ROWS: (
+        'id', 'title', 'slug', 'summary', 'cover_url', 'tags', 'content', 'published_at', 'status', 'updated_at',
+    ),
+}
+_MODELS = {
+    USERS: models.User, ASTROLOGY: models.AstrologyReport, ZODIAC: models.ZodiacReport, ARTICLE_ROWS: models.Article,
+}
+
+_SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤'
+_GIVEN = '子涵欣怡梓萱思雨一诺语桐浩宇宇轩俊杰明轩晨曦星辰若溪雨桐佳琪嘉怡静怡雅琪诗涵梦瑶安然天佑博文沐阳亦菲紫萱'
+_EXTRA_TAGS = (
+    '塔罗', '水晶', '冥想', '星盘', '流年', '合盘', '水逆', '新月', '满月', '疗愈', '芳香', '瑜伽', '风水', '梦境',
+    '数字命理', '脉轮', '呼吸法', '日记', '能量', '感恩',
+)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    table: str
+    stream: Tuple[int, ...]
+    first_id: int
+    count: int
+    # Reports belong to one chunk of users: ids [first_user_id, first_user_id + user_count).
+    first_user_id: int = 0
+    user_count: int = 0
+
+
+@dataclass
+class LoadStats:
+    rows: Dict[str, int] = field(default_factory=lambda: {table: 0 for table in COLUMNS})
+    chunks: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass(frozen=True)
+class _Vocabulary:
+    places: Tuple[str, ...]
+    sentences: Tuple[str, ...]
+    titles: Tuple[Tuple[str, str], ...]
+    tags: Tuple[str, ...]
+    tag_weights: np.ndarray
+
+
+@lru_cache(maxsize=1)
+def _vocabulary() -> _Vocabulary:
+    gazetteer = get_gazetteer()
+    sentences, titles, tags = [], [], []
+    for entry in MYSTIC_ARTICLES:
+        sentences.append(str(entry['summary']))
+        sentences.extend(line for line in str(entry['content']).splitlines() if line)
+        head, _, tail = str(entry['title']).partition('：')
+        titles.append((head, tail or head))
+        tags.extend(entry['tags'])
+    tags.extend(ECLIPTIC_SIGNS)
+    tags.extend(f'属{animal}' for animal in CHINESE_ZODIAC)
+    tags.extend(f'五行{element}' for element in FIVE_ELEMENTS)
+    tags.extend(_EXTRA_TAGS)
+    tags = list(dict.fromkeys(tags))
+    # Zipf-like popularity: a few tags cover most articles, as real facets do.
+    weights = 1.0 / np.arange(1, len(tags) + 1)
+    return _Vocabulary(
+        places=tuple(gazetteer.place(i).name for i in range(len(gazetteer))),
+        sentences=tuple(sentences),
+        titles=tuple(titles),
+        tags=tuple(tags),
+        tag_weights=weights / weights.sum(),
+    )
+
+
+def _rng(seed: int, table: str, stream: Sequence[int]) -> np.random.Generator:
+    return np.random.default_rng([seed, _STREAMS[table], *stream])
+
+
+def _timestamps(rng: np.random.Generator, count: int, span_days: int) -> List[str]:
+    """``count`` timestamps in the ``span_days`` before EPOCH, in SQLAlchemy's SQLite storage format."""
+    offsets = rng.integers(0, span_days * 86_400_000_000, size=count).astype('timedelta64[us]')
+    return [value.replace('T', ' ') for value in np.datetime_as_string(EPOCH - offsets, unit='us').tolist()]
+
+
+def user_birth_dates(seed: int, user_chunk: int, count: int) -> np.ndarray:
+    """Birth dates of one user chunk; report chunks regenerate them to pick matching signs."""
+    rng = _rng(seed, USERS, (user_chunk, 0))
+    return np.datetime64('1950-01-01') + rng.integers(0, 60 * 365, size=count).astype('timedelta64[D]')
+
+
+def _birth_details(rng: np.random.Generator, count: int) -> Tuple[list, list, list, list]:
+    """Seconds past midnight, has-time flags, place indexes and has-place flags: the first draws of a user stream."""
+    seconds = rng.integers(0, 86_400, size=count).tolist()
+    has_time = (rng.random(count) >= 0.1).tolist()
+    places = rng.integers(0, len(_vocabulary().places), size=count).tolist()
+    has_place = (rng.random(count) >= 0.05).tolist()
+    return seconds, has_time, places, has_place
+
+
+def _user_rows(seed: int, chunk: Chunk) -> List[tuple]:
+    vocabulary = _vocabulary()
+    count = chunk.count
+    births = np.datetime_as_string(user_birth_dates(seed, chunk.stream[0], count)).tolist()
+    rng = _rng(seed, USERS, (chunk.stream[0], 1))
+    seconds, has_time, places, has_place = _birth_details(rng, count)
+    surnames = rng.integers(0, len(_SURNAMES), size=count).tolist()
+    given = rng.integers(0, len(_GIVEN) - 1, size=count).tolist()
+    created = _timestamps(rng, count, 3 * 365)
+    ids = range(chunk.first_id, chunk.first_id + count)
+    return list(zip(
+        ids,
+        (f'synthetic{user_id}@example.com' for user_id in ids),
+        repeat(SYNTHETIC_PASSWORD_HASH),
+        (_SURNAMES[s] + _GIVEN[g:g + 2] for s, g in zip(surnames, given)),
+        births,
+        (f'{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}.000000' if t else None for s, t in zip(seconds, has_time)),
+        (vocabulary.places[p] if h else None for p, h in zip(places, has_place)),
+        created,
+    ))
+
+
+def _report_owners(seed: int, chunk: Chunk, rng: np.random.Generator) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    offsets = rng.integers(0, chunk.user_count, size=chunk.count)
+    births = user_birth_dates(seed, chunk.stream[0], chunk.user_count)[offsets]
+    return offsets, classify_birth_dates(births)
+
+
+def _owner_charts(seed: int, chunk: Chunk, offsets: np.ndarray) -> list:
+    """The charts the app computes for the report owners, from their regenerated birth rows."""
+    places = _vocabulary().places
+    dates = user_birth_dates(seed, chunk.stream[0], chunk.user_count)[offsets].astype(object)
+    seconds, has_time, place_ids, has_place = _birth_details(_rng(seed, USERS, (chunk.stream[0], 1)), chunk.user_count)
+    births = []
+    for birth_date, offset in zip(dates, offsets.tolist()):
+        second = seconds[offset]
+        births.append((
+            birth_date,
+            time_of_day(second // 3600, second // 60 % 60, second % 60) if has_time[offset] else None,
+            places[place_ids[offset]] if has_place[offset] else None,
+        ))
+    return charts_for(births)
+
+
+def _astrology_rows(seed: int, chunk: Chunk) -> List[tuple]:
+    rng = _rng(seed, ASTROLOGY, chunk.stream)
+    offsets, classes = _report_owners(seed, chunk, rng)
+    template = ASTROLOGY_TEMPLATES.current
+    variants = rng.integers(0, math.prod(template.radices), size=chunk.count).tolist()
+    charts = _owner_charts(seed, chunk, offsets)
+    return list(zip(
+        range(chunk.first_id, chunk.first_id + chunk.count), (chunk.first_user_id + offsets).tolist(), repeat(DAILY),
+        _timestamps(rng, chunk.count, 365), repeat(template.version), variants, classes['sign'].tolist(),
+        (chart.sun for chart in charts), (chart.moon for chart in charts), (chart.rising for chart in charts),
+    ))
+
+
+def _zodiac_rows(seed: int, chunk: Chunk) -> List[tuple]:
+    rng = _rng(seed, ZODIAC, chunk.stream)
+    offsets, classes = _report_owners(seed, chunk, rng)
+    template = ZODIAC_TEMPLATES.current
+    variants = rng.integers(0, math.prod(template.radices), size=chunk.count).tolist()
+    years = (2020 + rng.integers(0, 7, size=chunk.count)).tolist()
+    return list(zip(
+        range(chunk.first_id, chunk.first_id + chunk.count), (chunk.first_user_id + offsets).tolist(), years, _timestamps(rng, chunk.count, 365),
+        repeat(template.version), variants, classes['zodiac'].tolist(), classes['element'].tolist(),
+    ))
+
+
+def _json_list(values: Sequence[str]) -> str:
+    return '[' + ','.join(f'"{value}"' for value in values) + ']'
+
+
+def _article_rows(seed: int, chunk: Chunk) -> List[tuple]:
+    vocabulary = _vocabulary()
+    rng = _rng(seed, ARTICLE_ROWS, chunk.stream)
+    rows = []
+    published = _timestamps(rng, chunk.count, 3 * 365)
+    status = np.where(rng.random(chunk.count) < 0.9, 'published', 'draft').tolist()
+    for offset in range(chunk.count):
+        article_id = chunk.first_id + offset
+        head, tail = vocabulary.titles[rng.integers(len(vocabulary.titles))]
+        tags = rng.choice(len(vocabulary.tags), size=rng.integers(1, 5), replace=False, p=vocabulary.tag_weights)
+        picked = [vocabulary.tags[i] for i in tags]
+        lines = [vocabulary.sentences[i] for i in rng.integers(0, len(vocabulary.sentences), size=rng.integers(5, 40))]
+        rows.append((
+            article_id,
+            f'{head}·{picked[0]}篇：{tail}（{article_id}）',
+            f'synthetic-{article_id}',
+            lines[0],
+            None,
+            _json_list(picked),
+            '\n'.join(lines),
+            published[offset],
+            status[offset],
+            published[offset],
+        ))
+    return rows
+
+
+_GENERATORS = {USERS: _user_rows, ASTROLOGY: _astrology_rows, ZODIAC: _zodiac_rows, ARTICLE_ROWS: _article_rows}
+
+
+def generate_chunk(seed: int, chunk: Chunk) -> Tuple[Chunk, List[tuple]]:
+    """Worker entry point: the rows of one chunk, in ``COLUMNS[chunk.table]`` order."""
+    return chunk, _GENERATORS[chunk.table](seed, chunk)
+
+
+def _split(total: int, parts: int) -> List[int]:
+    return [total // parts + (index < total % parts) for index in range(parts)]
+
+
+def plan_chunks(
+    start_ids: Dict[str, int],
+    *,
+    users: int,
+    astrology_reports: int,
+    zodiac_reports: int,
+    articles: int,
+    chunk_size: int,
+) -> List[Chunk]:
+    """Chunks in write order; ``start_ids`` are the current maximum ids per table."""
+    if (astrology_reports or zodiac_reports) and not users:
+        raise ValueError('Reports are generated for the users of the same run; pass users > 0')
+    chunks: List[Chunk] = []
+    user_chunks = []
+    next_id = dict(start_ids)
+    for index, count in enumerate(_split(users, math.ceil(users / chunk_size))):
+        user_chunks.append((next_id[USERS] + 1, count))
+        chunks.append(Chunk(USERS, (index,), next_id[USERS] + 1, count))
+        next_id[USERS] += count
+    for table, total in ((ASTROLOGY, astrology_reports), (ZODIAC, zodiac_reports)):
+        shares = _split(total, len(user_chunks)) if user_chunks else []
+        for user_chunk, ((first_user_id, user_count), share) in enumerate(zip(user_chunks, shares)):
+            for part, count in enumerate(_split(share, math.ceil(share / chunk_size))):
+                chunks.append(Chunk(table, (user_chunk, part), next_id[table] + 1, count, first_user_id, user_count))
+                next_id[table] += count
+    for index, count in enumerate(_split(articles, math.ceil(articles / chunk_size))):
+        chunks.append(Chunk(ARTICLE_ROWS, (index,), next_id[ARTICLE_ROWS] + 1, count))
+        next_id[ARTICLE_ROWS] += count
+    return chunks
+
+
+def _copy_rows(conn: Connection, table: str, rows: List[tuple]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY {table} ({", ".join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+def write_rows(conn: Connection, table: str, rows: List[tuple]) -> None:
+    columns = COLUMNS[table]
+    if conn.dialect.name == 'postgresql' and conn.dialect.driver == 'psycopg2':
+        _copy_rows(conn, table, rows)
+        return
+    marker = '?' if conn.dialect.paramstyle == 'qmark' else '%s'
+    conn.exec_driver_sql(
+        f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join(repeat(marker, len(columns)))})', rows
+    )
+
+
+def _max_ids(engine: Engine) -> Dict[str, int]:
+    with engine.connect() as conn:
+        return {table: conn.execute(select(func.max(model.id))).scalar() or 0 for table, model in _MODELS.items()}
+
+
+def _finish(engine: Engine, stats: LoadStats) -> None:
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as conn:
+            for table, loaded in stats.rows.items():
+                if loaded:
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+                    ))
+    if stats.rows[ARTICLE_ROWS]:
+        with engine.begin() as conn:
+            rebuild_tag_index(conn)
+            rebuild_search_index(conn)
+        with Session(engine) as db:
+            bump_version_sync(db, ARTICLES)
+            db.commit()
+        logger.info('articles loaded; run `python -m app.cli reindex-related` to recompute related articles')
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+
+def load_synthetic(
+    engine: Engine,
+    *,
+    users: int = 0,
+    astrology_reports: int = 0,
+    zodiac_reports: int = 0,
+    articles: int = 0,
+    seed: int = 0,
+    chunk_size: int = 10_000,
+    workers: Optional[int] = None,
+    progress_every: int = 50,
+) -> LoadStats:
+    """Generate and bulk load synthetic rows after the existing ones."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = plan_chunks(
+        _max_ids(engine), users=users, astrology_reports=astrology_reports, zodiac_reports=zodiac_reports,
+        articles=articles, chunk_size=chunk_size,
+    )
+    stats = LoadStats()
+    executor: Executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else InlineExecutor()
+    max_in_flight = max(workers, 1) * 2
+    in_flight: deque[Future] = deque()
+    started = time.perf_counter()
+
+    with engine.connect() as conn:
+        if conn.dialect.name == 'sqlite':
+            # Throwaway scale data: skip fsyncs on the writer connection.
+            conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+            conn.commit()
+
+        def drain(limit: int) -> None:
+            while len(in_flight) > limit:
+                chunk, rows = in_flight.popleft().result()
+                with conn.begin():
+                    write_rows(conn, chunk.table, rows)
+                stats.rows[chunk.table] += len(rows)
+                stats.chunks += 1
+                if stats.chunks % progress_every == 0:
+                    stats.elapsed = time.perf_counter() - started
+                    logger.info('synthetic: %d rows, %.0f rows/sec', stats.total_rows, stats.rows_per_second)
+
+        try:
+            for chunk in chunks:
+                in_flight.append(executor.submit(generate_chunk, seed, chunk))
+                drain(max_in_flight)
+            drain(0)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    _finish(engine, stats)
+    stats.elapsed = time.perf_counter() - started
+    return stats
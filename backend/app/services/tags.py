@@ -0,0 +1,176 @@
+"""Normalized article tags and incrementally maintained tag counts.
+
+``Article.tags`` stays the JSON list the API reads and writes; this module
+mirrors it into ``article_tags`` (indexed by tag, for filtered listings) and
+keeps ``tag_counts`` (published articles per tag, for the facet list) up to
+date by applying +1/-1 deltas on every ORM write instead of recounting.
+
+Importing this module installs the Article mapper events that do the
+bookkeeping. Writes that bypass the ORM (Core inserts, manual SQL) need
+``rebuild_tag_index`` afterwards.
+"""
+from __future__ import annotations
+
+import unicodedata
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, event, inspect, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+TAG_MAX_LENGTH = 64
+TAG_FACET_MAX = 100
+
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def normalize_tags(tags: Optional[Iterable[object]]) -> List[str]:
+    """Unique, stripped, NFKC-normalized tags in their original order."""
+    cleaned = (unicodedata.normalize('NFKC', str(tag)).strip()[:TAG_MAX_LENGTH] for tag in tags or ())
+    return list(dict.fromkeys(tag for tag in cleaned if tag))
+
+
+def _is_published(status: Optional[str]) -> bool:
+    return status == 'published'
+
+
+def apply_tag_deltas(conn: Connection, deltas: Counter) -> None:
+    """Add each delta to its tag's count, creating missing rows and dropping empty ones.
+
+    One ``INSERT ... ON CONFLICT (tag) DO UPDATE`` adds every delta, so two
+    writers introducing the same tag both land instead of one hitting the
+    primary key. Rows go in tag order to take row locks in a consistent order.
+    """
+    changed = {tag: delta for tag, delta in deltas.items() if delta}
+    if not changed:
+        return
+    rows = [{'tag': tag, 'article_count': delta} for tag, delta in sorted(changed.items())]
+    dialect_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+    if dialect_insert is None:
+        _apply_tag_deltas_portably(conn, rows)
+    else:
+        upsert = dialect_insert(models.TagCount)
+        conn.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[models.TagCount.tag],
+                set_={'article_count': models.TagCount.article_count + upsert.excluded.article_count},
+            ),
+            rows,
+        )
+    conn.execute(
+        delete(models.TagCount).where(models.TagCount.tag.in_(changed), models.TagCount.article_count <= 0)
+    )
+
+
+def _apply_tag_deltas_portably(conn: Connection, rows: List[dict]) -> None:
+    # Update-then-insert for dialects without ON CONFLICT; racy between concurrent writers.
+    missing = []
+    for row in rows:
+        updated = conn.execute(
+            update(models.TagCount)
+            .where(models.TagCount.tag == row['tag'])
+            .values(article_count=models.TagCount.article_count + row['article_count'])
+        ).rowcount
+        if not updated and row['article_count'] > 0:
+            missing.append(row)
+    if missing:
+        conn.execute(insert(models.TagCount), missing)
+
+
+def _stored_tags(conn: Connection, article_id: int) -> Set[str]:
+    rows = conn.execute(select(models.ArticleTag.tag).where(models.ArticleTag.article_id == article_id))
+    return set(rows.scalars())
+
+
+def sync_article_tags(
+    conn: Connection,
+    article_id: int,
+    tags: Sequence[str],
+    published: bool,
+    was_published: bool,
+) -> None:
+    """Bring ``article_tags`` rows and ``tag_counts`` in line with one article's new state."""
+    old = _stored_tags(conn, article_id)
+    new = set(tags)
+    if old - new:
+        conn.execute(
+            delete(models.ArticleTag).where(
+                models.ArticleTag.article_id == article_id, models.ArticleTag.tag.in_(old - new)
+            )
+        )
+    if new - old:
+        conn.execute(insert(models.ArticleTag), [{'article_id': article_id, 'tag': tag} for tag in tags if tag not in old])
+    deltas: Counter = Counter()
+    deltas.update(new if published else ())
+    deltas.subtract(old if was_published else ())
+    apply_tag_deltas(conn, deltas)
+
+
+def rebuild_tag_index(conn: Connection, batch_size: int = 1000) -> Tuple[int, int]:
+    """Recompute both tables from ``articles.tags``; returns (tag rows, distinct published tags)."""
+    conn.execute(delete(models.ArticleTag))
+    conn.execute(delete(models.TagCount))
+    counts: Counter = Counter()
+    last_id, written = 0, 0
+    while True:
+        rows = conn.execute(
+            select(models.Article.id, models.Article.tags, models.Article.status)
+            .where(models.Article.id > last_id)
+            .order_by(models.Article.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        links = [{'article_id': row.id, 'tag': tag} for row in rows for tag in normalize_tags(row.tags)]
+        if links:
+            conn.execute(insert(models.ArticleTag), links)
+        for row in rows:
+            if _is_published(row.status):
+                counts.update(normalize_tags(row.tags))
+        written += len(links)
+        last_id = rows[-1].id
+    if counts:
+        conn.execute(insert(models.TagCount), [{'tag': tag, 'article_count': n} for tag, n in counts.items()])
+    return written, len(counts)
+
+
+async def tag_facets(db: AsyncSession, limit: int) -> List[Tuple[str, int]]:
+    result = await db.execute(
+        select(models.TagCount.tag, models.TagCount.article_count)
+        .where(models.TagCount.article_count > 0)
+        .order_by(models.TagCount.article_count.desc(), models.TagCount.tag)
+        .limit(limit)
+    )
+    return [(row.tag, row.article_count) for row in result]
+
+
+async def tagged_article_total(db: AsyncSession, tag: str) -> int:
+    result = await db.execute(select(models.TagCount.article_count).where(models.TagCount.tag == tag))
+    return int(result.scalar_one_or_none() or 0)
+
+
+@event.listens_for(models.Article, 'after_insert')
+def _tag_inserted_article(_mapper, connection: Connection, target: models.Article) -> None:
+    sync_article_tags(connection, target.id, normalize_tags(target.tags), _is_published(target.status), False)
+
+
+@event.listens_for(models.Article, 'after_update')
+def _tag_updated_article(_mapper, connection: Connection, target: models.Article) -> None:
+    status = inspect(target).attrs.status.history
+    was_published = _is_published(status.deleted[0] if status.deleted else target.status)
+    sync_article_tags(
+        connection, target.id, normalize_tags(target.tags), _is_published(target.status), was_published
+    )
+
+
+@event.listens_for(models.Article, 'before_delete')
+def _untag_deleted_article(_mapper, connection: Connection, target: models.Article) -> None:
+    # Runs before the DELETE so the rows are still there whether or not the
+    # database enforces the ON DELETE CASCADE.
+    status = inspect(target).attrs.status.history
+    was_published = _is_published(status.deleted[0] if status.deleted else target.status)
+    sync_article_tags(connection, target.id, [], False, was_published)
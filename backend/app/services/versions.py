@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+
+# Named counters bumped in the same transaction as the writes they describe.
+# Anything that changes these collections outside the routers (bulk loaders,
+# raw SQL) must bump the counter too or clients keep their cached copies.
+ARTICLES = 'articles'
+
+
+def _bump_statement(name: str):
+    return (
+        update(models.ContentVersion)
+        .where(models.ContentVersion.name == name)
+        .values(version=models.ContentVersion.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+async def bump_version(db: AsyncSession, name: str) -> None:
+    result = await db.execute(_bump_statement(name))
+    if result.rowcount == 0:
+        db.add(models.ContentVersion(name=name, version=1, updated_at=datetime.utcnow()))
+
+
+def bump_version_sync(db: Session, name: str) -> None:
+    result = db.execute(_bump_statement(name))
+    if result.rowcount == 0:
+        db.add(models.ContentVersion(name=name, version=1, updated_at=datetime.utcnow()))
+
+
+async def current_version(db: AsyncSession, name: str) -> Tuple[int, Optional[datetime]]:
+    result = await db.execute(
+        select(models.ContentVersion.version, models.ContentVersion.updated_at)
+        .where(models.ContentVersion.name == name)
+    )
+    row = result.first()
+    return (row.version, row.updated_at) if row else (0, None)
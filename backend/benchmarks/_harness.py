@@ -0,0 +1,94 @@
+"""Shared helpers for driving the ASGI app in-process under concurrency."""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@dataclass
+class LoadResult:
+    name: str
+    requests: int
+    concurrency: int
+    elapsed: float
+    latencies: List[float]
+    errors: int
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'requests': self.requests,
+            'concurrency': self.concurrency,
+            'rps': round(self.rps, 2),
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'mean_ms': round(statistics.fmean(self.latencies) * 1000, 3) if self.latencies else 0.0,
+            'errors': self.errors,
+        }
+
+    def describe(self) -> str:
+        data = self.as_dict()
+        return (
+            f"{data['name']:<28} {data['rps']:>10.1f} req/s  p50 {data['p50_ms']:>8.2f}ms  "
+            f"p95 {data['p95_ms']:>8.2f}ms  p99 {data['p99_ms']:>8.2f}ms  errors {data['errors']}"
+        )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    name: str,
+    method: str,
+    url: str,
+    *,
+    total: int,
+    concurrency: int,
+    make_kwargs: Optional[Callable[[int], Dict[str, Any]]] = None,
+    expected_status: int = 200,
+) -> LoadResult:
+    """Issue ``total`` requests with at most ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            kwargs = make_kwargs(index) if make_kwargs else {}
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != expected_status:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return LoadResult(name, total, concurrency, elapsed, latencies, errors)
+
+
+def asgi_client(app) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url='http://bench')
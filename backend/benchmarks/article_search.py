@@ -0,0 +1,103 @@
+"""Article search latency: the FTS5 bigram index vs ``LIKE '%term%'`` scans.
+
+Builds a synthetic corpus of N published articles in a throwaway SQLite
+database, indexes it with ``rebuild_search_index`` and times the same queries
+through ``plan_search`` and through a LIKE filter over title and content.
+Text is drawn from an 800-character CJK pool, so a two-character query term
+hits roughly one article in a thousand, like a real topical keyword.
+
+    python -m benchmarks.article_search --articles 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from sqlalchemy import create_engine, insert, text
+
+from app import models
+from app.database import Base
+from app.services.search import plan_search, rebuild_search_index
+
+CHARACTERS = [chr(0x4E00 + i * 7) for i in range(800)]
+LATIN = ('tarot', 'ritual', 'moon', 'saturn', 'venus', 'retrograde')
+
+
+def paragraph(rng: random.Random, chars: int) -> str:
+    text = ''.join(rng.choices(CHARACTERS, k=chars))
+    return text[: chars // 2] + f' {rng.choice(LATIN)} ' + text[chars // 2:] + '。'
+
+
+def queries(rng: random.Random) -> list[str]:
+    pairs = [''.join(rng.choices(CHARACTERS, k=2)) for _ in range(3)]
+    return [pairs[0], ''.join(rng.choices(CHARACTERS, k=4)), f'{pairs[1]} {pairs[2]}', 'retrograde']
+
+
+def seed(engine, count: int) -> None:
+    Base.metadata.create_all(engine)
+    rng = random.Random(16)
+    base = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, count, 5000):
+            conn.execute(insert(models.Article), [
+                {
+                    'title': ''.join(rng.choices(CHARACTERS, k=12)),
+                    'slug': f'article-{offset + i}',
+                    'summary': paragraph(rng, 40),
+                    'tags': [],
+                    'content': paragraph(rng, 400),
+                    'status': 'published',
+                    'published_at': base - timedelta(minutes=offset + i),
+                }
+                for i in range(min(5000, count - offset))
+            ])
+        started = time.perf_counter()
+        rebuild_search_index(conn)
+        print(f'indexed {count:,} articles in {time.perf_counter() - started:.1f}s')
+
+
+def like_query(terms: list[str]) -> tuple[str, dict]:
+    clauses = ' AND '.join(f'(title LIKE :t{i} OR content LIKE :t{i})' for i in range(len(terms)))
+    sql = (
+        f"SELECT id FROM articles WHERE status = 'published' AND {clauses} "
+        'ORDER BY published_at DESC LIMIT 11'
+    )
+    return sql, {f't{i}': f'%{term}%' for i, term in enumerate(terms)}
+
+
+def timed(conn, sql: str, params: dict, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f'sqlite+pysqlite:///{Path(workdir) / "search.db"}')
+        seed(engine, args.articles)
+        print(f'{"query":<16}{"fts ms":>10}{"like ms":>10}')
+        with engine.connect() as conn:
+            for query in queries(random.Random(args.seed)):
+                plan = plan_search('sqlite', query, 11, 0)
+                fts = timed(conn, plan.sql, plan.params, args.repeat)
+                like = timed(conn, *like_query(query.split()), args.repeat)
+                print(f'{query:<16}{fts:>10.2f}{like:>10.2f}')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    main(parser.parse_args())
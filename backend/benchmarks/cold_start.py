@@ -0,0 +1,72 @@
+"""Cold start: ``import app.main`` time and time to the first served request.
+
+Each run is a fresh interpreter against a throwaway SQLite database. The
+first run sees an empty database, so the lifespan hook creates the schema
+and seeds it; later runs find the seed digest unchanged and skip both.
+
+    python -m benchmarks.cold_start --runs 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks._harness import PROJECT_ROOT
+
+CHILD = '''
+import asyncio, json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from benchmarks._harness import asgi_client
+
+async def first_request():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        async with asgi_client(app.main.app) as client:
+            response = await client.get('/api/health')
+            assert response.status_code == 200
+
+asyncio.run(first_request())
+served = time.perf_counter()
+print(json.dumps({'import': imported - started, 'first_request': served - started}))
+'''
+
+
+def run_child(database: Path) -> dict:
+    env = {
+        **os.environ,
+        'DATABASE_URL': f'sqlite+pysqlite:///{database}',
+        'ASYNC_DATABASE_URL': f'sqlite+aiosqlite:///{database}',
+        'BOOTSTRAP_ON_STARTUP': 'true',
+        'PASSWORD_HASH_WORKERS': '0',
+    }
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=PROJECT_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        database = Path(workdir) / 'cold.db'
+        runs = [run_child(database) for _ in range(args.runs + 1)]
+    print(f'{"database":<14}{"import ms":>12}{"first request ms":>20}')
+    seeded, warm = runs[0], runs[1:]
+    print(f'{"empty":<14}{seeded["import"] * 1000:>12.0f}{seeded["first_request"] * 1000:>20.0f}')
+    print(
+        f'{"initialized":<14}{statistics.median(r["import"] for r in warm) * 1000:>12.0f}'
+        f'{statistics.median(r["first_request"] for r in warm) * 1000:>20.0f}'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='warm runs after the seeding run')
+    main(parser.parse_args())
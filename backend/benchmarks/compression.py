@@ -0,0 +1,79 @@
+"""Bytes on the wire and CPU per request for identity, gzip and brotli responses.
+
+Drives the app in-process against a seeded SQLite database. "cold" clears the
+compressed-body cache before every request, so each response is compressed
+from scratch at the top quality level; "cached" is the steady state in
+which versioned responses reuse their compressed bytes. brotli rows appear
+only when the ``brotli`` module is installed.
+
+    python -m benchmarks.compression --requests 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._harness import asgi_client
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.auth import password_hasher
+from app.compression import available_codings, compressed_bodies
+from app.database import Base, get_async_db
+from app.main import app
+from app.services.bootstrap import MYSTIC_ARTICLES, bootstrap_data
+from slugify import slugify
+
+
+async def measure(client, url: str, coding: str, cold: bool, requests: int) -> tuple[int, float]:
+    headers = {'Accept-Encoding': coding}
+    size = 0
+    cpu = 0.0
+    for _ in range(requests):
+        if cold:
+            compressed_bodies.clear()
+        started = time.process_time()
+        response = await client.get(url, headers=headers)
+        cpu += time.process_time() - started
+        size = int(response.headers['content-length'])  # httpx decodes .content transparently
+        assert response.status_code == 200
+    return size, cpu / requests * 1000
+
+
+async def main(args: argparse.Namespace) -> None:
+    db_path = Path(tempfile.mkdtemp(prefix='astro-bench-')) / 'bench.db'
+    engine = create_engine(f'sqlite+pysqlite:///{db_path}')
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        bootstrap_data(session)
+    factory = async_sessionmaker(bind=create_async_engine(f'sqlite+aiosqlite:///{db_path}'), class_=AsyncSession)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    urls = (
+        '/api/zodiac-interpretations',
+        f"/api/articles/{slugify(MYSTIC_ARTICLES[0]['title'])}",
+        '/api/articles/?limit=20',
+    )
+    print(f'{"endpoint":<44}{"coding":>10}{"bytes":>10}{"cpu ms/req":>12}')
+    async with asgi_client(app) as client:
+        for url in urls:
+            for coding, cold in [('identity', False)] + [(c, cold) for c in available_codings() for cold in (True, False)]:
+                size, cpu = await measure(client, url, coding, cold, args.requests)
+                label = coding if coding == 'identity' else f"{coding} {'cold' if cold else 'cached'}"
+                print(f'{url[:43]:<44}{label:>10}{size:>10,}{cpu:>12.3f}')
+    password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,176 @@
+"""Endpoint suite: throughput and p50/p95/p99 for the main API flows, with stored baselines.
+
+Drives the ASGI app in-process on one event loop against a seeded temporary
+SQLite database. ``--save`` writes the results as a JSON baseline;
+``--compare`` reruns and exits non-zero when any endpoint's p95 grew or its
+throughput fell by more than ``--tolerance`` relative to that baseline.
+Report generation is also held to the PRD target (p99 under 2 s) on every run.
+Baselines are only comparable on the same machine and settings.
+
+    python -m benchmarks.endpoints --save benchmarks/baseline.json
+    python -m benchmarks.endpoints --compare benchmarks/baseline.json --tolerance 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks._harness import LoadResult, asgi_client, run_load
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.auth import password_hasher
+from app.config import get_settings
+from app.database import Base, get_async_db
+from app.main import app
+from app.services.bootstrap import bootstrap_data
+
+# PRD: report generation responds in under 2 s.
+REPORT_SLO_SECONDS = 2.0
+REPORT_SCENARIOS = ('POST /api/reports/astrology', 'POST /api/reports/zodiac')
+
+
+def _user(index: int) -> Dict[str, Any]:
+    return {
+        'email': f'bench{index}@example.com',
+        'password': 'password123',
+        'name': f'Bench {index}',
+        'birth_date': f'{1960 + index % 40}-{index % 12 + 1:02d}-{index % 28 + 1:02d}',
+        'birth_time': '08:30:00',
+        'birth_place': 'Shanghai',
+    }
+
+
+async def _setup_database() -> None:
+    db_path = Path(tempfile.mkdtemp(prefix='astro-bench-')) / 'bench.db'
+    engine = create_engine(f'sqlite+pysqlite:///{db_path}')
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        bootstrap_data(session)
+    engine.dispose()
+    factory = async_sessionmaker(
+        bind=create_async_engine(f'sqlite+aiosqlite:///{db_path}'), class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+async def run_suite(args: argparse.Namespace) -> List[LoadResult]:
+    await _setup_database()
+    results: List[LoadResult] = []
+    async with asgi_client(app) as client:
+
+        async def load(name: str, method: str, url: str, total: int, **kwargs) -> None:
+            result = await run_load(client, name, method, url, total=total, concurrency=args.concurrency, **kwargs)
+            results.append(result)
+            print(result.describe())
+
+        # bcrypt dominates these two, so they get a smaller request budget.
+        await load('POST /api/auth/register', 'POST', '/api/auth/register', args.auth_requests,
+                   make_kwargs=lambda i: {'json': _user(i)})
+        users = [_user(i) for i in range(args.users)]
+        tokens = []
+        for user in users:
+            login = await client.post('/api/auth/login', json={'email': user['email'], 'password': user['password']})
+            tokens.append({'Authorization': f"Bearer {login.json()['access_token']}"})
+        await load('POST /api/auth/login', 'POST', '/api/auth/login', args.auth_requests,
+                   make_kwargs=lambda i: {'json': {'email': users[i % len(users)]['email'], 'password': 'password123'}})
+
+        def as_user(i: int) -> Dict[str, Any]:
+            return {'headers': tokens[i % len(tokens)]}
+
+        await load('GET /api/users/me', 'GET', '/api/users/me', args.requests, make_kwargs=as_user)
+        await load('POST /api/reports/astrology', 'POST', '/api/reports/astrology?regenerate=true', args.requests,
+                   make_kwargs=as_user)
+        await load('POST /api/reports/zodiac', 'POST', '/api/reports/zodiac', args.requests, make_kwargs=as_user)
+        await load('GET /api/reports/astrology/latest', 'GET', '/api/reports/astrology/latest?limit=20',
+                   args.requests, make_kwargs=as_user)
+        await load('GET /api/articles/', 'GET', '/api/articles/', args.requests)
+        slug = (await client.get('/api/articles/')).json()['items'][0]['slug']
+        await load('GET /api/articles/{slug}', 'GET', f'/api/articles/{slug}', args.requests)
+        await load('GET /api/zodiac-interpretations', 'GET', '/api/zodiac-interpretations', args.requests)
+    password_hasher.shutdown()
+    return results
+
+
+def check_slo(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    failures = []
+    for name in REPORT_SCENARIOS:
+        p99 = results[name]['p99_ms']
+        if p99 > REPORT_SLO_SECONDS * 1000:
+            failures.append(f'{name}: p99 {p99:.1f} ms exceeds the {REPORT_SLO_SECONDS:.0f} s target')
+    return failures
+
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Regressions of p95 latency or throughput beyond ``tolerance`` (0.2 = 20%)."""
+    failures = []
+    print(f"\n{'endpoint':<34} {'p95 base':>10} {'p95 now':>10} {'rps base':>10} {'rps now':>10}")
+    for name, base in baseline.items():
+        now = current.get(name)
+        if now is None:
+            failures.append(f'{name}: missing from this run')
+            continue
+        print(f"{name:<34} {base['p95_ms']:>10.2f} {now['p95_ms']:>10.2f} {base['rps']:>10.1f} {now['rps']:>10.1f}")
+        if now['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            failures.append(f"{name}: p95 {base['p95_ms']:.2f} -> {now['p95_ms']:.2f} ms")
+        if now['rps'] < base['rps'] * (1 - tolerance):
+            failures.append(f"{name}: throughput {base['rps']:.1f} -> {now['rps']:.1f} req/s")
+        if now['errors'] > base['errors']:
+            failures.append(f"{name}: errors {base['errors']} -> {now['errors']}")
+    return failures
+
+
+def _baseline_document(results: Dict[str, Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'bcrypt_rounds': get_settings().bcrypt_rounds,
+        'requests': args.requests,
+        'auth_requests': args.auth_requests,
+        'concurrency': args.concurrency,
+        'results': results,
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {result.name: result.as_dict() for result in asyncio.run(run_suite(args))}
+    failures = check_slo(results)
+    if args.save:
+        Path(args.save).write_text(json.dumps(_baseline_document(results, args), indent=2) + '\n', encoding='utf-8')
+        print(f'baseline written to {args.save}')
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))
+        failures += compare(baseline['results'], results, args.tolerance)
+    for failure in failures:
+        print(f'FAIL {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--auth-requests', type=int, default=40, help='requests for register and login')
+    parser.add_argument('--users', type=int, default=8, help='registered users whose tokens the other endpoints use')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='fail on regressions against this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression (0.2 = 20%%)')
+    arguments = parser.parse_args()
+    if arguments.users > arguments.auth_requests:
+        parser.error('--users cannot exceed --auth-requests (the register step creates them)')
+    sys.exit(main(arguments))
@@ -0,0 +1,53 @@
+"""Natal chart throughput: one ``compute_chart`` call per user vs one vectorized batch.
+
+    python -m benchmarks.ephemeris --users 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, time as dt_time, timedelta
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.ephemeris import compute_chart, compute_charts
+
+
+def sample_births(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = date(1950, 1, 1)
+    dates = [start + timedelta(days=rng.randrange(365 * 60)) for _ in range(count)]
+    times = [dt_time(rng.randrange(24), rng.randrange(60)) if rng.random() < 0.8 else None for _ in range(count)]
+    latitudes = [rng.uniform(18.0, 50.0) for _ in range(count)]
+    longitudes = [rng.uniform(75.0, 135.0) for _ in range(count)]
+    return dates, times, latitudes, longitudes, [8.0] * count
+
+
+def main(args: argparse.Namespace) -> None:
+    dates, times, latitudes, longitudes, offsets = sample_births(args.users)
+
+    single_count = min(args.users, args.single_users)
+    started = time.perf_counter()
+    for i in range(single_count):
+        compute_chart(dates[i], times[i], latitudes[i], longitudes[i], offsets[i])
+    single_rate = single_count / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for offset in range(0, args.users, args.batch_size):
+        window = slice(offset, offset + args.batch_size)
+        compute_charts(dates[window], times[window], latitudes[window], longitudes[window], offsets[window])
+    batch_rate = args.users / (time.perf_counter() - started)
+
+    print(f'{"mode":<26}{"charts/sec":>14}')
+    print(f'{"single (per user)":<26}{single_rate:>14,.0f}')
+    print(f'{f"batch ({args.batch_size}/call)":<26}{batch_rate:>14,.0f}')
+    print(f'speedup: {batch_rate / single_rate:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--single-users', type=int, default=5000, help='users timed through the scalar path')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+"""Gazetteer lookup latency and resident memory.
+
+Runs against the bundled places file, or ``--synthetic N`` generated places to
+see how the memory-mapped index scales. Resident memory is split into file-
+backed pages (the mapped index, shared between workers) and anonymous pages
+(private to this process).
+
+    python -m benchmarks.gazetteer --synthetic 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import tempfile
+import timeit
+from pathlib import Path
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.gazetteer import BUNDLED_PLACES, Gazetteer, ensure_index
+
+
+def rss_kib() -> dict:
+    fields = {}
+    with open('/proc/self/status') as status:
+        for line in status:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def write_synthetic(path: Path, count: int) -> None:
+    rng = random.Random(11)
+    with path.open('w', encoding='utf-8') as handle:
+        for i in range(count):
+            name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+            handle.write(
+                f'城{i}\t{name.title()}\t\tXX\t{rng.uniform(-60, 60):.4f}\t{rng.uniform(-180, 180):.4f}'
+                f'\tAsia/Shanghai\t{rng.randint(1000, 10_000_000)}\n'
+            )
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        source = BUNDLED_PLACES
+        if args.synthetic:
+            source = Path(workdir) / 'places.tsv'
+            write_synthetic(source, args.synthetic)
+        index_dir = ensure_index(source, Path(workdir) / 'cache')
+
+        before = rss_kib()
+        gazetteer = Gazetteer(index_dir)
+        queries = ['北京市', 'Shanghai, China', 'Guangzhou', '31.2, 121.5', 'Atlantis']
+        for query in queries:
+            gazetteer.resolve(query)
+        gazetteer.complete('s')
+        after = rss_kib()
+
+        print(f'places: {len(gazetteer):,}  index on disk: '
+              f'{sum(f.stat().st_size for f in index_dir.iterdir()) / 1024:,.0f} KiB')
+        for label, run in (
+            ('resolve (name)', lambda: gazetteer.resolve('Guangzhou')),
+            ('resolve (zh + suffix)', lambda: gazetteer.resolve('北京市')),
+            ('resolve (miss)', lambda: gazetteer.resolve('Atlantis')),
+            ('complete("s", 10)', lambda: gazetteer.complete('s')),
+            ('complete("gua", 10)', lambda: gazetteer.complete('gua')),
+        ):
+            per_call = min(timeit.repeat(run, number=args.iterations, repeat=3)) / args.iterations * 1e6
+            print(f'{label:<24}{per_call:>10.2f} µs')
+        for key in ('VmRSS', 'RssFile', 'RssAnon'):
+            print(f'{key:<24}{after[key] - before[key]:>10,} KiB after load')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--synthetic', type=int, default=0, help='generate this many places instead of the bundled file')
+    parser.add_argument('--iterations', type=int, default=20000)
+    main(parser.parse_args())
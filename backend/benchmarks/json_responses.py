@@ -0,0 +1,147 @@
+"""List endpoint serialization: ORM + ``response_model`` vs column tuples + orjson.
+
+The "before" column reproduces the previous handlers: load ORM entities, build
+the response models (re-validating every report payload) and let FastAPI
+encode them with ``jsonable_encoder`` and the stdlib encoder. The "after"
+column is what ``/api/articles/`` and ``/api/reports/astrology/latest`` now
+do. A second table drives both endpoints end to end through the ASGI app.
+
+    python -m benchmarks.json_responses --limit 50 --requests 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from benchmarks._harness import asgi_client, run_load
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import models, schemas
+from app.auth import password_hasher
+from app.database import Base, get_async_db
+from app.main import app
+from app.responses import FastJSONResponse, json_array
+from app.services.articles import ARTICLE_LIST_COLUMNS, article_list_item, published_page_query
+from app.services.reports import (
+    astrology_record,
+    astrology_report_json,
+    astrology_response,
+    generate_astrology_report,
+    latest_report_rows_query,
+    latest_reports_query,
+)
+
+USER = {
+    'email': 'bench@example.com',
+    'password': 'password123',
+    'name': 'Bench',
+    'birth_date': '1990-01-01',
+    'birth_time': None,
+    'birth_place': None,
+}
+
+
+def seed(engine, limit: int) -> None:
+    rng = random.Random(20)
+    now = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Article), [
+            {
+                'title': f'文章 {i}', 'slug': f'bench-{i}', 'summary': '星象与日常' * 10, 'cover_url': None,
+                'tags': ['星座', '仪式'], 'content': '正文内容。' * 300, 'status': 'published',
+                'published_at': now - timedelta(minutes=i),
+            }
+            for i in range(limit * 4)
+        ])
+        conn.execute(insert(models.AstrologyReport), [
+            {
+                'user_id': 1, 'report_type': 'daily', 'generated_at': now - timedelta(days=i),
+                **astrology_record(generate_astrology_report('天秤座', '天秤座 14°', '双鱼座 02°', '双子座 11°', rng)),
+            }
+            for i in range(limit)
+        ])
+
+
+async def serialize(factory, limit: int, rounds: int) -> None:
+    def stdlib(content) -> bytes:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    async def articles_before(db):
+        articles = (await db.execute(published_page_query(limit))).scalars().all()
+        return stdlib(schemas.ArticlePage(items=articles))
+
+    async def articles_after(db):
+        rows = (await db.execute(published_page_query(limit, columns=ARTICLE_LIST_COLUMNS))).all()
+        return FastJSONResponse({'items': [article_list_item(r) for r in rows], 'next_cursor': None, 'total': None}).body
+
+    async def reports_before(db):
+        reports = (await db.execute(latest_reports_query(models.AstrologyReport, 1, limit))).scalars().all()
+        return stdlib([astrology_response(report) for report in reports])
+
+    async def reports_after(db):
+        rows = await db.execute(latest_report_rows_query(models.AstrologyReport, 1, limit))
+        return json_array(astrology_report_json(row) for row in rows)
+
+    print(f'{"in-process, " + str(limit) + " items":<34}{"before ms":>12}{"after ms":>12}{"speedup":>10}')
+    for label, before, after in (
+        ('GET /api/articles/', articles_before, articles_after),
+        ('GET /api/reports/astrology/latest', reports_before, reports_after),
+    ):
+        timings = []
+        for run in (before, after):
+            async with factory() as db:
+                await run(db)  # warm up
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    await run(db)
+                timings.append((time.perf_counter() - started) / rounds * 1000)
+        print(f'{label:<34}{timings[0]:>12.2f}{timings[1]:>12.2f}{timings[0] / timings[1]:>9.1f}x')
+
+
+async def main(args: argparse.Namespace) -> None:
+    db_path = Path(tempfile.mkdtemp(prefix='astro-bench-')) / 'bench.db'
+    engine = create_engine(f'sqlite+pysqlite:///{db_path}')
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{db_path}', poolclass=NullPool)
+    factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    async with asgi_client(app) as client:
+        await client.post('/api/auth/register', json=USER)
+        seed(engine, args.limit)
+        await serialize(factory, args.limit, args.rounds)
+
+        login = await client.post('/api/auth/login', json={'email': USER['email'], 'password': USER['password']})
+        headers = {'Authorization': f"Bearer {login.json()['access_token']}"}
+        print()
+        for label, url, kwargs in (
+            ('GET /api/articles/', f'/api/articles/?limit={args.limit}', {}),
+            ('GET /api/reports/astrology/latest', f'/api/reports/astrology/latest?limit={args.limit}', {'headers': headers}),
+        ):
+            result = await run_load(client, label, 'GET', url, total=args.requests,
+                                    concurrency=args.concurrency, make_kwargs=lambda _: kwargs)
+            print(result.describe())
+    password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
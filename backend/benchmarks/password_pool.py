@@ -0,0 +1,69 @@
+"""Login throughput and tail latency for different password-hashing pool sizes.
+
+A burst of logins runs alongside a stream of cheap GETs so the table also shows
+whether hashing still starves unrelated requests.
+
+    python -m benchmarks.password_pool --pool-sizes 1,2,4 --logins 200 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmarks._harness import asgi_client, run_load
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth import password_hasher
+from app.database import Base, get_async_db
+from app.main import app
+
+USER = {
+    'email': 'bench@example.com',
+    'password': 'password123',
+    'name': 'Bench',
+    'birth_date': '1990-01-01',
+    'birth_time': None,
+    'birth_place': None,
+}
+
+
+async def main(args: argparse.Namespace) -> None:
+    db_path = Path(tempfile.mkdtemp(prefix='astro-bench-')) / 'bench.db'
+    Base.metadata.create_all(bind=create_engine(f'sqlite+pysqlite:///{db_path}'))
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{db_path}')
+    factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    credentials = {'json': {'email': USER['email'], 'password': USER['password']}}
+    async with asgi_client(app) as client:
+        await client.post('/api/auth/register', json=USER)
+        print(f'{args.logins} logins at concurrency {args.concurrency}, queue limit {args.queue_limit}')
+        for size in [int(value) for value in args.pool_sizes.split(',')]:
+            password_hasher.configure(workers=size, queue_limit=args.queue_limit)
+            await client.post('/api/auth/login', **credentials)  # start the worker processes
+            logins, health = await asyncio.gather(
+                run_load(client, f'login (pool={size})', 'POST', '/api/auth/login',
+                         total=args.logins, concurrency=args.concurrency, make_kwargs=lambda _: credentials),
+                run_load(client, f'health (pool={size})', 'GET', '/api/health',
+                         total=args.logins * 5, concurrency=4),
+            )
+            print(logins.describe())
+            print(health.describe())
+    password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pool-sizes', default='1,2,4')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--queue-limit', type=int, default=256)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""Authenticated request latency with and without the principal cache.
+
+    python -m benchmarks.principal_cache --requests 3000 --concurrency 16
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+from benchmarks._harness import asgi_client, run_load
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth import password_hasher
+from app.database import Base, get_async_db
+from app.main import app
+from app.services.principals import principal_cache, token_cache
+
+USER = {
+    'email': 'bench@example.com',
+    'password': 'password123',
+    'name': 'Bench',
+    'birth_date': '1990-01-01',
+    'birth_time': None,
+    'birth_place': None,
+}
+
+
+async def main(args: argparse.Namespace) -> None:
+    db_path = Path(tempfile.mkdtemp(prefix='astro-bench-')) / 'bench.db'
+    Base.metadata.create_all(bind=create_engine(f'sqlite+pysqlite:///{db_path}'))
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{db_path}')
+    factory = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    async with asgi_client(app) as client:
+        await client.post('/api/auth/register', json=USER)
+        login = await client.post('/api/auth/login', json={'email': USER['email'], 'password': USER['password']})
+        headers = {'Authorization': f"Bearer {login.json()['access_token']}"}
+        sizes = (token_cache.maxsize, principal_cache.maxsize)
+
+        for label, enabled in (('GET /api/users/me uncached', False), ('GET /api/users/me cached', True)):
+            token_cache.clear()
+            principal_cache.clear()
+            token_cache.maxsize, principal_cache.maxsize = sizes if enabled else (0, 0)
+            result = await run_load(client, label, 'GET', '/api/users/me', total=args.requests,
+                                    concurrency=args.concurrency, make_kwargs=lambda _: {'headers': headers})
+            print(result.describe())
+        print('token cache', token_cache.stats())
+        print('principal cache', principal_cache.stats())
+    password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""Related articles at scale: full rebuild time, per-write refresh cost and list quality.
+
+Loads N synthetic articles into a throwaway SQLite database, times
+``rebuild_related_index``, then saves a few articles through the ORM and
+times the commit (what a request waits for) separately from the background
+refresh it queues. The rebuilt lists of a sample of articles are compared with
+their exact top-k from scoring every signature: recall counts the same
+neighbours, the score ratio how close the summed similarity comes (near-ties
+make recall understate the lists).
+
+    python -m benchmarks.related_articles --articles 50000
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+import numpy as np
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+from app.services.related import (
+    RELATED_TOP_K,
+    rebuild_related_index,
+    similarity_block,
+    top_neighbours,
+    wait_for_related_updates,
+)
+from app.services.synthetic import load_synthetic
+
+
+def list_quality(engine, sample: int) -> tuple[float, float]:
+    with engine.connect() as conn:
+        rows = conn.execute(select(models.ArticleSignature.article_id, models.ArticleSignature.signature)).all()
+        stored = {}
+        relations = select(
+            models.ArticleRelation.article_id, models.ArticleRelation.related_id, models.ArticleRelation.score,
+        )
+        for row in conn.execute(relations):
+            stored.setdefault(row.article_id, {})[row.related_id] = row.score
+    ids = np.array([row.article_id for row in rows])
+    matrix = np.frombuffer(b''.join(row.signature for row in rows), dtype='<u4').reshape(len(rows), -1)
+    picked = np.random.default_rng(0).choice(len(ids), size=min(sample, len(ids)), replace=False)
+    scores = similarity_block(matrix, matrix[picked])
+    found = expected = 0
+    got_score = best_score = 0.0
+    for row, index in zip(scores, picked):
+        row[index] = -1.0
+        exact = top_neighbours(ids, row)
+        kept = stored.get(int(ids[index]), {})
+        found += len({article_id for article_id, _ in exact} & kept.keys())
+        expected += len(exact)
+        got_score += sum(kept.values())
+        best_score += sum(score for _, score in exact)
+    return (found / expected if expected else 1.0), (got_score / best_score if best_score else 1.0)
+
+
+def timed_writes(engine, count: int) -> None:
+    commits, refreshes = [], []
+    with Session(engine) as db:
+        template = db.scalars(select(models.Article).where(models.Article.status == 'published')).first()
+        for index in range(count):
+            db.add(models.Article(
+                title=f'{template.title}（续{index}）', slug=f'bench-related-{index}', summary=template.summary,
+                tags=template.tags, content=template.content, status='published',
+            ))
+            started = time.perf_counter()
+            db.commit()
+            committed = time.perf_counter()
+            wait_for_related_updates()
+            commits.append(committed - started)
+            refreshes.append(time.perf_counter() - committed)
+    print(f'write: commit p50 {statistics.median(commits) * 1000:.1f} ms, '
+          f'background refresh p50 {statistics.median(refreshes) * 1000:.1f} ms')
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f'sqlite+pysqlite:///{Path(workdir) / "related.db"}')
+        Base.metadata.create_all(engine)
+        stats = load_synthetic(engine, articles=args.articles, seed=args.seed, workers=args.workers)
+        print(f'loaded {args.articles:,} articles in {stats.elapsed:.1f}s')
+        with engine.begin() as conn:
+            started = time.perf_counter()
+            total = rebuild_related_index(conn)
+            print(f'rebuild: {total:,} published articles in {time.perf_counter() - started:.1f}s')
+        found, score = list_quality(engine, args.sample)
+        print(f'against exact top-{RELATED_TOP_K}: recall {found:.2f}, score ratio {score:.3f}')
+        timed_writes(engine, args.writes)
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=50000)
+    parser.add_argument('--writes', type=int, default=20)
+    parser.add_argument('--sample', type=int, default=200, help='articles whose lists are checked against exact ones')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+"""Peak Python memory of exporting a report history: ``.all()`` vs the NDJSON stream.
+
+Seeds one user with N reports in a throwaway SQLite database, then measures
+the tracemalloc peak of materializing every row versus draining
+``stream_reports``. The stream's peak should stay flat as N grows.
+
+    python -m benchmarks.report_export --sizes 10000,100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import models
+from app.database import Base
+from app.services.exports import ReportKind, stream_reports
+from app.services.reports import astrology_record, astrology_response, generate_astrology_report
+
+
+def seed(url: str, count: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    rng = random.Random(5)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User).values(
+            id=1, email='export@example.com', password_hash='x', name='E', birth_date=date(1990, 1, 1)
+        ))
+        for offset in range(0, count, 10000):
+            conn.execute(insert(models.AstrologyReport), [
+                {
+                    'user_id': 1,
+                    'report_type': 'daily',
+                    'generated_at': datetime(2000, 1, 1) + timedelta(days=offset + i),
+                    **astrology_record(generate_astrology_report('天秤座', '天秤座 14°', '双鱼座 02°', '双子座 11°', rng)),
+                }
+                for i in range(min(10000, count - offset))
+            ])
+    engine.dispose()
+
+
+async def materialize(engine) -> int:
+    async with engine.connect() as conn:
+        rows = (await conn.execute(
+            select(*models.AstrologyReport.__table__.c).where(models.AstrologyReport.user_id == 1)
+        )).all()
+        return len([astrology_response(row).model_dump_json() for row in rows])
+
+
+async def stream(engine) -> int:
+    total = 0
+    async for chunk in stream_reports(engine, ReportKind.astrology, user_id=1):
+        total += chunk.count(b'\n')
+    return total
+
+
+def measure(run, engine) -> tuple[int, float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = asyncio.run(run(engine))
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, peak / 1024 / 1024
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f'{"reports":>10}{"mode":>14}{"seconds":>10}{"peak MiB":>10}')
+    for size in (int(value) for value in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = Path(workdir) / 'export.db'
+            seed(f'sqlite+pysqlite:///{path}', size)
+            engine = create_async_engine(f'sqlite+aiosqlite:///{path}', poolclass=NullPool)
+            for mode, run in (('all()', materialize), ('ndjson', stream)):
+                rows, elapsed, peak = measure(run, engine)
+                assert rows == size
+                print(f'{size:>10,}{mode:>14}{elapsed:>10.2f}{peak:>10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000')
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""Micro-benchmark of report generation: per-call pydantic models vs compiled templates.
+
+The "before" column reproduces the previous implementation, which built fresh
+``ReportSection`` models and then ran ``model_dump(mode='json')`` in the router.
+
+    python -m benchmarks.report_generation --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from datetime import datetime
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from app.schemas import AstrologyReportPayload, ReportSection, ZodiacReportPayload
+from app.services.reports import (
+    ASTRO_SECTIONS,
+    ZODIAC_SECTIONS,
+    ZODIAC_SUMMARIES,
+    generate_astrology_report,
+    generate_zodiac_report,
+)
+
+
+def _legacy_sections(config):
+    return [
+        ReportSection(
+            id=value.get('tag', key),
+            title=value['title'],
+            summary=random.choice(value['summaries']),
+            details=value['details'],
+        )
+        for key, value in config.items()
+    ]
+
+
+def legacy_astrology():
+    return AstrologyReportPayload(
+        generated_at=datetime.utcnow(), sign='天秤座', sun='天秤座 15°', moon='双鱼座 02°', rising='双子座 11°',
+        sections=_legacy_sections(ASTRO_SECTIONS),
+    ).model_dump(mode='json')
+
+
+def legacy_zodiac():
+    return ZodiacReportPayload(
+        generated_at=datetime.utcnow(), zodiac='狗', element='木', summary=random.choice(ZODIAC_SUMMARIES),
+        year=2026, sections=_legacy_sections(ZODIAC_SECTIONS),
+    ).model_dump(mode='json')
+
+
+def compiled_astrology():
+    return generate_astrology_report('天秤座', '天秤座 15°', '双鱼座 02°', '双子座 11°')
+
+
+def compiled_zodiac():
+    return generate_zodiac_report('狗', '木', 2026)
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f'{"":<22}{"before (µs)":>14}{"after (µs)":>14}{"speedup":>10}')
+    for name, before, after in (
+        ('astrology report', legacy_astrology, compiled_astrology),
+        ('zodiac report', legacy_zodiac, compiled_zodiac),
+    ):
+        before_us = min(timeit.repeat(before, number=args.iterations, repeat=3)) / args.iterations * 1e6
+        after_us = min(timeit.repeat(after, number=args.iterations, repeat=3)) / args.iterations * 1e6
+        print(f'{name:<22}{before_us:>14.2f}{after_us:>14.2f}{before_us / after_us:>9.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    main(parser.parse_args())
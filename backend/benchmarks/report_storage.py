@@ -0,0 +1,108 @@
+"""Report table size before and after migration 0006 (compact report storage).
+
+Builds a throwaway SQLite database at revision 0005, fills it with full-payload
+reports, then upgrades and VACUUMs to compare on-disk size and migration time.
+
+    python -m benchmarks.report_storage --reports 50000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import benchmarks._harness  # noqa: F401  (puts the backend on sys.path)
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import JSON, column, create_engine, insert, table, text
+
+from app.services.reports import generate_astrology_report, generate_zodiac_report
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+LEGACY_ASTROLOGY = table(
+    'astrology_reports', column('user_id'), column('report_type'), column('generated_at'), column('payload', JSON)
+)
+LEGACY_ZODIAC = table('zodiac_reports', column('user_id'), column('year'), column('generated_at'), column('payload', JSON))
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(str(BACKEND_ROOT / 'alembic.ini'))
+    config.set_main_option('script_location', str(BACKEND_ROOT / 'migrations'))
+    config.set_main_option('sqlalchemy.url', url)
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def table_bytes(engine) -> dict:
+    with engine.connect() as conn:
+        conn.exec_driver_sql('VACUUM')
+        try:
+            rows = conn.execute(text(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('astrology_reports', 'zodiac_reports') GROUP BY name"
+            )).all()
+        except Exception:  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+            rows = []
+        page_size = conn.exec_driver_sql('PRAGMA page_size').scalar()
+        page_count = conn.exec_driver_sql('PRAGMA page_count').scalar()
+    return {**dict(rows), 'database file': page_size * page_count}
+
+
+def seed(engine, count: int) -> None:
+    rng = random.Random(3)
+    started = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, password_hash, name, birth_date) VALUES (1, 'bench@example.com', 'x', 'B', :d)"
+        ), {'d': date(1990, 1, 1)})
+        for offset in range(0, count, 5000):
+            size = min(5000, count - offset)
+            moments = [started + timedelta(minutes=offset + i) for i in range(size)]
+            conn.execute(insert(LEGACY_ASTROLOGY), [
+                {
+                    'user_id': 1,
+                    'report_type': 'daily',
+                    'generated_at': moment,
+                    'payload': generate_astrology_report('天秤座', '天秤座 14°', '双鱼座 02°', '双子座 11°', rng).payload,
+                }
+                for moment in moments
+            ])
+            conn.execute(insert(LEGACY_ZODIAC), [
+                {
+                    'user_id': 1,
+                    'year': 2026,
+                    'generated_at': moment,
+                    'payload': generate_zodiac_report('狗', '木', 2026, rng).payload,
+                }
+                for moment in moments
+            ])
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        url = f"sqlite+pysqlite:///{Path(workdir) / 'storage.db'}"
+        engine = create_engine(url)
+        config = alembic_config(url)
+        command.upgrade(config, '0005')
+        seed(engine, args.reports)
+        before = table_bytes(engine)
+
+        started = time.perf_counter()
+        command.upgrade(config, 'head')
+        elapsed = time.perf_counter() - started
+        after = table_bytes(engine)
+        engine.dispose()
+
+    print(f'{args.reports:,} astrology + {args.reports:,} zodiac reports, migrated in {elapsed:.1f}s')
+    print(f'{"":<20}{"before (KiB)":>14}{"after (KiB)":>14}{"ratio":>8}')
+    for name in before:
+        print(f'{name:<20}{before[name] / 1024:>14,.0f}{after[name] / 1024:>14,.0f}{before[name] / after[name]:>7.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=50000)
+    main(parser.parse_args())
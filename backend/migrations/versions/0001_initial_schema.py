@@ -0,0 +1,106 @@
+"""initial schema
+
+Mirrors the tables that ``Base.metadata.create_all`` used to build. Tables
+are created with IF NOT EXISTS so databases bootstrapped before Alembic was
+introduced can simply be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.Column('birth_date', sa.Date(), nullable=False),
+        sa.Column('birth_time', sa.Time(), nullable=True),
+        sa.Column('birth_place', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index('ix_users_id', 'users', ['id'], if_not_exists=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True, if_not_exists=True)
+
+    op.create_table(
+        'astrology_reports',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('report_type', sa.String(length=32), nullable=False),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        'zodiac_reports',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        'articles',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('slug', sa.String(length=255), nullable=False, unique=True),
+        sa.Column('summary', sa.String(length=800), nullable=True),
+        sa.Column('cover_url', sa.String(length=512), nullable=True),
+        sa.Column('tags', sa.JSON(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('author_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=32), nullable=True),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        'zodiac_interpretations',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('sign', sa.String(length=32), nullable=False),
+        sa.Column('title', sa.String(length=64), nullable=False),
+        sa.Column('date_range', sa.String(length=64), nullable=False),
+        sa.Column('element', sa.String(length=32), nullable=False),
+        sa.Column('modality', sa.String(length=32), nullable=False),
+        sa.Column('keywords', sa.JSON(), nullable=True),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('love', sa.Text(), nullable=False),
+        sa.Column('career', sa.Text(), nullable=False),
+        sa.Column('wellbeing', sa.Text(), nullable=False),
+        sa.Column('ritual', sa.Text(), nullable=False),
+        sa.Column('mantra', sa.String(length=255), nullable=False),
+        sa.Column('lucky_color', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index('ix_zodiac_interpretations_sign', 'zodiac_interpretations', ['sign'], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_zodiac_interpretations_sign', table_name='zodiac_interpretations')
+    op.drop_table('zodiac_interpretations')
+    op.drop_table('articles')
+    op.drop_table('zodiac_reports')
+    op.drop_table('astrology_reports')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
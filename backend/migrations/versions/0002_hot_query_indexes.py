@@ -0,0 +1,48 @@
+"""composite indexes for the hot list queries
+
+* report history: ``WHERE user_id = ? ORDER BY generated_at DESC``
+* article list: ``WHERE status = 'published' ORDER BY published_at DESC, id DESC``
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_astrology_reports_user_generated',
+        'astrology_reports',
+        ['user_id', sa.text('generated_at DESC')],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_zodiac_reports_user_generated',
+        'zodiac_reports',
+        ['user_id', sa.text('generated_at DESC')],
+        if_not_exists=True,
+    )
+    op.create_index(
+        'ix_articles_status_published',
+        'articles',
+        ['status', sa.text('published_at DESC'), sa.text('id DESC')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_status_published', table_name='articles')
+    op.drop_index('ix_zodiac_reports_user_generated', table_name='zodiac_reports')
+    op.drop_index('ix_astrology_reports_user_generated', table_name='astrology_reports')
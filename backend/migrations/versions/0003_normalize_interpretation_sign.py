@@ -0,0 +1,29 @@
+"""store zodiac interpretation signs lowercase
+
+Lookups now compare ``sign = :sign`` directly so the unique index on the
+column can be used instead of evaluating ``lower(sign)`` per row.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:20:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('UPDATE zodiac_interpretations SET sign = lower(trim(sign)) WHERE sign <> lower(trim(sign))')
+
+
+def downgrade() -> None:
+    # Original casing is not recoverable; lowercase signs remain valid.
+    pass
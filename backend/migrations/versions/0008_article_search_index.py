@@ -0,0 +1,94 @@
+"""article full-text search index
+
+Creates the dialect's index table (FTS5 on SQLite, tsvector + GIN on
+Postgres) and backfills it. The DDL and the bigram tokenizer are copied
+here as they are at this revision, so later changes to app.services.search
+do not change what this migration builds.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 12:10:00
+
+"""
+import re
+import unicodedata
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+_CJK = '㐀-䶿一-鿿豈-﫿'
+_RUNS = re.compile(rf'[{_CJK}]+|[0-9a-z]+')
+_IS_CJK = re.compile(rf'[{_CJK}]')
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+POSTGRES_DDL = (
+    'CREATE TABLE IF NOT EXISTS article_search ('
+    'article_id INTEGER PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE, '
+    'document TSVECTOR NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS ix_article_search_document ON article_search USING GIN (document)',
+)
+SQLITE_INSERT = sa.text('INSERT INTO articles_fts (rowid, title, body) VALUES (:id, :title, :body)')
+POSTGRES_INSERT = sa.text(
+    'INSERT INTO article_search (article_id, document) VALUES (:id, '
+    "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B'))"
+)
+
+
+def _tokenize(*values: Optional[str]) -> str:
+    """CJK runs as overlapping bigrams, Latin/digit runs as lowercase words."""
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        for run in _RUNS.findall(unicodedata.normalize('NFKC', value).casefold()):
+            if _IS_CJK.match(run) and len(run) > 1:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+    return ' '.join(tokens)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(SQLITE_DDL)
+        insert = SQLITE_INSERT
+    elif bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+        insert = POSTGRES_INSERT
+    else:
+        return
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text('SELECT id, title, summary, content FROM articles WHERE id > :last ORDER BY id LIMIT :limit'),
+            {'last': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        bind.execute(insert, [
+            {'id': row.id, 'title': _tokenize(row.title), 'body': _tokenize(row.summary, row.content)} for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS articles_fts')
+    elif bind.dialect.name == 'postgresql':
+        op.execute('DROP TABLE IF EXISTS article_search')
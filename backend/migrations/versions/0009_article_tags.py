@@ -0,0 +1,80 @@
+"""normalized article tags and tag counts
+
+Both tables are backfilled from ``articles.tags`` with the normalization
+rules of this revision, copied here so later changes to app.services.tags
+do not change what this migration writes.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 13:05:00
+
+"""
+import unicodedata
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+TAG_MAX_LENGTH = 64
+
+articles = sa.table('articles', sa.column('id', sa.Integer), sa.column('tags', sa.JSON), sa.column('status', sa.String))
+article_tags = sa.table('article_tags', sa.column('article_id', sa.Integer), sa.column('tag', sa.String))
+tag_counts = sa.table('tag_counts', sa.column('tag', sa.String), sa.column('article_count', sa.Integer))
+
+
+def _normalize_tags(tags: Optional[Iterable[object]]) -> List[str]:
+    """Unique, stripped, NFKC-normalized tags in their original order."""
+    cleaned = (unicodedata.normalize('NFKC', str(tag)).strip()[:TAG_MAX_LENGTH] for tag in tags or ())
+    return list(dict.fromkeys(tag for tag in cleaned if tag))
+
+
+def _backfill() -> None:
+    """Tag rows for every article, and per-tag counts of the published ones."""
+    bind = op.get_bind()
+    counts: Counter = Counter()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(articles).where(articles.c.id > last_id).order_by(articles.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        links = [{'article_id': row.id, 'tag': tag} for row in rows for tag in _normalize_tags(row.tags)]
+        if links:
+            bind.execute(article_tags.insert(), links)
+        for row in rows:
+            if row.status == 'published':
+                counts.update(_normalize_tags(row.tags))
+        last_id = rows[-1].id
+    if counts:
+        bind.execute(tag_counts.insert(), [{'tag': tag, 'article_count': n} for tag, n in counts.items()])
+
+
+def upgrade() -> None:
+    op.create_table(
+        'article_tags',
+        sa.Column('article_id', sa.Integer(), sa.ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('tag', sa.String(length=64), primary_key=True),
+    )
+    op.create_index('ix_article_tags_tag_article', 'article_tags', ['tag', 'article_id'])
+    op.create_table(
+        'tag_counts',
+        sa.Column('tag', sa.String(length=64), primary_key=True),
+        sa.Column('article_count', sa.Integer(), nullable=False),
+    )
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_table('tag_counts')
+    op.drop_index('ix_article_tags_tag_article', table_name='article_tags')
+    op.drop_table('article_tags')
@@ -0,0 +1,169 @@
+"""related-article signatures and neighbour lists
+
+The backfill computes MinHash signatures and top-k neighbour lists with the
+feature extraction, hash family and thresholds of this revision, copied
+here so later tuning of app.services.related does not change what this
+migration writes. ``reindex-related`` recomputes with the current settings.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 14:20:00
+
+"""
+import re
+import unicodedata
+import zlib
+from typing import Iterable, List, Optional, Sequence, Set, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+BLOCK_ROWS = 256
+SIGNATURE_SIZE = 128
+RELATED_TOP_K = 5
+RELATED_MIN_SCORE = 0.05
+TAG_WEIGHT = 8
+TAG_MAX_LENGTH = 64
+
+_CJK = '㐀-䶿一-鿿豈-﫿'
+_RUNS = re.compile(rf'[{_CJK}]+|[0-9a-z]+')
+_IS_CJK = re.compile(rf'[{_CJK}]')
+
+# Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32, with odd ``a``.
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(1, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+articles = sa.table(
+    'articles',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('summary', sa.String),
+    sa.column('content', sa.Text),
+    sa.column('tags', sa.JSON),
+    sa.column('status', sa.String),
+)
+article_signatures = sa.table(
+    'article_signatures', sa.column('article_id', sa.Integer), sa.column('signature', sa.LargeBinary)
+)
+article_relations = sa.table(
+    'article_relations',
+    sa.column('article_id', sa.Integer),
+    sa.column('rank', sa.SmallInteger),
+    sa.column('related_id', sa.Integer),
+    sa.column('score', sa.Float),
+)
+
+
+def _tokens(*values: Optional[str]) -> List[str]:
+    tokens = []
+    for value in values:
+        if not value:
+            continue
+        for run in _RUNS.findall(unicodedata.normalize('NFKC', value).casefold()):
+            if _IS_CJK.match(run) and len(run) > 1:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+    return tokens
+
+
+def _features(title: str, summary: Optional[str], content: Optional[str], tags: Optional[Iterable[object]]) -> Set[str]:
+    features = set(_tokens(summary, content))
+    features.update(f't:{token}' for token in _tokens(title))
+    cleaned = (unicodedata.normalize('NFKC', str(tag)).strip()[:TAG_MAX_LENGTH] for tag in tags or ())
+    features.update(f'#{tag}:{copy}' for tag in dict.fromkeys(t for t in cleaned if t) for copy in range(TAG_WEIGHT))
+    return features
+
+
+def _minhash(features: Iterable[str]) -> Optional[np.ndarray]:
+    hashes = np.fromiter((zlib.crc32(feature.encode('utf-8')) for feature in features), dtype=np.uint64)
+    if not hashes.size:
+        return None
+    mixed = (hashes[:, None] * _A + _B) >> _SHIFT
+    return mixed.min(axis=0).astype('<u4')
+
+
+def _relations(ids: np.ndarray, matrix: np.ndarray) -> List[dict]:
+    """Every article's best ``RELATED_TOP_K`` neighbours above the floor, newest id first on ties."""
+    rows = []
+    for start in range(0, len(ids), BLOCK_ROWS):
+        block = np.arange(start, min(start + BLOCK_ROWS, len(ids)))
+        equal = np.zeros((len(block), len(matrix)), dtype=np.uint16)
+        for position in range(SIGNATURE_SIZE):
+            equal += matrix[block, position, None] == matrix[None, :, position]
+        scores = equal / np.float32(SIGNATURE_SIZE)
+        scores[np.arange(len(block)), block] = -1.0
+        for row, row_scores in zip(block, scores):
+            eligible = np.flatnonzero(row_scores >= RELATED_MIN_SCORE)
+            if len(eligible) > RELATED_TOP_K:
+                eligible = eligible[np.argpartition(-row_scores[eligible], RELATED_TOP_K - 1)[:RELATED_TOP_K]]
+            order = sorted(eligible, key=lambda i: (-row_scores[i], -ids[i]))
+            rows.extend(
+                {'article_id': int(ids[row]), 'rank': rank, 'related_id': int(ids[i]),
+                 'score': round(float(row_scores[i]), 4)}
+                for rank, i in enumerate(order)
+            )
+    return rows
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    ids, signatures = [], []
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(articles)
+            .where(articles.c.id > last_id, articles.c.status == 'published')
+            .order_by(articles.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        batch = []
+        for row in rows:
+            signature = _minhash(_features(row.title, row.summary, row.content, row.tags))
+            if signature is not None:
+                ids.append(row.id)
+                signatures.append(signature)
+                batch.append({'article_id': row.id, 'signature': signature.tobytes()})
+        if batch:
+            bind.execute(article_signatures.insert(), batch)
+        last_id = rows[-1].id
+    if ids:
+        relations = _relations(np.array(ids, dtype=np.int64), np.vstack(signatures))
+        if relations:
+            bind.execute(article_relations.insert(), relations)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'article_signatures',
+        sa.Column('article_id', sa.Integer(), sa.ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+    )
+    op.create_table(
+        'article_relations',
+        sa.Column('article_id', sa.Integer(), sa.ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('rank', sa.SmallInteger(), primary_key=True),
+        sa.Column('related_id', sa.Integer(), sa.ForeignKey('articles.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+    )
+    op.create_index('ix_article_relations_related', 'article_relations', ['related_id'])
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_relations_related', table_name='article_relations')
+    op.drop_table('article_relations')
+    op.drop_table('article_signatures')
@@ -0,0 +1,31 @@
+"""seed data digest
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 15:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'seed_state',
+        sa.Column('name', sa.String(length=64), primary_key=True),
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('seed_state')
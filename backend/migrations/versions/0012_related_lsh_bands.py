@@ -0,0 +1,99 @@
+"""LSH band buckets and list floors for related articles
+
+Related-article candidates come from articles sharing an LSH band bucket,
+and each signature row keeps its list's floor score. Both are derived from
+the rows 0010 wrote: buckets pack consecutive pairs of signature positions
+into one 64-bit value, and a full list's floor is its lowest score.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 09:40:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+SIGNATURE_SIZE = 128
+BAND_ROWS = 2
+RELATED_TOP_K = 5
+
+article_signatures = sa.table(
+    'article_signatures',
+    sa.column('article_id', sa.Integer),
+    sa.column('signature', sa.LargeBinary),
+    sa.column('floor_score', sa.Float),
+)
+article_bands = sa.table(
+    'article_bands', sa.column('article_id', sa.Integer), sa.column('band', sa.SmallInteger),
+    sa.column('bucket', sa.BigInteger),
+)
+article_relations = sa.table(
+    'article_relations', sa.column('article_id', sa.Integer), sa.column('score', sa.Float),
+)
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(article_signatures.c.article_id, article_signatures.c.signature)
+            .where(article_signatures.c.article_id > last_id)
+            .order_by(article_signatures.c.article_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        signatures = np.frombuffer(b''.join(bytes(row.signature) for row in rows), dtype='<u4')
+        pairs = signatures.reshape(len(rows), SIGNATURE_SIZE // BAND_ROWS, BAND_ROWS).astype(np.uint64)
+        buckets = ((pairs[:, :, 0] << np.uint64(32)) | pairs[:, :, 1]).view(np.int64)
+        bind.execute(article_bands.insert(), [
+            {'article_id': row.article_id, 'band': band, 'bucket': int(bucket)}
+            for row, row_buckets in zip(rows, buckets.tolist())
+            for band, bucket in enumerate(row_buckets)
+        ])
+        last_id = rows[-1].article_id
+    floors = (
+        sa.select(article_relations.c.article_id, sa.func.min(article_relations.c.score).label('floor'))
+        .group_by(article_relations.c.article_id)
+        .having(sa.func.count() >= RELATED_TOP_K)
+    )
+    updates = [{'row_id': row.article_id, 'floor': row.floor} for row in bind.execute(floors)]
+    if updates:
+        bind.execute(
+            article_signatures.update()
+            .where(article_signatures.c.article_id == sa.bindparam('row_id'))
+            .values(floor_score=sa.bindparam('floor')),
+            updates,
+        )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('article_signatures') as batch:
+        batch.add_column(sa.Column('floor_score', sa.Float(), nullable=False, server_default='0'))
+    op.create_table(
+        'article_bands',
+        sa.Column('article_id', sa.Integer(), sa.ForeignKey('articles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('band', sa.SmallInteger(), primary_key=True),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+    )
+    op.create_index('ix_article_bands_band_bucket', 'article_bands', ['band', 'bucket', 'article_id'])
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index('ix_article_bands_band_bucket', table_name='article_bands')
+    op.drop_table('article_bands')
+    with op.batch_alter_table('article_signatures') as batch:
+        batch.drop_column('floor_score')
@@ -1,6 +1,7 @@
 import asyncio
 import json as json_module
 import sys
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -8,8 +9,9 @@ from urllib.parse import urlsplit
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from starlette.datastructures import Headers
 from starlette.types import Message, Scope
 
@@ -18,8 +20,11 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db
+from app.query_tracking import capture_queries
 from app.services.bootstrap import bootstrap_data
+from app.services.cache import clear_all_caches
+from app.services.interpretations import interpretation_registry
 
 
 @dataclass
@@ -28,6 +33,10 @@ class SimpleResponse:
     headers: Headers
     _body: bytes
 
+    @property
+    def content(self) -> bytes:
+        return self._body
+
     def json(self) -> Any:
         if not self._body:
             return None
@@ -89,14 +98,20 @@ class SimpleTestClient:
             {'type': 'http.request', 'body': body, 'more_body': False}
         ]
         sent_messages: List[Message] = []
+        response_complete = asyncio.Event()
 
         async def receive() -> Message:
             if receive_messages:
                 return receive_messages.pop(0)
+            # Like a real client, only disconnect once the response is done;
+            # streaming responses watch for an early disconnect and abort.
+            await response_complete.wait()
             return {'type': 'http.disconnect'}
 
         async def send(message: Message) -> None:
             sent_messages.append(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                response_complete.set()
 
         await self.app(scope, receive, send)
 
@@ -127,28 +142,71 @@ class SimpleTestClient:
 
 
 
+@dataclass
+class TestDatabase:
+    engine: Any
+    async_engine: Any
+    session_factory: Any
+    async_session_factory: Any
+
+
 @pytest.fixture(scope='function')
-def test_client():
+def test_db(tmp_path):
+    # A file-backed database lets the sync and async engines share one schema.
+    # The async engine uses NullPool because every request runs in its own
+    # event loop and aiosqlite connections are bound to the loop that opened them.
+    db_path = tmp_path / 'test.db'
     engine = create_engine(
-        'sqlite+pysqlite:///:memory:',
+        f'sqlite+pysqlite:///{db_path}',
         future=True,
         connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
     )
+    async_engine = create_async_engine(f'sqlite+aiosqlite:///{db_path}', poolclass=NullPool)
     TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    TestingAsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
     Base.metadata.create_all(bind=engine)
 
     with TestingSessionLocal() as session:
         bootstrap_data(session)
 
+    yield TestDatabase(engine, async_engine, TestingSessionLocal, TestingAsyncSessionLocal)
+    engine.dispose()
+
+
+@pytest.fixture(scope='function')
+def test_client(test_db):
     def override_get_db():
-        db = TestingSessionLocal()
+        db = test_db.session_factory()
         try:
             yield db
         finally:
             db.close()
 
+    async def override_get_async_db():
+        async with test_db.async_session_factory() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    clear_all_caches()
+    interpretation_registry.clear()
     client = SimpleTestClient(app)
     yield client
     app.dependency_overrides.clear()
+    clear_all_caches()
+    interpretation_registry.clear()
+
+
+@pytest.fixture
+def max_queries():
+    """``with max_queries(3): client.get(...)`` fails when the block runs more SQL statements."""
+
+    @contextmanager
+    def check(limit: int):
+        with capture_queries() as log:
+            yield log
+        assert log.count <= limit, f'{log.count} queries, expected at most {limit}:\n' + '\n'.join(log.statements)
+
+    return check
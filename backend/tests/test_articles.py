@@ -1,4 +1,15 @@
-from datetime import date
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
+
+from sqlalchemy import insert, select, text
+
+from app import models, schemas
+from app.services.articles import encode_cursor, published_page_query
+from app.services.related import rebuild_related_index, wait_for_related_updates
+from app.services.search import highlight, plan_search, query_runs
+from app.services.tags import apply_tag_deltas, rebuild_tag_index
 
 
 def auth_header(client):
@@ -42,3 +53,261 @@ def test_article_crud(test_client):
 
     delete_resp = test_client.delete(f'/api/articles/{article_id}', headers=headers)
     assert delete_resp.status_code == 200
+
+
+def seed_articles(test_db, count):
+    base = datetime(2024, 1, 1)
+    rows = [
+        {
+            'title': f'Seed {i}',
+            'slug': f'seed-{i}',
+            'summary': None,
+            'cover_url': None,
+            'tags': [],
+            'content': 'seed',
+            'status': 'published',
+            'published_at': base - timedelta(seconds=i // 2),
+        }
+        for i in range(count)
+    ]
+    with test_db.engine.begin() as conn:
+        conn.execute(models.Article.__table__.delete())
+        conn.execute(insert(models.Article), rows)
+
+
+def test_article_list_cursor_walks_every_article_once(test_client, test_db):
+    seed_articles(test_db, 25)
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/articles/?limit=10&include_total=true' + (f'&cursor={cursor}' if cursor else '')
+        page = test_client.get(url).json()
+        assert page['total'] == 25
+        seen.extend(item['slug'] for item in page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == 25 and len(set(seen)) == 25
+
+
+def test_article_list_fast_path_matches_response_model(test_client, test_db):
+    page = test_client.get('/api/articles/?limit=50').json()
+    with test_db.session_factory() as session:
+        articles = session.scalars(published_page_query(50)).all()
+        expected = schemas.ArticlePage(items=articles).model_dump(mode='json')
+    assert page == expected
+
+
+def test_article_list_rejects_oversized_page_and_bad_cursor(test_client):
+    assert test_client.get('/api/articles/?limit=500').status_code == 422
+    assert test_client.get('/api/articles/?cursor=not-a-cursor').status_code == 400
+
+
+def test_deep_cursor_page_is_as_fast_as_first_page(test_client, test_db):
+    page_size = 20
+    seed_articles(test_db, 100_000)
+    with test_db.engine.connect() as conn:
+        rows = conn.execute(
+            select(models.Article.published_at, models.Article.id)
+            .order_by(models.Article.published_at.desc(), models.Article.id.desc())
+            .offset(4999 * page_size - 1)
+            .limit(1)
+        ).one()
+    deep_cursor = encode_cursor(rows.published_at, rows.id)
+
+    def best_of(url, runs=5):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            response = test_client.get(url)
+            timings.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            assert len(response.json()['items']) == page_size
+        return min(timings)
+
+    first = best_of(f'/api/articles/?limit={page_size}')
+    deep = best_of(f'/api/articles/?limit={page_size}&cursor={deep_cursor}')
+    assert deep < first * 2 + 0.01
+
+
+def test_article_list_and_detail_support_conditional_get(test_client):
+    headers = auth_header(test_client)
+    created = test_client.post('/api/articles/', json={
+        'title': 'Conditional Article',
+        'summary': 'etag',
+        'cover_url': None,
+        'tags': [],
+        'content': 'body',
+        'status': 'published',
+    }, headers=headers).json()
+
+    listing = test_client.get('/api/articles/')
+    etag = listing.headers['etag']
+    assert test_client.get('/api/articles/', headers={'If-None-Match': etag}).status_code == 304
+    assert test_client.get('/api/articles/?limit=5', headers={'If-None-Match': etag}).status_code == 200
+
+    detail = test_client.get(f"/api/articles/{created['slug']}")
+    detail_etag = detail.headers['etag']
+    not_modified = test_client.get(f"/api/articles/{created['slug']}", headers={'If-None-Match': detail_etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['etag'] == detail_etag
+    assert test_client.get(
+        f"/api/articles/{created['slug']}", headers={'If-Modified-Since': detail.headers['last-modified']}
+    ).status_code == 304
+
+    test_client.put(f"/api/articles/{created['id']}", json={
+        'title': 'Conditional Article', 'summary': 'changed', 'cover_url': None,
+        'tags': [], 'content': 'body', 'status': 'published',
+    }, headers=headers)
+    assert test_client.get('/api/articles/', headers={'If-None-Match': etag}).status_code == 200
+    assert test_client.get(f"/api/articles/{created['slug']}", headers={'If-None-Match': detail_etag}).status_code == 200
+
+
+def test_tag_filter_and_facets_follow_article_writes(test_client, test_db):
+    headers = auth_header(test_client)
+    base = {'summary': None, 'cover_url': None, 'content': 'body', 'status': 'published'}
+
+    def create(title, tags, **extra):
+        return test_client.post('/api/articles/', json={**base, 'title': title, 'tags': tags, **extra}, headers=headers).json()
+
+    def counts():
+        return {f['tag']: f['count'] for f in test_client.get('/api/articles/tags?limit=100').json()}
+
+    def listed(tag):
+        page = test_client.get(f'/api/articles/?tag={quote(tag)}&include_total=true').json()
+        return [item['id'] for item in page['items']], page['total']
+
+    before = counts()
+    first = create('Tagged one', ['塔罗', ' 月相 ', '塔罗'])
+    second = create('Tagged two', ['塔罗'])
+    create('Draft', ['塔罗'], status='draft')
+
+    assert counts()['塔罗'] == before.get('塔罗', 0) + 2
+    assert counts()['月相'] == before.get('月相', 0) + 1
+    assert listed('塔罗') == ([second['id'], first['id']], 2 + before.get('塔罗', 0))
+
+    test_client.put(f"/api/articles/{first['id']}", json={**base, 'title': 'Tagged one', 'tags': ['月相'], 'status': 'draft'}, headers=headers)
+    assert listed('塔罗')[0] == [second['id']]
+    assert counts().get('月相', 0) == before.get('月相', 0)
+
+    test_client.delete(f"/api/articles/{second['id']}", headers=headers)
+    assert counts().get('塔罗', 0) == before.get('塔罗', 0)
+    assert listed('塔罗') == ([], before.get('塔罗', 0))
+
+    incremental = counts()
+    with test_db.engine.begin() as conn:
+        rebuild_tag_index(conn)
+    assert counts() == incremental
+
+
+def test_tag_deltas_upsert_counts_in_one_statement(test_db, max_queries):
+    def counts():
+        with test_db.engine.connect() as conn:
+            return dict(conn.execute(select(models.TagCount.tag, models.TagCount.article_count)).all())
+
+    with test_db.engine.begin() as conn:
+        conn.execute(insert(models.TagCount), [{'tag': '星盘', 'article_count': 2}, {'tag': '落幕', 'article_count': 1}])
+    # A row another writer created since this one last looked is added to, not re-inserted.
+    with max_queries(2), test_db.engine.begin() as conn:
+        apply_tag_deltas(conn, Counter({'星盘': 1, '新月': 2, '落幕': -1, '未见': -1}))
+    stored = counts()
+    assert (stored['星盘'], stored['新月']) == (3, 2)
+    assert '落幕' not in stored and '未见' not in stored
+
+
+def test_related_articles_are_maintained_on_write(test_client, test_db):
+    headers = auth_header(test_client)
+    base = {'summary': None, 'cover_url': None, 'status': 'published'}
+
+    def save(title, content, tags, article_id=None):
+        payload = {**base, 'title': title, 'content': content, 'tags': tags}
+        if article_id is None:
+            return test_client.post('/api/articles/', json=payload, headers=headers).json()
+        return test_client.put(f'/api/articles/{article_id}', json=payload, headers=headers).json()
+
+    def related(article):
+        # Lists are refreshed on a background thread after each commit.
+        wait_for_related_updates()
+        return [item['id'] for item in test_client.get(f"/api/articles/{article['slug']}").json()['related']]
+
+    first = save('Mercury retrograde basics', '水星逆行期间，沟通容易出现误会，签约前多确认细节。', ['水逆', '沟通'])
+    second = save('Retrograde survival', '水星逆行来临时，放慢节奏，沟通前多确认细节。', ['水逆'])
+    third = save('Garden notes', 'Tomatoes need sun and water.', ['garden'])
+
+    assert related(first)[0] == second['id']
+    assert third['id'] not in related(first)
+
+    save('Garden notes', '水星逆行也影响园艺计划，沟通前确认。', ['水逆', '沟通'], third['id'])
+    assert third['id'] in related(first)
+    assert third['id'] in related(second)
+
+    test_client.delete(f"/api/articles/{second['id']}", headers=headers)
+    assert second['id'] not in related(first)
+
+    incremental = related(first)
+    with test_db.engine.begin() as conn:
+        rebuild_related_index(conn)
+    assert related(first) == incremental
+
+
+def test_article_search_ranks_highlights_and_tracks_writes(test_client):
+    headers = auth_header(test_client)
+    base = {'summary': None, 'cover_url': None, 'tags': [], 'status': 'published'}
+    title_hit = test_client.post(
+        '/api/articles/', json={**base, 'title': '水逆期间的沟通指南', 'content': '放慢节奏，多做确认。'}, headers=headers
+    ).json()
+    body_hit = test_client.post(
+        '/api/articles/', json={**base, 'title': 'Weekly notes', 'content': '本周提醒：水逆来临，出行前检查行程。'}, headers=headers
+    ).json()
+    test_client.post('/api/articles/', json={**base, 'title': '逆水行舟', 'content': '不进则退。'}, headers=headers)
+
+    page = test_client.get(f'/api/articles/search?q={quote("水逆")}').json()
+    assert [item['id'] for item in page['items']] == [title_hit['id'], body_hit['id']]
+    assert page['items'][0]['title_highlight'] == '<mark>水逆</mark>期间的沟通指南'
+    assert '<mark>水逆</mark>来临' in page['items'][1]['snippet']
+
+    assert [i['id'] for i in test_client.get('/api/articles/search?q=WEEKLY').json()['items']] == [body_hit['id']]
+
+    test_client.put(
+        f"/api/articles/{body_hit['id']}", json={**base, 'title': 'Weekly notes', 'content': '满月适合 declutter。'}, headers=headers
+    )
+    test_client.delete(f"/api/articles/{title_hit['id']}", headers=headers)
+    assert test_client.get(f'/api/articles/search?q={quote("水逆")}').json()['items'] == []
+    assert [i['id'] for i in test_client.get('/api/articles/search?q=declutter').json()['items']] == [body_hit['id']]
+
+
+def test_article_search_escapes_markup_and_ignores_punctuation(test_client):
+    headers = auth_header(test_client)
+    test_client.post(
+        '/api/articles/',
+        json={'title': '<b>星盘</b> 入门', 'summary': None, 'cover_url': None, 'tags': [], 'content': '星盘基础', 'status': 'published'},
+        headers=headers,
+    )
+    hit = test_client.get(f'/api/articles/search?q={quote("星盘")}').json()['items'][0]
+    assert hit['title_highlight'] == '&lt;b&gt;<mark>星盘</mark>&lt;/b&gt; 入门'
+    assert test_client.get('/api/articles/search?q=%22%2A').json()['items'] == []
+
+
+def test_highlight_maps_matches_back_through_case_folding():
+    # ß folds to ss, so the folded text is longer than the original.
+    assert highlight('Die Straße nach Rom', query_runs('strasse')) == 'Die <mark>Straße</mark> nach Rom'
+    assert highlight('Große Maße', query_runs('MASSE')) == 'Große <mark>Maße</mark>'
+    assert highlight('ﬁnd the ﬁle', query_runs('file')) == 'ﬁnd the <mark>ﬁle</mark>'
+    snippet = highlight('Weiß ' * 40 + 'Straße' + ' Ende' * 40, query_runs('strasse'), width=30)
+    assert '<mark>Straße</mark>' in snippet and snippet.startswith('…') and snippet.endswith('…')
+
+
+def test_search_falls_back_to_like_on_other_dialects(test_client, test_db):
+    headers = auth_header(test_client)
+    base = {'summary': None, 'cover_url': None, 'tags': [], 'status': 'published'}
+    title_hit = test_client.post(
+        '/api/articles/', json={**base, 'title': 'Tarot 星盘 guide', 'content': 'body'}, headers=headers
+    ).json()
+    body_hit = test_client.post(
+        '/api/articles/', json={**base, 'title': 'Notes', 'content': '关于星盘的 TAROT 笔记'}, headers=headers
+    ).json()
+
+    plan = plan_search('mysql', '星盘 tarot', 10, 0)
+    with test_db.engine.connect() as conn:
+        rows = conn.execute(text(plan.sql), plan.params).all()
+    assert [row.id for row in rows] == [title_hit['id'], body_hit['id']]
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.astro_utils import (
+    classify_birth_dates,
+    chinese_zodiac,
+    five_element_by_year,
+    lunar_year,
+    solar_terms,
+    western_zodiac,
+)
+from app.services.ephemeris import julian_day
+
+
+def test_ingress_times_match_published_equinoxes_and_solstices():
+    jd, terms = solar_terms(2024, 2024)
+    published = julian_day(np.array([
+        '2024-03-20T03:06', '2024-06-20T20:51', '2024-09-22T12:44', '2024-12-21T09:21',
+    ], dtype='datetime64[s]'))
+    assert np.abs(jd[terms % 6 == 0] - published).max() * 24 * 60 < 10  # minutes
+
+
+def test_cusp_births_follow_the_actual_ingress_day():
+    # Sun entered Aries 2024-03-20 11:06 and Libra 2023-09-23 14:50, Beijing time.
+    assert western_zodiac(date(2024, 3, 19)) == '双鱼座'
+    assert western_zodiac(date(2024, 3, 20)) == '白羊座'
+    assert western_zodiac(date(2023, 9, 23)) == '处女座'
+    assert western_zodiac(date(2023, 9, 24)) == '天秤座'
+    assert western_zodiac(date(1994, 10, 8)) == '天秤座'
+    assert western_zodiac(date(1850, 7, 1)) == '巨蟹座'
+
+
+def test_chinese_zodiac_year_starts_at_lichun():
+    # 立春 fell on 2021-02-03 and 2024-02-04.
+    assert chinese_zodiac(lunar_year(date(2021, 2, 2))) == '鼠'
+    assert chinese_zodiac(lunar_year(date(2021, 2, 3))) == '牛'
+    assert chinese_zodiac(lunar_year(date(2024, 2, 3))) == '兔'
+    assert chinese_zodiac(lunar_year(date(2024, 2, 4))) == '龙'
+    assert five_element_by_year(lunar_year(date(2024, 2, 4))) == '木'
+
+
+def test_batch_classification_matches_scalar_helpers():
+    start = date(1899, 12, 1)
+    births = [start + timedelta(days=day) for day in range(0, 365 * 202, 97)] + [date(1890, 5, 5), date(2101, 2, 1)]
+    result = classify_birth_dates(np.array(births, dtype='datetime64[D]'))
+
+    assert result['sign'].tolist() == [western_zodiac(birth) for birth in births]
+    assert result['zodiac'].tolist() == [chinese_zodiac(lunar_year(birth)) for birth in births]
+    assert result['element'].tolist() == [five_element_by_year(lunar_year(birth)) for birth in births]
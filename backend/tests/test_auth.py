@@ -1,5 +1,14 @@
+import asyncio
+import time
 from datetime import date
 
+from passlib.hash import bcrypt
+from sqlalchemy import select
+
+from app import models
+from app.auth import PasswordHasherBusy, PasswordHasherPool, password_context
+from app.services.principals import principal_cache, token_cache
+
 
 def register_user(client, *, email='test@example.com', password='password123'):
     payload = {
@@ -31,3 +40,82 @@ def test_register_and_login_with_long_password(test_client):
     )
     assert login_response.status_code == 200
     assert 'access_token' in login_response.json()
+
+
+def test_login_rehashes_outdated_password_hash(test_client, test_db):
+    register_user(test_client, email='legacy@example.com')
+    with test_db.session_factory() as session:
+        user = session.execute(select(models.User).where(models.User.email == 'legacy@example.com')).scalar_one()
+        user.password_hash = bcrypt.using(rounds=4).hash('password123')
+        session.commit()
+
+    login_response = test_client.post('/api/auth/login', json={'email': 'legacy@example.com', 'password': 'password123'})
+    assert login_response.status_code == 200
+
+    with test_db.session_factory() as session:
+        stored = session.execute(select(models.User.password_hash).where(models.User.email == 'legacy@example.com')).scalar_one()
+    assert not stored.startswith('$2b$04$')
+    assert not password_context().needs_update(stored)
+
+
+def test_login_with_wrong_password(test_client):
+    register_user(test_client, email='wrong@example.com')
+    response = test_client.post('/api/auth/login', json={'email': 'wrong@example.com', 'password': 'not-it'})
+    assert response.status_code == 401
+
+
+def test_password_hasher_rejects_when_queue_is_full():
+    pool = PasswordHasherPool(workers=1, queue_limit=0)
+
+    async def burst():
+        return await asyncio.gather(
+            pool.run(time.sleep, 0.2),
+            pool.run(time.sleep, 0.2),
+            return_exceptions=True,
+        )
+
+    try:
+        results = asyncio.run(burst())
+    finally:
+        pool.shutdown()
+    assert sum(isinstance(item, PasswordHasherBusy) for item in results) == 1
+    assert pool.pending == 0
+
+
+def test_current_user_is_served_from_principal_cache(test_client, test_db):
+    register_user(test_client, email='cached@example.com')
+    token = test_client.post('/api/auth/login', json={'email': 'cached@example.com', 'password': 'password123'}).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert test_client.get('/api/users/me', headers=headers).json()['name'] == 'Tester'
+    assert test_client.get('/api/users/me', headers=headers).status_code == 200
+    assert principal_cache.hits == 1 and principal_cache.misses == 1
+    assert token_cache.hits == 1
+
+    with test_db.session_factory() as session:
+        user = session.execute(select(models.User).where(models.User.email == 'cached@example.com')).scalar_one()
+        user.name = 'Renamed'
+        session.commit()
+
+    assert test_client.get('/api/users/me', headers=headers).json()['name'] == 'Renamed'
+    assert principal_cache.misses == 2
+
+
+def test_principal_cache_is_invalidated_on_commit_not_flush(test_client, test_db):
+    register_user(test_client, email='flush@example.com')
+    token = test_client.post('/api/auth/login', json={'email': 'flush@example.com', 'password': 'password123'}).json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    test_client.get('/api/users/me', headers=headers)
+
+    with test_db.session_factory() as session:
+        user = session.execute(select(models.User).where(models.User.email == 'flush@example.com')).scalar_one()
+        user_id = user.id
+        user.name = 'Renamed'
+        session.flush()
+        # A concurrent request between flush and commit still sees (and caches) the old row.
+        assert test_client.get('/api/users/me', headers=headers).json()['name'] == 'Tester'
+        assert principal_cache.get(user_id) is not None
+        session.commit()
+
+    assert principal_cache.get(user_id) is None
+    assert test_client.get('/api/users/me', headers=headers).json()['name'] == 'Renamed'
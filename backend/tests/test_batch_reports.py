@@ -0,0 +1,67 @@
+from datetime import date, datetime, time
+
+from sqlalchemy import func, insert, select, update
+
+from app import models
+from app.services.batch_reports import job_key, run_nightly_reports
+from app.services.reports import astrology_payload, astrology_report_for
+
+
+def seed_users(test_db, count):
+    with test_db.engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {
+                'email': f'user{i}@example.com',
+                'password_hash': 'x',
+                'name': f'User {i}',
+                'birth_date': date(1980 + i % 30, i % 12 + 1, i % 28 + 1),
+                'birth_time': time(i % 24, 30) if i % 3 else None,
+                'birth_place': ('上海市', 'London', None)[i % 3],
+                'created_at': datetime.utcnow(),
+            }
+            for i in range(count)
+        ])
+
+
+def count_rows(test_db, model):
+    with test_db.engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_nightly_job_generates_one_report_set_per_user(test_db):
+    seed_users(test_db, 45)
+    day = date(2026, 10, 18)
+
+    stats = run_nightly_reports(test_db.engine, day, chunk_size=10, workers=2)
+    assert stats.users == 45 and stats.chunks == 5
+    assert stats.astrology_written == 45 and stats.zodiac_written == 45
+    assert count_rows(test_db, models.AstrologyReport) == 45
+
+    with test_db.session_factory() as session:
+        report = session.scalars(select(models.AstrologyReport).limit(1)).one()
+        user = report.user
+        expected = astrology_report_for(user.id, user.birth_date, user.birth_time, user.birth_place, day).payload
+        assert report.payload is None
+        assert astrology_payload(report) == expected | {'generated_at': report.generated_at.isoformat()}
+
+    rerun = run_nightly_reports(test_db.engine, day, chunk_size=10, workers=0)
+    assert rerun.users == 0 and rerun.resumed_after == 45
+    assert count_rows(test_db, models.ZodiacReport) == 45
+
+
+def test_nightly_job_resumes_after_checkpoint_and_skips_existing(test_db):
+    seed_users(test_db, 30)
+    day = date(2026, 10, 18)
+    run_nightly_reports(test_db.engine, day, chunk_size=10, workers=0)
+
+    # Pretend the previous run crashed after committing the first chunk.
+    with test_db.engine.begin() as conn:
+        conn.execute(
+            update(models.ReportJobCheckpoint)
+            .where(models.ReportJobCheckpoint.job_key == job_key(day))
+            .values(last_user_id=10, completed_at=None)
+        )
+    stats = run_nightly_reports(test_db.engine, day, chunk_size=10, workers=0)
+    assert stats.resumed_after == 10 and stats.users == 20
+    assert stats.astrology_written == 0 and stats.zodiac_written == 0
+    assert count_rows(test_db, models.AstrologyReport) == 30
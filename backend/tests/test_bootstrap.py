@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+
+from app import models
+from app.services import bootstrap
+from app.services.bootstrap import head_revision, init_database
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_init_database_skips_unchanged_seed_and_applies_edits(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'seed.db'}")
+    assert init_database(engine) is True
+    assert init_database(engine) is False
+
+    edited = [dict(entry) for entry in bootstrap.ZODIAC_INTERPRETATIONS]
+    edited[0]['title'] = 'Edited title'
+    monkeypatch.setattr(bootstrap, 'ZODIAC_INTERPRETATIONS', edited)
+    assert init_database(engine) is True
+
+    with engine.connect() as conn:
+        interpretations = conn.execute(select(func.count()).select_from(models.ZodiacInterpretation)).scalar_one()
+        articles = conn.execute(select(func.count()).select_from(models.Article)).scalar_one()
+        title = conn.execute(
+            select(models.ZodiacInterpretation.title).where(models.ZodiacInterpretation.sign == edited[0]['sign'])
+        ).scalar_one()
+    assert interpretations == len(edited)
+    assert articles == len(bootstrap.MYSTIC_ARTICLES)
+    assert title == 'Edited title'
+    engine.dispose()
+
+
+def test_init_database_indexes_seeded_articles_without_the_app(tmp_path):
+    # A fresh interpreter that never imports app.main, like `python -m app.cli init-db`.
+    db_path = tmp_path / 'cli.db'
+    script = textwrap.dedent(f'''
+        import sys
+        from sqlalchemy import create_engine
+        from app.services.bootstrap import head_revision, init_database
+        init_database(create_engine('sqlite+pysqlite:///{db_path.as_posix()}'))
+        assert 'app.main' not in sys.modules
+    ''')
+    subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, check=True)
+
+    engine = create_engine(f'sqlite+pysqlite:///{db_path}')
+    with engine.connect() as conn:
+        articles = conn.execute(select(func.count()).select_from(models.Article)).scalar_one()
+        tagged = conn.execute(select(func.count(func.distinct(models.ArticleTag.article_id)))).scalar_one()
+        counts = conn.execute(select(func.count()).select_from(models.TagCount)).scalar_one()
+        signed = conn.execute(select(func.count()).select_from(models.ArticleSignature)).scalar_one()
+        indexed = conn.exec_driver_sql("SELECT count(*) FROM articles_fts WHERE articles_fts MATCH '月亮'").scalar_one()
+    assert tagged == articles == len(bootstrap.MYSTIC_ARTICLES)
+    assert counts > 0
+    # The seed articles are too dissimilar to relate, but each must have a signature.
+    assert signed == articles
+    assert indexed >= 1
+    engine.dispose()
+
+
+def _alembic(db_path, *args):
+    env = {**os.environ, 'DATABASE_URL': f'sqlite+pysqlite:///{db_path}'}
+    return subprocess.run(
+        [sys.executable, '-m', 'alembic', *args], cwd=PROJECT_ROOT, env=env, check=True, capture_output=True, text=True
+    )
+
+
+def test_init_database_leaves_a_database_alembic_can_upgrade(tmp_path):
+    fresh = tmp_path / 'fresh.db'
+    engine = create_engine(f'sqlite+pysqlite:///{fresh}')
+    assert init_database(engine) is True
+    engine.dispose()
+    _alembic(fresh, 'upgrade', 'head')
+    assert head_revision() in _alembic(fresh, 'current').stdout
+
+    # A database migrated to an older revision is upgraded rather than rebuilt.
+    older = tmp_path / 'older.db'
+    _alembic(older, 'upgrade', '0009')
+    engine = create_engine(f'sqlite+pysqlite:///{older}')
+    assert init_database(engine) is True
+    assert init_database(engine) is False
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql('SELECT version_num FROM alembic_version').scalar_one() == head_revision()
+        assert conn.execute(select(func.count()).select_from(models.ArticleSignature)).scalar_one() > 0
+    engine.dispose()
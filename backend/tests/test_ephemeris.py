@@ -0,0 +1,61 @@
+from datetime import date, time
+
+import numpy as np
+import pytest
+
+from app.services.ephemeris import (
+    ascendant,
+    compute_chart,
+    compute_charts,
+    greenwich_sidereal_time,
+    mean_obliquity,
+    moon_longitude,
+    sun_longitude,
+)
+
+
+def test_reference_positions_from_meeus():
+    # Examples 25.a, 47.a and 12.a of Meeus, Astronomical Algorithms.
+    assert sun_longitude(2448908.5) == pytest.approx(199.90895, abs=0.01)
+    assert moon_longitude(2448724.5) == pytest.approx(133.167265, abs=0.05)
+    assert greenwich_sidereal_time(2446895.5) == pytest.approx(197.693195, abs=1e-5)
+
+
+def test_sun_at_equinoxes_and_solstices():
+    # 2000-03-20 07:35 UT equinox, 2000-06-21 01:48 UT solstice, 2000-12-21 13:37 UT solstice.
+    jd = np.array([2451623.816, 2451716.575, 2451900.067])
+    longitudes = sun_longitude(jd)
+    assert longitudes.shape == (3,)
+    assert np.abs(((longitudes - [0.0, 90.0, 270.0]) + 180) % 360 - 180).max() < 0.02
+
+
+def test_ascendant_lies_on_the_eastern_horizon():
+    rng = np.random.default_rng(1)
+    jd = 2451545.0 + rng.uniform(-20000, 20000, 500)
+    latitude = rng.uniform(-60, 60, 500)
+    longitude = rng.uniform(-180, 180, 500)
+
+    asc = np.radians(ascendant(jd, latitude, longitude))
+    eps = np.radians(mean_obliquity(jd))
+    ra = np.arctan2(np.sin(asc) * np.cos(eps), np.cos(asc))
+    dec = np.arcsin(np.sin(asc) * np.sin(eps))
+    hour_angle = np.radians(greenwich_sidereal_time(jd) + longitude) - ra
+    phi = np.radians(latitude)
+    altitude = np.arcsin(np.sin(phi) * np.sin(dec) + np.cos(phi) * np.cos(dec) * np.cos(hour_angle))
+    azimuth_east = np.sin(hour_angle) < 0
+
+    assert np.abs(np.degrees(altitude)).max() < 1e-6
+    assert azimuth_east.all()
+
+
+def test_batch_matches_single_and_handles_unknown_birth_time():
+    dates = [date(1994, 10, 8), date(1988, 1, 1), date(2001, 7, 4)]
+    times = [time(12, 5), None, time(23, 59)]
+    charts = compute_charts(dates, times, [39.9, 31.2, 22.5], [116.4, 121.5, 114.1], [8, 8, 8])
+
+    assert charts == [compute_chart(d, t, lat, lon, 8) for d, t, lat, lon in zip(
+        dates, times, [39.9, 31.2, 22.5], [116.4, 121.5, 114.1]
+    )]
+    assert charts[0].sun.startswith('天秤座 14°')
+    assert charts[1].sun.startswith('摩羯座')
+    assert charts[1].rising == '未知'
@@ -0,0 +1,150 @@
+import logging
+import re
+from typing import Optional
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app import models, query_tracking
+from app.database import get_async_db
+from app.main import app
+from app.metrics import Counter, Histogram, Registry
+from app.services.bootstrap import bootstrap_data
+
+
+def _sample(text: str, name: str, default: Optional[float] = None, **labels: str) -> float:
+    """Value of one sample line in a Prometheus text body."""
+    for line in text.splitlines():
+        if line.startswith('#'):
+            continue
+        metric, _, value = line.rpartition(' ')
+        match = re.fullmatch(r'([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?', metric)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+        if all(found.get(key) == expected for key, expected in labels.items()):
+            return float(value)
+    if default is not None:
+        return default
+    raise AssertionError(f'no sample {name} {labels}')
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = Histogram('job_seconds', 'Job time.', ('kind',), buckets=(0.1, 1.0), registry=registry)
+    counter = Counter('jobs_total', 'Jobs.', ('kind',), registry=registry)
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, 'a"b')
+        counter.inc('a"b')
+
+    body = registry.render()
+
+    assert '# TYPE job_seconds histogram' in body
+    assert 'job_seconds_bucket{kind="a\\"b",le="0.1"} 1' in body
+    assert 'job_seconds_bucket{kind="a\\"b",le="1"} 2' in body
+    assert 'job_seconds_bucket{kind="a\\"b",le="+Inf"} 3' in body
+    assert 'job_seconds_count{kind="a\\"b"} 3' in body
+    assert _sample(body, 'job_seconds_sum', kind='a\\"b') == 3.55
+    assert 'jobs_total{kind="a\\"b"} 3' in body
+
+
+def test_metrics_endpoint_reports_routes_pools_and_timings(test_client):
+    before = test_client.get('/metrics')
+    assert before.status_code == 200
+    assert before.headers['content-type'].startswith('text/plain; version=0.0.4')
+    # Metrics are process-wide, so compare against what earlier tests recorded.
+    missing = {'method': 'GET', 'route': '/api/articles/{slug}', 'status': '404'}
+    baseline = _sample(before.text(), 'http_requests_total', 0, **missing)
+
+    test_client.get('/api/articles/no-such-article')
+    test_client.get('/api/no/such/route')
+    credentials = {'email': 'metrics@example.com', 'password': 'password123'}
+    test_client.post('/api/auth/register', json={
+        **credentials, 'name': 'Metrics', 'birth_date': '1990-05-01',
+        'birth_time': None, 'birth_place': None,
+    })
+    token = test_client.post('/api/auth/login', json=credentials).json()['access_token']
+    test_client.post('/api/reports/zodiac', headers={'Authorization': f'Bearer {token}'})
+
+    body = test_client.get('/metrics').text()
+
+    assert _sample(body, 'http_requests_total', **missing) == baseline + 1
+    assert _sample(body, 'http_requests_total', method='GET', route='unmatched', status='404') >= 1
+    assert _sample(body, 'http_request_duration_seconds_count', method='GET', route='/api/articles/{slug}') >= 1
+    assert _sample(body, 'astro_report_generation_seconds_count', kind='zodiac') >= 1
+    assert _sample(body, 'astro_password_hash_seconds_count', operation='hash') >= 1
+    assert _sample(body, 'astro_password_hash_seconds_count', operation='verify') >= 1
+    assert _sample(body, 'astro_threadpool_size') > 0
+    assert _sample(body, 'astro_threadpool_queued') == 0
+    assert _sample(body, 'astro_db_pool_checked_out', engine='sync') >= 0
+    assert _sample(body, 'astro_cache_entries', cache='daily_reports') >= 0
+
+
+def test_readiness_checks_database(test_client):
+    response = test_client.get('/api/health/ready')
+    assert response.status_code == 200
+    assert response.json() == {'status': 'ready'}
+
+
+class _FailingSession:
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def execute(self, *_args, **_kwargs):
+        raise self.error
+
+
+def test_readiness_reports_database_errors_as_unavailable(test_client, caplog):
+    app.dependency_overrides[get_async_db] = lambda: _FailingSession(OperationalError('SELECT 1', {}, Exception('gone')))
+    with caplog.at_level(logging.WARNING, logger='app.routers.monitoring'):
+        response = test_client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert 'Readiness check failed' in caplog.text
+
+
+def test_readiness_lets_programming_errors_raise(test_client):
+    app.dependency_overrides[get_async_db] = lambda: _FailingSession(TypeError('bug'))
+    with pytest.raises(TypeError):
+        test_client.get('/api/health/ready')
+
+
+def test_sql_debug_headers_count_request_queries(test_client, monkeypatch):
+    monkeypatch.setattr(query_tracking.settings, 'sql_debug_headers', True)
+    response = test_client.get('/api/articles/tags')
+    assert int(response.headers['x-db-queries']) >= 1
+    assert float(response.headers['x-db-time']) >= 0
+
+    monkeypatch.setattr(query_tracking.settings, 'sql_debug_headers', False)
+    assert 'x-db-queries' not in test_client.get('/api/articles/tags').headers
+
+
+def test_repeated_and_slow_statements_are_logged(test_db, monkeypatch, caplog):
+    monkeypatch.setattr(query_tracking.settings, 'n_plus_one_threshold', 3)
+    monkeypatch.setattr(query_tracking.settings, 'slow_query_ms', 0.0)
+    caplog.set_level(logging.WARNING, logger='app.query_tracking')
+
+    with query_tracking.capture_queries() as log, test_db.engine.connect() as conn:
+        for slug in ('a', 'b', 'c', 'd'):
+            conn.execute(select(models.Article.id).where(models.Article.slug == slug))
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert log.count == 4
+    assert len([message for message in messages if message.startswith('Likely N+1')]) == 1
+    slow = [message for message in messages if message.startswith('Slow query')]
+    assert len(slow) == 4
+    # SQLite's plan for a lookup by the unique slug uses its index.
+    assert 'USING' in slow[0] and 'INDEX' in slow[0]
+
+
+def test_query_counts_stay_bounded(test_client, test_db, max_queries):
+    with max_queries(2):
+        test_client.get('/api/articles/')
+    with max_queries(2):
+        test_client.get('/api/articles/tags')
+    slug = test_client.get('/api/articles/').json()['items'][0]['slug']
+    with max_queries(4):
+        test_client.get(f'/api/articles/{slug}')
+    # Re-running the seed is a handful of set-based statements, not one per row.
+    with max_queries(3), test_db.session_factory() as session:
+        bootstrap_data(session)
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.gazetteer import Gazetteer, build_index, utc_offset_hours
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    source = tmp_path / 'places.tsv'
+    source.write_text(
+        '# name_zh\tname_en\taliases\tcountry\tlatitude\tlongitude\ttimezone\tpopulation\n'
+        '上海\tShanghai\t\tCN\t31.2304\t121.4737\tAsia/Shanghai\t24870000\n'
+        '汕头\tShantou\tSwatow\tCN\t23.3541\t116.6820\tAsia/Shanghai\t5500000\n'
+        '台州\tTaizhou\t\tCN\t28.6564\t121.4208\tAsia/Shanghai\t6620000\n'
+        '泰州\tTaizhou\t\tCN\t32.4555\t119.9231\tAsia/Shanghai\t4510000\n'
+        '伦敦\tLondon\t\tGB\t51.5074\t-0.1278\tEurope/London\t8980000\n',
+        encoding='utf-8',
+    )
+    build_index(source, tmp_path / 'index')
+    return Gazetteer(tmp_path / 'index')
+
+
+def test_resolve_free_text_birth_places(gazetteer):
+    assert gazetteer.resolve('上海市').name == '上海'
+    assert gazetteer.resolve('Shanghai, China').name == '上海'
+    assert gazetteer.resolve('中国上海').name == '上海'
+    assert gazetteer.resolve('SWATOW').name == '汕头'
+    # Ambiguous names resolve to the more populous place.
+    assert gazetteer.resolve('Taizhou').name == '台州'
+    assert gazetteer.resolve('Atlantis') is None
+
+    coordinates = gazetteer.resolve('51.4, -0.3')
+    assert (coordinates.latitude, coordinates.longitude, coordinates.timezone) == (51.4, -0.3, 'Europe/London')
+
+
+def test_complete_ranks_prefix_matches_by_population(gazetteer):
+    assert [place.name for place in gazetteer.complete('s')] == ['上海', '汕头']
+    assert [place.name for place in gazetteer.complete('tai')] == ['台州', '泰州']
+    assert [place.name for place in gazetteer.complete('伦')] == ['伦敦']
+    assert gazetteer.complete('x') == []
+
+
+def test_utc_offset_follows_historical_dst():
+    assert utc_offset_hours('Asia/Shanghai', datetime(1988, 7, 1, 12), 8.0) == 9.0
+    assert utc_offset_hours('Asia/Shanghai', datetime(1995, 7, 1, 12), 8.0) == 8.0
+    assert utc_offset_hours('Mars/Olympus_Mons', datetime(1995, 7, 1, 12), 8.0) == 8.0
+
+
+def test_places_autocomplete_endpoint(test_client):
+    response = test_client.get('/api/places?q=bei&limit=3')
+    assert response.status_code == 200
+    assert response.headers['cache-control'] == 'public, max-age=86400'
+    assert response.json()[0]['name'] == '北京'
+    assert response.json()[0]['timezone'] == 'Asia/Shanghai'
+    assert test_client.get('/api/places?q=').status_code == 422
@@ -1,4 +1,24 @@
-from datetime import date
+import gzip
+import json
+import random
+from datetime import date, datetime, timedelta
+from math import prod
+
+from sqlalchemy import func, insert, select, update
+
+from app import models
+from app.schemas import AstrologyReportPayload, AstrologyReportResponse, ZodiacReportPayload
+from app.services.principals import principal_cache
+from app.services.reports import (
+    ASTRO_SECTIONS,
+    ASTROLOGY_TEMPLATES,
+    ZODIAC_TEMPLATES,
+    astrology_record,
+    astrology_response,
+    daily_report_cache,
+    generate_astrology_report,
+    generate_zodiac_report,
+)
 
 
 def setup_user(client):
@@ -29,3 +49,154 @@ def test_generate_zodiac_report(test_client):
     assert response.status_code == 200
     payload = response.json()
     assert payload['payload']['zodiac']
+
+
+def test_latest_reports_support_conditional_get(test_client):
+    token = setup_user(test_client)
+    headers = {'Authorization': f'Bearer {token}'}
+    test_client.post('/api/reports/astrology', headers=headers)
+
+    first = test_client.get('/api/reports/astrology/latest', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['cache-control'] == 'private, no-cache'
+    etag = first.headers['etag']
+    assert test_client.get('/api/reports/astrology/latest', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    test_client.post('/api/reports/zodiac', headers=headers)
+    zodiac_etag = test_client.get('/api/reports/zodiac/latest', headers=headers).headers['etag']
+    assert test_client.get('/api/reports/zodiac/latest', headers={**headers, 'If-None-Match': zodiac_etag}).status_code == 304
+
+    test_client.post('/api/reports/astrology?report_type=weekly', headers=headers)
+    assert test_client.get('/api/reports/astrology/latest', headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+
+def test_compiled_templates_render_valid_payloads():
+    astro = generate_astrology_report('天秤座', '天秤座 15°', '双鱼座 02°', '双子座 11°', rng=random.Random(7))
+    assert json.loads(astro.json) == astro.payload
+    parsed = AstrologyReportPayload.model_validate_json(astro.json)
+    assert [section.title for section in parsed.sections] == [value['title'] for value in ASTRO_SECTIONS.values()]
+    for section, index, config in zip(parsed.sections, astro.variants, ASTRO_SECTIONS.values()):
+        assert section.summary == config['summaries'][index]
+        assert section.details == config['details']
+
+    zodiac = generate_zodiac_report('狗', '木', 2026, rng=random.Random(7))
+    assert json.loads(zodiac.json) == zodiac.payload
+    assert ZodiacReportPayload.model_validate_json(zodiac.json).year == 2026
+    assert len(zodiac.variants) == len(zodiac.payload['sections']) + 1
+
+
+def test_variant_indices_pack_into_one_code_per_template_version():
+    for registry in (ASTROLOGY_TEMPLATES, ZODIAC_TEMPLATES):
+        template = registry.current
+        codes = set()
+        for seed in range(200):
+            variants = template.pick(random.Random(seed))
+            code = template.encode(variants)
+            assert template.decode(code) == variants
+            codes.add(code)
+        assert max(codes) < prod(template.radices)
+    zodiac = generate_zodiac_report('狗', '木', 2026, rng=random.Random(3))
+    template = ZODIAC_TEMPLATES.get(zodiac.version)
+    assert template.match(zodiac.payload) == zodiac.variants
+    header = {key: zodiac.payload[key] for key in ('generated_at', 'zodiac', 'element', 'year')}
+    assert template.payload(header, zodiac.variants) == zodiac.payload
+
+
+def test_daily_report_is_idempotent_and_deterministic(test_client, test_db):
+    token = setup_user(test_client)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = test_client.post('/api/reports/astrology', headers=headers).json()
+    again = test_client.post('/api/reports/astrology', headers=headers).json()
+    assert again['id'] == first['id']
+
+    daily_report_cache.clear()
+    from_db = test_client.post('/api/reports/astrology', headers=headers).json()
+    assert from_db['id'] == first['id']
+
+    with test_db.engine.begin() as conn:
+        conn.execute(models.AstrologyReport.__table__.delete())
+    daily_report_cache.clear()
+    recreated = test_client.post('/api/reports/astrology', headers=headers).json()
+    assert recreated['payload']['sections'] == first['payload']['sections']
+
+    regenerated = test_client.post('/api/reports/astrology?regenerate=true', headers=headers).json()
+    assert regenerated['id'] != recreated['id']
+    assert test_client.post('/api/reports/astrology', headers=headers).json()['id'] == regenerated['id']
+    with test_db.engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(models.AstrologyReport)).scalar_one() == 2
+
+
+def seed_history(test_db, user_id, count):
+    rendered = generate_astrology_report('天秤座', '天秤座 14°', '双鱼座 02°', '双子座 11°', rng=random.Random(1))
+    start = datetime(2024, 1, 1)
+    with test_db.engine.begin() as conn:
+        conn.execute(insert(models.AstrologyReport), [
+            {
+                'user_id': user_id,
+                'report_type': 'weekly',
+                'generated_at': start + timedelta(hours=i),
+                **astrology_record(rendered),
+            }
+            for i in range(count)
+        ])
+
+
+def test_report_history_streams_as_ndjson(test_client, test_db):
+    token = setup_user(test_client)
+    headers = {'Authorization': f'Bearer {token}'}
+    user_id = test_client.get('/api/users/me', headers=headers).json()['id']
+    seed_history(test_db, user_id, 2500)
+
+    response = test_client.get('/api/reports/astrology/export', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.text().splitlines()]
+    assert len(lines) == 2500
+    assert lines[0]['generated_at'] > lines[-1]['generated_at']
+    assert AstrologyReportResponse.model_validate(lines[0]).payload.sun == '天秤座 14°'
+
+    compressed = test_client.get('/api/reports/astrology/export', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(compressed.content) == response.content
+
+    assert test_client.get('/api/reports/zodiac/export', headers=headers).text() == ''
+    assert test_client.get('/api/reports/astrology/latest?limit=100000', headers=headers).status_code == 422
+
+
+def test_latest_fast_path_matches_response_model(test_client, test_db):
+    token = setup_user(test_client)
+    headers = {'Authorization': f'Bearer {token}'}
+    user_id = test_client.get('/api/users/me', headers=headers).json()['id']
+    seed_history(test_db, user_id, 3)
+    legacy = generate_astrology_report('白羊座', '白羊座 01°', '金牛座 02°', '双子座 03°', rng=random.Random(2)).payload
+    with test_db.engine.begin() as conn:
+        conn.execute(insert(models.AstrologyReport).values(
+            user_id=user_id, report_type='legacy', generated_at=datetime(2025, 1, 1, 8, 30, 15, 250000),
+            payload={**legacy, 'generated_at': '2025-01-01T08:30:15.250000', 'extra': 'dropped by the schema'},
+        ))
+
+    body = test_client.get('/api/reports/astrology/latest?limit=10', headers=headers).json()
+    with test_db.session_factory() as session:
+        reports = session.scalars(
+            select(models.AstrologyReport).where(models.AstrologyReport.user_id == user_id)
+            .order_by(models.AstrologyReport.generated_at.desc())
+        ).all()
+        expected = [astrology_response(report).model_dump(mode='json') for report in reports]
+    assert body == expected
+    assert 'extra' not in body[0]['payload']
+
+
+def test_admin_export_requires_admin(test_client, test_db):
+    token = setup_user(test_client)
+    headers = {'Authorization': f'Bearer {token}'}
+    test_client.post('/api/reports/astrology', headers=headers)
+    assert test_client.get('/api/admin/reports/astrology/export', headers=headers).status_code == 403
+
+    with test_db.engine.begin() as conn:
+        conn.execute(update(models.User).values(is_admin=True))
+    principal_cache.clear()
+    response = test_client.get('/api/admin/reports/astrology/export', headers=headers)
+    assert response.status_code == 200
+    (line,) = response.text().splitlines()
+    assert set(json.loads(line)) == {'user_id', 'id', 'report_type', 'generated_at', 'payload'}
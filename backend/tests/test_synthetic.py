@@ -0,0 +1,76 @@
+import re
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.auth import verify_password
+from app.database import Base
+from app.services.astro_utils import chinese_zodiac, lunar_year, western_zodiac
+from app.services.ephemeris import UNKNOWN_POSITION
+from app.services.reports import astrology_payload, chart_for, zodiac_payload
+from app.services.synthetic import SYNTHETIC_PASSWORD, load_synthetic, plan_chunks
+
+
+def _engine(tmp_path, name):
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / name}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _dump(engine, model):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(select(model.__table__).order_by(model.id))]
+
+
+def test_plan_spreads_reports_over_user_chunks():
+    chunks = plan_chunks(
+        {'users': 10, 'astrology_reports': 0, 'zodiac_reports': 5, 'articles': 0},
+        users=25, astrology_reports=70, zodiac_reports=0, articles=3, chunk_size=10,
+    )
+    users = [c for c in chunks if c.table == 'users']
+    reports = [c for c in chunks if c.table == 'astrology_reports']
+    assert [(c.first_id, c.count) for c in users] == [(11, 9), (20, 8), (28, 8)]
+    assert sum(c.count for c in reports) == 70
+    assert all(c.count <= 10 for c in reports)
+    assert [c.first_id for c in reports] == sorted(c.first_id for c in reports)
+    assert {(c.first_user_id, c.user_count) for c in reports} == {(11, 9), (20, 8), (28, 8)}
+
+
+def test_load_is_deterministic_and_consistent(tmp_path):
+    counts = dict(users=120, astrology_reports=400, zodiac_reports=150, articles=40, seed=7, chunk_size=50)
+    inline = _engine(tmp_path, 'inline.db')
+    stats = load_synthetic(inline, workers=0, **counts)
+    assert stats.rows == {'users': 120, 'astrology_reports': 400, 'zodiac_reports': 150, 'articles': 40}
+
+    pooled = _engine(tmp_path, 'pooled.db')
+    load_synthetic(pooled, workers=2, **counts)
+    for model in (models.User, models.AstrologyReport, models.ZodiacReport, models.Article):
+        assert _dump(inline, model) == _dump(pooled, model)
+
+    with Session(inline) as db:
+        users = {user.id: user for user in db.scalars(select(models.User))}
+        for report in db.scalars(select(models.AstrologyReport).limit(50)):
+            owner = users[report.user_id]
+            assert report.sign == western_zodiac(owner.birth_date)
+            chart = chart_for(owner.birth_date, owner.birth_time, owner.birth_place)
+            assert (report.sun, report.moon, report.rising) == (chart.sun, chart.moon, chart.rising)
+            assert re.fullmatch(r'\S+座 \d{2}°', report.sun)
+            assert (report.rising == UNKNOWN_POSITION) == (owner.birth_time is None)
+            assert astrology_payload(report)['sections']
+        for report in db.scalars(select(models.ZodiacReport).limit(50)):
+            assert report.zodiac == chinese_zodiac(lunar_year(users[report.user_id].birth_date))
+            assert zodiac_payload(report)['summary']
+        article = db.scalars(select(models.Article).where(models.Article.status == 'published')).first()
+        assert article.tags and article.tags[0] in article.title
+        tagged = db.scalar(select(func.count()).select_from(models.ArticleTag))
+        assert tagged == sum(len(tags) for tags in db.scalars(select(models.Article.tags)))
+        assert verify_password(SYNTHETIC_PASSWORD, next(iter(users.values())).password_hash)
+
+    # A second run appends after the existing ids instead of colliding with them.
+    load_synthetic(inline, workers=0, users=10, articles=5, chunk_size=50)
+    with inline.connect() as conn:
+        assert conn.execute(select(func.max(models.User.id))).scalar() == 130
+        assert conn.execute(select(func.count()).select_from(models.Article)).scalar() == 45
+    inline.dispose()
+    pooled.dispose()
@@ -1,5 +1,9 @@
+import gzip
+import json
 from datetime import date
 
+from app.compression import compressed_bodies, negotiate
+
 
 def register_user(client, *, email='test@example.com', password='password123'):
     payload = {
@@ -69,3 +73,81 @@ def test_update_interpretation_requires_authentication(test_client):
     confirm = test_client.get('/api/zodiac-interpretations/aries')
     assert confirm.status_code == 200
     assert confirm.json()['summary'].startswith('以更稳健的节奏')
+
+
+def test_create_interpretation_normalizes_sign_and_refreshes_registry(test_client):
+    assert test_client.get('/api/zodiac-interpretations').status_code == 200  # load the registry
+    register_user(test_client, email='writer@example.com', password='secret123')
+    token = test_client.post('/api/auth/login', json={'email': 'writer@example.com', 'password': 'secret123'}).json()['access_token']
+    detail = test_client.get('/api/zodiac-interpretations/leo').json()
+    payload = {key: detail[key] for key in (
+        'title', 'date_range', 'element', 'modality', 'keywords', 'summary',
+        'love', 'career', 'wellbeing', 'ritual', 'mantra', 'lucky_color',
+    )}
+
+    created = test_client.post(
+        '/api/zodiac-interpretations',
+        headers={'Authorization': f'Bearer {token}'},
+        json={**payload, 'sign': ' Ophiuchus '},
+    )
+    assert created.status_code == 201
+    assert created.json()['sign'] == 'ophiuchus'
+
+    duplicate = test_client.post(
+        '/api/zodiac-interpretations',
+        headers={'Authorization': f'Bearer {token}'},
+        json={**payload, 'sign': 'OPHIUCHUS'},
+    )
+    assert duplicate.status_code == 400
+
+    listing = test_client.get('/api/zodiac-interpretations').json()
+    assert [item['sign'] for item in listing][-1] == 'ophiuchus'
+    assert test_client.get('/api/zodiac-interpretations/Ophiuchus').json()['sign'] == 'ophiuchus'
+
+
+def test_unknown_sign_returns_404(test_client):
+    assert test_client.get('/api/zodiac-interpretations/unknown').status_code == 404
+
+
+def test_interpretations_support_conditional_get(test_client):
+    listing = test_client.get('/api/zodiac-interpretations')
+    etag = listing.headers['etag']
+    assert test_client.get('/api/zodiac-interpretations', headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert test_client.get(
+        '/api/zodiac-interpretations', headers={'If-Modified-Since': listing.headers['last-modified']}
+    ).status_code == 304
+    assert test_client.get('/api/zodiac-interpretations', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+    leo = test_client.get('/api/zodiac-interpretations/leo')
+    assert test_client.get('/api/zodiac-interpretations/leo', headers={'If-None-Match': leo.headers['etag']}).status_code == 304
+
+
+def test_interpretation_list_is_gzipped_once_per_version(test_client):
+    plain = test_client.get('/api/zodiac-interpretations')
+    assert 'content-encoding' not in plain.headers
+    assert plain.headers['vary'] == 'Accept-Encoding'
+
+    first = test_client.get('/api/zodiac-interpretations', headers={'Accept-Encoding': 'gzip'})
+    assert first.headers['content-encoding'] == 'gzip'
+    assert int(first.headers['content-length']) == len(first.content) < len(plain.content) / 2
+    assert json.loads(gzip.decompress(first.content)) == plain.json()
+    etag = first.headers['etag']
+    assert etag == plain.headers['etag'][:-1] + '-gzip"'
+
+    hits = compressed_bodies.hits
+    second = test_client.get('/api/zodiac-interpretations', headers={'Accept-Encoding': 'gzip'})
+    assert second.content == first.content and compressed_bodies.hits == hits + 1
+
+    revalidated = test_client.get(
+        '/api/zodiac-interpretations', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}
+    )
+    assert revalidated.status_code == 304 and revalidated.headers['etag'] == etag
+    small = test_client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in small.headers
+
+
+def test_accept_encoding_negotiation():
+    assert negotiate('') is None
+    assert negotiate('gzip;q=0, identity') is None
+    assert negotiate('deflate, gzip;q=0.5') == 'gzip'
+    assert negotiate('*') in ('br', 'gzip')
@@ -1,15 +1,15 @@
 import { Link } from 'react-router-dom'
 import { useQuery } from '@tanstack/react-query'
 import api from '../lib/api'
-import type { Article, ArticleRecord } from '../types/reports'
+import type { Article, ArticlePage } from '../types/reports'
 
 export default function ArticlesPage() {
   const { data, isLoading, isError } = useQuery({
     queryKey: ['articles'],
     queryFn: async () => {
       const res = await api.get('/articles')
-      const records = res.data as ArticleRecord[]
-      return records.map<Article>((record) => ({
+      const page = res.data as ArticlePage
+      return page.items.map<Article>((record) => ({
         id: record.id,
         title: record.title,
         slug: record.slug,
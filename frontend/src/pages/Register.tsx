@@ -2,6 +2,8 @@ import { useEffect, useState } from 'react'
 import { useForm } from 'react-hook-form'
 import { Link, useNavigate } from 'react-router-dom'
 import { useAuth } from '../context/AuthContext'
+import api from '../lib/api'
+import type { PlaceSuggestion } from '../types/places'
 
 type RegisterForm = {
   email: string
@@ -15,8 +17,10 @@ type RegisterForm = {
 export default function RegisterPage() {
   const navigate = useNavigate()
   const { register: registerUser, user, loading } = useAuth()
-  const { register, handleSubmit, formState } = useForm<RegisterForm>()
+  const { register, handleSubmit, formState, watch } = useForm<RegisterForm>()
   const [error, setError] = useState<string | null>(null)
+  const [places, setPlaces] = useState<PlaceSuggestion[]>([])
+  const birthPlace = watch('birthPlace')
 
   useEffect(() => {
     if (!loading && user) {
@@ -24,6 +28,21 @@ export default function RegisterPage() {
     }
   }, [loading, navigate, user])
 
+  useEffect(() => {
+    const query = birthPlace?.trim()
+    if (!query) {
+      setPlaces([])
+      return
+    }
+    const timer = window.setTimeout(() => {
+      api
+        .get<PlaceSuggestion[]>('/places', { params: { q: query, limit: 8 } })
+        .then(({ data }) => setPlaces(data))
+        .catch(() => setPlaces([]))
+    }, 150)
+    return () => window.clearTimeout(timer)
+  }, [birthPlace])
+
   const onSubmit = async (data: RegisterForm) => {
     setError(null)
     try {
@@ -107,8 +126,17 @@ export default function RegisterPage() {
           <input
             className="w-full rounded-xl border border-white/10 bg-white/10 px-4 py-3 text-sm text-white placeholder:text-white/40 focus:border-aurora focus:outline-none"
             placeholder="City or coordinates"
+            list="birth-place-suggestions"
+            autoComplete="off"
             {...register('birthPlace', { required: 'Birth place is required' })}
           />
+          <datalist id="birth-place-suggestions">
+            {places.map((place) => (
+              <option key={`${place.name}-${place.latitude}`} value={place.name}>
+                {place.name_en} · {place.country}
+              </option>
+            ))}
+          </datalist>
           {formState.errors.birthPlace && <p className="text-xs text-aurora">{formState.errors.birthPlace.message}</p>}
         </div>
         {error && <p className="md:col-span-2 text-center text-xs text-aurora">{error}</p>}
@@ -0,0 +1,8 @@
+export type PlaceSuggestion = {
+  name: string
+  name_en: string
+  country: string
+  latitude: number
+  longitude: number
+  timezone: string
+}
@@ -59,3 +59,9 @@ export type ArticleRecord = {
   content?: string
   published_at: string
 }
+
+export type ArticlePage = {
+  items: ArticleRecord[]
+  next_cursor: string | null
+  total: number | null
+}